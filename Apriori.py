@@ -1,88 +1,140 @@
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from mlxtend.frequent_patterns import apriori, association_rules
+from data_store import leer_dataset
+from itemset_mining import ALGORITMOS, canasta_amplia, comparar_algoritmos, itemsets_frecuentes, reglas_asociacion
+from rule_store import guardar_reglas
 
-# ===========================
-# 1. Cargar dataset limpio
-# ===========================
-df = pd.read_csv("data/speed_dating_cleaned.csv")
 
-# ===========================
-# 2. Seleccionar columnas relevantes (Grupo A)
-# ===========================
-cols = ['match', 'attr_o', 'fun_o', 'int_corr']
-data = df[cols].dropna()
+def canasta_grupo_a(df, amplia=False):
+    """Columnas binarias del Grupo A (o la canasta amplia) sobre las filas completas."""
+    cols = ['match', 'attr_o', 'fun_o', 'int_corr']
+    data = df[cols].dropna()
+    # Umbrales fijos; para explorar una grilla de umbrales/soporte/lift: python rule_sweep.py
+    if amplia:
+        return canasta_amplia(df.loc[data.index])
+    return pd.DataFrame({
+        'High_Attractive': (data['attr_o'] >= 7).astype(int),
+        'High_Fun': (data['fun_o'] >= 7).astype(int),
+        'High_SharedInterests': (data['int_corr'] >= 0.6).astype(int),
+        'Match': (data['match'] == 1).astype(int),
+    })
 
-# ===========================
-# 3. Crear columnas binarias
-# ===========================
-data['High_Attractive'] = (data['attr_o'] >= 7).astype(int)
-data['High_Fun'] = (data['fun_o'] >= 7).astype(int)
-data['High_SharedInterests'] = (data['int_corr'] >= 0.6).astype(int)
-data['Match'] = (data['match'] == 1).astype(int)
 
-basket = data[['High_Attractive', 'High_Fun', 'High_SharedInterests', 'Match']]
+def minar_reglas(data_path="data/speed_dating_cleaned.csv", rules_path="apriori_rules_GroupA.csv",
+                 min_support=0.1, algoritmos=("apriori",), amplia=False, comparar=True):
+    """Mina las reglas con consecuente Match, las guarda y devuelve ``(rules, basket)``.
 
-# ===========================
-# 4. Aplicar Apriori
-# ===========================
-frequent_itemsets = apriori(basket, min_support=0.1, use_colnames=True)
-rules = association_rules(frequent_itemsets, metric="lift", min_threshold=1)
+    Con ``comparar`` se corren todos los ``algoritmos`` y se reporta tiempo y
+    memoria de cada uno (devuelven los mismos itemsets); sin él, solo el primero.
+    """
+    # ===========================
+    # 1. Cargar dataset limpio
+    # ===========================
+    # Solo se leen las columnas necesarias (Parquet si está disponible)
+    cols = ['match', 'attr_o', 'fun_o', 'int_corr']
+    df = leer_dataset(data_path, None if amplia else cols)
 
-# Filtrar reglas con 'Match'
-rules = rules[rules['consequents'].apply(lambda x: 'Match' in x)]
-rules = rules.sort_values(by='lift', ascending=False)
+    # ===========================
+    # 2-3. Columnas relevantes (Grupo A) binarizadas
+    # ===========================
+    basket = canasta_grupo_a(df, amplia)
 
-# ===========================
-# 5. Mostrar resultados
-# ===========================
-print("\n📊 Reglas de asociación más relevantes:")
-print(rules[['antecedents', 'consequents', 'support', 'confidence', 'lift']].head())
+    # ===========================
+    # 4. Aplicar Apriori
+    # ===========================
+    # Transacciones empaquetadas en bits: soporte = popcount(AND), mismas columnas que mlxtend.
+    if comparar:
+        rendimiento, frequent_itemsets = comparar_algoritmos(basket, min_support, algoritmos)
+        print(f"\n⏱️ Minería de itemsets (min_support={min_support}):")
+        print(rendimiento.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    else:
+        frequent_itemsets = itemsets_frecuentes(basket, min_support, use_colnames=True, algoritmo=algoritmos[0])
 
-# Guardar CSV
-rules.to_csv("apriori_rules_GroupA.csv", index=False)
-print("\n💾 Archivo 'apriori_rules_GroupA.csv' guardado correctamente.")
+    rules = reglas_asociacion(frequent_itemsets, metric="lift", min_threshold=1)
 
-# ===========================
-# 6. Visualizaciones
-# ===========================
+    # Filtrar reglas con 'Match'
+    rules = rules[rules['consequents'].apply(lambda x: 'Match' in x)]
+    rules = rules.sort_values(by='lift', ascending=False)
+
+    # ===========================
+    # 5. Mostrar resultados
+    # ===========================
+    print("\n📊 Reglas de asociación más relevantes:")
+    print(rules[['antecedents', 'consequents', 'support', 'confidence', 'lift']].head())
+
+    # Guardar CSV (+ JSON con los ítems como conjuntos, que es lo que leen integración y simulación)
+    json_path = guardar_reglas(rules, rules_path)
+    print(f"\n💾 Archivos '{rules_path}' y '{json_path}' guardados correctamente.")
+    return rules, basket
+
+
+def graficar_reglas(rules, basket):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # ===========================
+    # 6. Visualizaciones
+    # ===========================
+
+    # --- a) Gráfico de dispersión soporte vs confianza ---
+    plt.figure(figsize=(8,6))
+    sns.scatterplot(x='support', y='confidence', size='lift', hue='lift',
+                    data=rules, sizes=(50, 300), palette='viridis', alpha=0.7)
+    plt.title("Reglas de Asociación - Soporte vs Confianza (Grupo A)")
+    plt.xlabel("Soporte")
+    plt.ylabel("Confianza")
+    plt.legend(title='Lift', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+    plt.show()
+
+    # --- b) Top reglas por Lift ---
+    top_rules = rules.nlargest(5, 'lift')
+    plt.figure(figsize=(8,5))
+    sns.barplot(x='lift', y=top_rules['antecedents'].astype(str), data=top_rules, palette='coolwarm')
+    plt.title("Top 5 Reglas por Lift (Grupo A)")
+    plt.xlabel("Lift")
+    plt.ylabel("Antecedentes")
+    plt.tight_layout()
+    plt.show()
+
+    # --- c) Heatmap de correlación entre atributos binarios ---
+    plt.figure(figsize=(6,5))
+    sns.heatmap(basket.corr(), annot=True, cmap='Blues', fmt=".2f")
+    plt.title("Correlación entre atributos (Grupo A)")
+    plt.tight_layout()
+    plt.show()
+
+
+def resumen_grupo():
+    # ===========================
+    # 7. Información del grupo
+    # ===========================
+    print("\n===============================")
+    print("💡 GROUP SPECIALIZATION SUMMARY")
+    print("===============================")
+    print("Group: A")
+    print("Focus: Attractiveness + Fun + Shared Interests")
+    print("Specialization: Tree interpretability and visualization")
+    print("===============================\n")
 
-# --- a) Gráfico de dispersión soporte vs confianza ---
-plt.figure(figsize=(8,6))
-sns.scatterplot(x='support', y='confidence', size='lift', hue='lift', 
-                data=rules, sizes=(50, 300), palette='viridis', alpha=0.7)
-plt.title("Reglas de Asociación - Soporte vs Confianza (Grupo A)")
-plt.xlabel("Soporte")
-plt.ylabel("Confianza")
-plt.legend(title='Lift', bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.tight_layout()
-plt.show()
-
-# --- b) Top reglas por Lift ---
-top_rules = rules.nlargest(5, 'lift')
-plt.figure(figsize=(8,5))
-sns.barplot(x='lift', y=top_rules['antecedents'].astype(str), data=top_rules, palette='coolwarm')
-plt.title("Top 5 Reglas por Lift (Grupo A)")
-plt.xlabel("Lift")
-plt.ylabel("Antecedentes")
-plt.tight_layout()
-plt.show()
-
-# --- c) Heatmap de correlación entre atributos binarios ---
-plt.figure(figsize=(6,5))
-sns.heatmap(basket.corr(), annot=True, cmap='Blues', fmt=".2f")
-plt.title("Correlación entre atributos (Grupo A)")
-plt.tight_layout()
-plt.show()
 
 # ===========================
-# 7. Información del grupo
+# Ejecución
 # ===========================
-print("\n===============================")
-print("💡 GROUP SPECIALIZATION SUMMARY")
-print("===============================")
-print("Group: A")
-print("Focus: Attractiveness + Fun + Shared Interests")
-print("Specialization: Tree interpretability and visualization")
-print("===============================\n")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reglas de asociación del Grupo A")
+    # Con --amplia se mina sobre todas las calificaciones, samerace y gaps de percepción
+    parser.add_argument("--amplia", action="store_true")
+    parser.add_argument("--min-support", type=float, default=0.1)
+    # Con soportes bajos (0.01) Apriori explota en candidatos: Eclat recorre en profundidad
+    parser.add_argument("--algoritmo", choices=list(ALGORITMOS) + ["todos"], default="apriori",
+                        help="eclat para soportes bajos; fpgrowth es solo una implementación de "
+                             "referencia en Python puro (20-40x más lenta que los backends de bitsets)")
+    args = parser.parse_args()
+    RULES_PATH = "apriori_rules_amplia.csv" if args.amplia else "apriori_rules_GroupA.csv"
+
+    algoritmos = tuple(ALGORITMOS) if args.algoritmo == "todos" else (args.algoritmo,)
+    rules, basket = minar_reglas("data/speed_dating_cleaned.csv", RULES_PATH, args.min_support, algoritmos,
+                                 args.amplia)
+    graficar_reglas(rules, basket)
+    resumen_grupo()
@@ -0,0 +1,70 @@
+# ==========================================
+# Benchmark: Apriori / Eclat / FP-Growth sobre bitsets vs mlxtend
+# Uso: python -m benchmarks.bench_apriori [--items 4,25,100] [--rows 8000,1000000,10000000] [--algoritmos apriori,eclat]
+# ==========================================
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from itemset_mining import ALGORITMOS, CanastaBits, comparar_algoritmos, reglas_asociacion
+
+
+def canasta_sintetica(n_items, n_rows, seed=0):
+    """Ítems correlacionados (factor latente común), generados columna a columna ya empaquetados."""
+    rng = np.random.default_rng(seed)
+    latente = rng.random(n_rows, dtype=np.float32)
+    prob = rng.uniform(0.05, 0.4, n_items)
+    columnas = ((rng.random(n_rows, dtype=np.float32) * 0.7 + latente * 0.3) < p for p in prob)
+    return CanastaBits.desde_booleanos(columnas, n_rows, [f"I{k}" for k in range(n_items)])
+
+
+def como_dataframe(canasta):
+    bits = np.unpackbits(canasta.bits.view(np.uint8), axis=1, bitorder="little")[:, :canasta.n_rows]
+    return pd.DataFrame(bits.T.astype(bool), columns=canasta.columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo y memoria de minería de itemsets (bitsets vs mlxtend) según ítems y filas")
+    parser.add_argument("--items", default="4,10,25,50,100")
+    parser.add_argument("--rows", default="8000,100000,1000000,10000000")
+    parser.add_argument("--min-support", type=float, default=0.1)
+    parser.add_argument("--algoritmos", default=",".join(ALGORITMOS))
+    parser.add_argument("--max-mlxtend", type=int, default=50_000_000,
+                        help="celdas (filas × ítems) máximas para correr mlxtend")
+    args = parser.parse_args()
+
+    try:
+        from mlxtend.frequent_patterns import apriori
+    except ImportError:
+        apriori = None
+        print("⚠️ mlxtend no está instalado: solo se mide el motor de bitsets")
+
+    algoritmos = tuple(args.algoritmos.split(","))
+    print(f"\n{'ítems':>6} | {'filas':>9} | {'itemsets':>8} | {'reglas':>7} | "
+          + " | ".join(f"{a + ' s/MB':>16}" for a in algoritmos) + f" | {'mlxtend (s)':>11} | {'igual':>5}")
+    print("-" * (60 + 19 * len(algoritmos)))
+    for n_items in [int(s) for s in args.items.split(",")]:
+        for n_rows in [int(s) for s in args.rows.split(",")]:
+            canasta = canasta_sintetica(n_items, n_rows)
+            # Falla si algún backend no devuelve los mismos itemsets
+            tabla, fi = comparar_algoritmos(canasta, args.min_support, algoritmos)
+            reglas = reglas_asociacion(fi, metric="lift", min_threshold=1) if len(fi) else []
+
+            t_mlx, igual = float("nan"), "-"
+            if apriori is not None and n_items * n_rows <= args.max_mlxtend:
+                df = como_dataframe(canasta)
+                t0 = time.perf_counter()
+                fi_mlx = apriori(df, min_support=args.min_support, use_colnames=True)
+                t_mlx = time.perf_counter() - t0
+                igual = "sí" if (fi_mlx["itemsets"].tolist() == fi["itemsets"].tolist()
+                                 and np.array_equal(fi_mlx["support"].to_numpy(), fi["support"].to_numpy())) else "NO"
+            backends = " | ".join(f"{r.segundos:>8.3f}/{r.pico_mb:>7.1f}" for r in tabla.itertuples())
+            print(f"{n_items:>6} | {n_rows:>9} | {len(fi):>8} | {len(reglas):>7} | "
+                  f"{backends} | {t_mlx:>11.3f} | {igual:>5}")
+
+
+if __name__ == "__main__":
+    main()
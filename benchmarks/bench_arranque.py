@@ -0,0 +1,90 @@
+# ==========================================
+# Benchmark de arranque: importación de módulos, modelo cargado y primer frame
+# Cada medición es un proceso nuevo, desde que se lanza hasta que la tarea termina
+# Uso: python -m benchmarks.bench_arranque [--repeticiones 5] [--data ruta.csv] [--rules ruta.csv]
+# ==========================================
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULOS = ["instrumentacion", "data_store", "rule_store", "itemset_mining", "modelos_grupoA",
+           "simulation_engine", "integration", "Apriori", "ExploratoryDataAnalysis", "pipeline"]
+# Librerías caras que no deberían cargarse si el camino no las usa
+PESADAS = ["matplotlib", "seaborn", "xgboost", "reportlab", "sklearn", "pygame"]
+
+# El hijo imprime al terminar la tarea la hora y qué librerías pesadas quedaron cargadas
+_FIN = ("import json, sys, time; print('@@' + json.dumps({'fin': time.time(), "
+        "'cargadas': [m for m in %r if m in sys.modules]}))" % PESADAS)
+
+
+def _tarea_modelo(data):
+    return f"from simulation_engine import load_tree; load_tree({data!r})"
+
+
+def _tarea_tabla(data):
+    return f"from simulation_engine import load_prediction_table; load_prediction_table({data!r})"
+
+
+def _tarea_frame(data, rules):
+    return ("from dating_market_simulation import DatingMarketSimulationV42; "
+            f"DatingMarketSimulationV42(data_path={data!r}, rules_path={rules!r}, seed=0).run(frames=1)")
+
+
+def medir_proceso(codigo, repeticiones, env=None):
+    """Mediana de segundos desde lanzar el intérprete hasta el fin de ``codigo``."""
+    tiempos, cargadas = [], []
+    for _ in range(repeticiones):
+        t0 = time.time()
+        salida = subprocess.run([sys.executable, "-c", f"{codigo}\n{_FIN}"], capture_output=True, text=True,
+                                env=env, check=True).stdout
+        fin = json.loads(salida[salida.rindex("@@") + 2:])
+        tiempos.append(fin["fin"] - t0)
+        cargadas = fin["cargadas"]
+    return statistics.median(tiempos), cargadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de los módulos y de la simulación")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--data", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--rules", default="apriori_rules_GroupA.csv")
+    parser.add_argument("--out", default=None, help="guarda los resultados en JSON")
+    args = parser.parse_args()
+
+    filas = []
+
+    def registrar(nombre, codigo, env=None):
+        segundos, cargadas = medir_proceso(codigo, args.repeticiones, env)
+        filas.append({"tarea": nombre, "segundos": segundos, "cargadas": cargadas})
+        print(f"   {nombre:<34} {segundos * 1000:>8.0f} ms | {', '.join(cargadas) or '-'}")
+
+    print(f"\n🚀 Arranque (mediana de {args.repeticiones} procesos) | librerías pesadas cargadas")
+    registrar("python (vacío)", "pass")
+    for modulo in MODULOS:
+        registrar(f"import {modulo}", f"import {modulo}")
+
+    if os.path.exists(args.data):
+        # Una corrida previa deja el Decision Tree en caché: se mide la carga, no el entrenamiento
+        subprocess.run([sys.executable, "-c", _tarea_tabla(args.data)], capture_output=True, check=True)
+        registrar("modelo cargado", _tarea_modelo(args.data))
+        registrar("tabla de predicciones", _tarea_tabla(args.data))
+        if os.path.exists(args.rules):
+            # Sin ventana ni audio: pygame dibuja en memoria
+            env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+            registrar("primer frame", _tarea_frame(args.data, args.rules), env)
+    else:
+        print(f"⚠️ No existe {args.data}: se omiten modelo y primer frame")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "resultados": filas}, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
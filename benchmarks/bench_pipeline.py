@@ -0,0 +1,201 @@
+# ==========================================
+# Benchmark de punta a punta sobre datos sintéticos
+# preprocesamiento → Apriori → modelos (fit/predict) → simulación → informe PDF
+# Uso: python -m benchmarks.bench_pipeline [--rows 8000,100000,1000000] [--out bench.json]
+#      python -m benchmarks.bench_pipeline --comparar base.json nuevo.json
+# ==========================================
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import escribir_csv
+from instrumentacion import medir
+
+
+# ===========================
+# Etapas
+# ===========================
+def etapa_preprocesamiento(raw_path, clean_path, chunksize):
+    from preprocessing_stream import preprocesar_por_chunks
+    info = preprocesar_por_chunks(raw_path, clean_path, chunksize)
+    return {"filas_entrada": info["initial_count"], "filas_salida": info["final_count"]}
+
+
+def etapa_apriori(clean_path, rules_path, min_support):
+    # Mismo flujo que Apriori.py (sin gráficos)
+    from data_store import leer_dataset
+    from itemset_mining import apriori_bitset, reglas_asociacion
+    from rule_store import guardar_reglas
+    data = leer_dataset(clean_path, ['match', 'attr_o', 'fun_o', 'int_corr']).dropna()
+    basket = pd.DataFrame({'High_Attractive': data['attr_o'] >= 7, 'High_Fun': data['fun_o'] >= 7,
+                           'High_SharedInterests': data['int_corr'] >= 0.6, 'Match': data['match'] == 1})
+    fi = apriori_bitset(basket, min_support=min_support, use_colnames=True)
+    rules = reglas_asociacion(fi, metric="lift", min_threshold=1)
+    rules = rules[rules['consequents'].apply(lambda x: 'Match' in x)].sort_values(by='lift', ascending=False)
+    guardar_reglas(rules, rules_path)
+    return {"itemsets": len(fi), "reglas": len(rules)}
+
+
+def etapa_modelos_fit(clean_path, cache_dir, modelos):
+    from modelos_grupoA import ModelosGrupoA
+    m = ModelosGrupoA(clean_path, cache_dir=cache_dir)
+    m.cargar_datos()
+    m.entrenar_modelos(modelos, usar_cache=False)
+    return m, {"filas_train": len(m.X_train), **{f"fit_s_{k}": r["fit_s"] for k, r in m.results.items()}}
+
+
+def etapa_modelos_predict(modelo):
+    extra = {}
+    for name, model in modelo.models.items():
+        t0 = time.perf_counter()
+        model.predict(modelo.X_test)
+        extra[f"predict_s_{name}"] = time.perf_counter() - t0
+    return {"filas_test": len(modelo.X_test), **extra}
+
+
+def etapa_simulacion(tree, rules_path, agentes, ticks, seed):
+    from simulation_engine import SimulationEngine, load_rules
+    engine = SimulationEngine(tree, load_rules(rules_path), n_agents=agentes, seed=seed)
+    tiempos = []
+    for _ in range(ticks):
+        t0 = time.perf_counter()
+        engine.step()
+        tiempos.append(time.perf_counter() - t0)
+    tiempos.sort()
+    return {"agentes": agentes, "ticks": ticks, "ms_tick_p50": tiempos[len(tiempos) // 2] * 1000,
+            "ms_tick_p95": tiempos[int(len(tiempos) * 0.95)] * 1000, "matches": engine.total_matches}
+
+
+def etapa_informe(clean_path, rules_path, pdf_path):
+    import matplotlib
+    matplotlib.use("Agg")
+    from integration import IntegracionSintesisPDF
+    IntegracionSintesisPDF(rules_path, clean_path, pdf_path).generar_informe()
+    return {"pdf_kb": os.path.getsize(pdf_path) / 1024}
+
+
+def correr_tamano(n_rows, args, tmp):
+    """Todas las etapas sobre un dataset sintético de ``n_rows`` filas, en un directorio aislado."""
+    data_dir = os.path.join(tmp, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    raw = os.path.join(data_dir, "Speed Dating Data.csv")
+    clean = os.path.join(data_dir, "speed_dating_cleaned.csv")
+    rules = os.path.join(tmp, "apriori_rules_GroupA.csv")
+
+    t0 = time.perf_counter()
+    escribir_csv(raw, n_rows, seed=args.seed)
+    print(f"\n🧪 {n_rows} filas sintéticas generadas en {time.perf_counter() - t0:.1f}s")
+
+    filas = []
+
+    def registrar(etapa, medida, extra):
+        filas.append({"filas": n_rows, "etapa": etapa, **medida, **extra})
+        print(f"   {etapa:<18} {medida['wall_s']:>9.3f}s pared | {medida['cpu_s']:>9.3f}s CPU | "
+              f"{medida['pico_mb']:>9.1f} MB pico")
+
+    extra, medida = medir(etapa_preprocesamiento, raw, clean, args.chunksize)
+    registrar("preprocesamiento", medida, extra)
+    extra, medida = medir(etapa_apriori, clean, rules, args.min_support)
+    registrar("apriori", medida, extra)
+    (modelo, extra), medida = medir(etapa_modelos_fit, clean, os.path.join(tmp, "model_cache"), args.modelos)
+    registrar("modelos_fit", medida, extra)
+    extra, medida = medir(etapa_modelos_predict, modelo)
+    registrar("modelos_predict", medida, extra)
+    if "Decision Tree" in modelo.models:
+        extra, medida = medir(etapa_simulacion, modelo.models["Decision Tree"], rules, args.agentes, args.ticks,
+                              args.seed)
+        registrar("simulacion", medida, extra)
+    if not args.sin_informe:
+        # generar_informe escribe rutas relativas a data/: se corre dentro del directorio aislado
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            extra, medida = medir(etapa_informe, clean, rules, os.path.join(data_dir, "informe.pdf"))
+        finally:
+            os.chdir(cwd)
+        registrar("informe", medida, extra)
+    return filas
+
+
+# ===========================
+# Metadatos y comparación
+# ===========================
+def metadatos(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import sklearn
+    return {
+        "commit": commit,
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__,
+        "plataforma": platform.platform(), "cpus": os.cpu_count(),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("comparar", "out")},
+    }
+
+
+def comparar(base_path, nuevo_path):
+    """Cociente nuevo/base de tiempo de pared y pico de memoria por (filas, etapa)."""
+    with open(base_path, encoding="utf-8") as f:
+        base = {(r["filas"], r["etapa"]): r for r in json.load(f)["resultados"]}
+    with open(nuevo_path, encoding="utf-8") as f:
+        nuevo = json.load(f)
+    print(f"\n{'filas':>10} | {'etapa':<18} | {'pared base':>10} | {'pared nuevo':>11} | {'x pared':>7} | {'x memoria':>9}")
+    print("-" * 80)
+    for r in nuevo["resultados"]:
+        b = base.get((r["filas"], r["etapa"]))
+        if b is None:
+            continue
+        x_wall = r["wall_s"] / max(b["wall_s"], 1e-9)
+        # Picos medidos con métodos distintos (RSS vs tracemalloc) no son comparables
+        x_mem = r["pico_mb"] / max(b["pico_mb"], 1e-9) if r.get("memoria") == b.get("memoria") else float("nan")
+        alerta = " ⚠️" if x_wall > 1.2 or x_mem > 1.2 else ""
+        print(f"{r['filas']:>10} | {r['etapa']:<18} | {b['wall_s']:>9.3f}s | {r['wall_s']:>10.3f}s | "
+              f"{x_wall:>6.2f}x | {x_mem:>8.2f}x{alerta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta con datos sintéticos")
+    parser.add_argument("--rows", default="8000,100000,1000000")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--min-support", type=float, default=0.1)
+    parser.add_argument("--modelos", default="Decision Tree,Random Forest,XGBoost")
+    parser.add_argument("--agentes", type=int, default=2000)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--sin-informe", action="store_true", help="omite la generación del PDF")
+    parser.add_argument("--out", default="bench_pipeline.json")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"),
+                        help="compara dos resultados JSON en vez de correr el benchmark")
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+    args.modelos = args.modelos.split(",")
+
+    resultados = []
+    for n_rows in [int(s) for s in args.rows.split(",")]:
+        with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+            resultados.extend(correr_tamano(n_rows, args, tmp))
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"meta": metadatos(args), "resultados": resultados}, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados guardados en: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
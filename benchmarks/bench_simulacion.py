@@ -0,0 +1,61 @@
+# ==========================================
+# Benchmark: tiempo por tick vs número de agentes
+# Uso: python -m benchmarks.bench_simulacion [--data ruta.csv]
+# ==========================================
+
+import argparse
+import time
+
+import numpy as np
+
+from simulation_engine import SimulationEngine, load_prediction_table, load_rules
+
+
+class MotorFuerzaBruta(SimulationEngine):
+    # Detección original O(n²), solo para comparar con el grid
+    def candidate_pairs(self):
+        activos = np.flatnonzero(~self.matched)
+        i, j = np.triu_indices(len(activos), k=1)
+        i, j = activos[i], activos[j]
+        d2 = (self.x[i] - self.x[j]) ** 2 + (self.y[i] - self.y[j]) ** 2
+        ok = (d2 < self.INTERACTION_RADIUS ** 2) & (self.male[i] != self.male[j])
+        return i[ok], j[ok]
+
+
+def medir(engine, n_agents, ticks, seed=0):
+    engine.reset(n_agents, seed=seed)
+    tiempos = []
+    for _ in range(ticks):
+        t0 = time.perf_counter()
+        engine.step()
+        tiempos.append(time.perf_counter() - t0)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo por tick de la simulación según número de agentes")
+    parser.add_argument("--data", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--rules", default="apriori_rules_GroupA.csv")
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--sizes", default="50,100,500,1000,2000,5000,10000,20000,50000")
+    args = parser.parse_args()
+
+    engine = SimulationEngine(rules=load_rules(args.rules), prediction_table=load_prediction_table(args.data))
+    bruta = MotorFuerzaBruta(rules=engine.rules, prediction_table=engine.prediction_table)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(f"\n{'agentes':>8} | {'grid (ms/tick)':>15} | {'n² (ms/tick)':>13}")
+    print("-" * 44)
+    for n in sizes:
+        grid_ms = medir(engine, n, args.ticks)
+        # El n² se vuelve inviable rápido; solo se mide en tamaños pequeños
+        bruta_ms = float("nan")
+        if n <= 5000:
+            bruta_ms = medir(bruta, n, min(args.ticks, 5))
+        print(f"{n:>8} | {grid_ms:>15.2f} | {bruta_ms:>13.2f}")
+    print(f"\nPresupuesto a 30 FPS: {1000 / 30:.1f} ms/tick")
+
+
+if __name__ == "__main__":
+    main()
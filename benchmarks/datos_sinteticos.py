@@ -0,0 +1,102 @@
+# ==========================================
+# Generador sintético del Speed Dating Data (mismo esquema que espera preprocessing.py)
+# Uso: python -m benchmarks.datos_sinteticos 1000000 [--out "data/Speed Dating Data.csv"] [--seed 0]
+# ==========================================
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+ATRIBUTOS = ["attr", "sinc", "intel", "fun", "amb", "shar"]
+CAMPOS = ["Law", "Economics", "Business", "Biology", "Engineering", "Social Work", "Psychology", "Medicine"]
+# Proporción de faltantes por grupo de columnas (del orden del dataset real)
+FALTANTES = {"rating": 0.03, "rating_o": 0.03, "preferencia": 0.01, "autopercepcion": 0.01, "int_corr": 0.02}
+
+
+def _con_faltantes(rng, valores, proporcion):
+    valores = valores.astype(float)
+    valores[rng.random(len(valores)) < proporcion] = np.nan
+    return valores
+
+
+def generar_bloque(n_rows, rng, offset_iid=0):
+    """Un bloque de filas con las columnas del dataset original.
+
+    Cada fila es una cita: calificaciones 1–10 que da y recibe (``attr``,
+    ``attr_o``…), importancia 0–100 que reparte entre atributos (``attr1_1``…,
+    suma 100 como en el formulario real), autopercepción 1–10 (``attr3_1``…),
+    ``int_corr`` en [-1, 1], raza propia y del otro, y ``match`` correlacionado
+    con atractivo, diversión e intereses compartidos para que Apriori y los
+    modelos encuentren señal.
+    """
+    iid = offset_iid + rng.integers(1, 600, n_rows)
+    df = pd.DataFrame({
+        "iid": iid,
+        "id": rng.integers(1, 23, n_rows),
+        "gender": rng.integers(0, 2, n_rows),
+        "wave": rng.integers(1, 22, n_rows),
+        "round": rng.integers(5, 23, n_rows),
+        "position": rng.integers(1, 23, n_rows),
+        "partner": rng.integers(1, 23, n_rows),
+        "pid": offset_iid + rng.integers(1, 600, n_rows),
+        "age": rng.integers(18, 45, n_rows),
+        "age_o": rng.integers(18, 45, n_rows),
+        "race": rng.integers(1, 7, n_rows),
+        "race_o": rng.integers(1, 7, n_rows),
+        "field": rng.choice(CAMPOS, n_rows),
+        "int_corr": _con_faltantes(rng, np.round(rng.uniform(-0.8, 0.95, n_rows), 2), FALTANTES["int_corr"]),
+    })
+    df["samerace"] = (df["race"] == df["race_o"]).astype(int)
+
+    # Calificaciones dadas y recibidas (1–10)
+    for a in ATRIBUTOS:
+        df[a] = _con_faltantes(rng, np.clip(np.round(rng.normal(6.5, 1.8, n_rows)), 1, 10), FALTANTES["rating"])
+        df[f"{a}_o"] = _con_faltantes(rng, np.clip(np.round(rng.normal(6.5, 1.8, n_rows)), 1, 10),
+                                      FALTANTES["rating_o"])
+    # Importancia declarada: 100 puntos repartidos entre los seis atributos
+    pesos = np.round(rng.dirichlet(np.full(len(ATRIBUTOS), 4.0), n_rows) * 100)
+    for k, a in enumerate(ATRIBUTOS):
+        df[f"{a}1_1"] = _con_faltantes(rng, pesos[:, k], FALTANTES["preferencia"])
+    # Autopercepción (1–10)
+    for a in ATRIBUTOS:
+        df[f"{a}3_1"] = _con_faltantes(rng, rng.integers(2, 11, n_rows), FALTANTES["autopercepcion"])
+
+    df["like"] = np.clip(np.round((df["attr"].fillna(6) + df["fun"].fillna(6)) / 2 + rng.normal(0, 1, n_rows)), 1, 10)
+    z = ((df["attr_o"].fillna(6) - 6.5) * 0.7 + (df["fun_o"].fillna(6) - 6.5) * 0.5
+         + (df["shar_o"].fillna(6) - 6.5) * 0.2 + df["int_corr"].fillna(0) * 1.0 - 1.8)
+    df["match"] = (rng.random(n_rows) < 1 / (1 + np.exp(-z))).astype(int)
+    df["dec"] = np.maximum(df["match"], rng.random(n_rows) < 0.3).astype(int)
+    df["dec_o"] = np.maximum(df["match"], rng.random(n_rows) < 0.3).astype(int)
+    df["income"] = _con_faltantes(rng, np.round(rng.lognormal(10.8, 0.4, n_rows)), 0.4)
+    return df
+
+
+def generar_speed_dating(n_rows, seed=0, bloque=500_000):
+    """DataFrame sintético de ``n_rows`` filas; la misma ``seed`` da siempre los mismos datos."""
+    return pd.concat(list(_bloques(n_rows, seed, bloque)), ignore_index=True)
+
+
+def _bloques(n_rows, seed, bloque):
+    # Una semilla por bloque (SeedSequence.spawn): el resultado no depende de cómo se escriba
+    hijos = np.random.SeedSequence(seed).spawn(max(1, -(-n_rows // bloque)))
+    for k, hijo in enumerate(hijos):
+        n = min(bloque, n_rows - k * bloque)
+        yield generar_bloque(n, np.random.default_rng(hijo), offset_iid=k * 600)
+
+
+def escribir_csv(path, n_rows, seed=0, bloque=500_000):
+    """Escribe el CSV crudo por bloques, con memoria acotada aunque sean 10M filas."""
+    for k, df in enumerate(_bloques(n_rows, seed, bloque)):
+        df.to_csv(path, index=False, encoding='latin1', mode='w' if k == 0 else 'a', header=(k == 0))
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un Speed Dating Data sintético y reproducible")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--out", default="data/Speed Dating Data.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    escribir_csv(args.out, args.rows, args.seed)
+    print(f"💾 {args.rows} filas sintéticas guardadas en: {args.out}")
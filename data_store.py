@@ -0,0 +1,153 @@
+# ==========================================
+# Almacenamiento del dataset limpio
+# CSV (formato de intercambio) + Parquet columnar (lectura rápida por columnas)
+# ==========================================
+
+import hashlib
+import os
+import shutil
+
+import pandas as pd
+
+from instrumentacion import etapa
+
+
+def hash_archivo(path, huellas=None, bloque=1 << 20):
+    """SHA-256 del contenido; con ``huellas`` (ruta -> [tamaño, mtime, hash]) se reutiliza si no cambió."""
+    st = os.stat(path)
+    previa = huellas.get(path) if huellas is not None else None
+    if previa and previa[0] == st.st_size and previa[1] == st.st_mtime_ns:
+        return previa[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for parte in iter(lambda: f.read(bloque), b""):
+            h.update(parte)
+    if huellas is not None:
+        huellas[path] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    return h.hexdigest()
+
+
+def ruta_columnar(csv_path):
+    """Ruta del Parquet que acompaña al CSV (``x.csv`` -> ``x.parquet``)."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def ruta_partes(csv_path):
+    """Directorio de las partes Parquet agregadas por olas (``x.csv`` -> ``x.parquet.partes/``)."""
+    return ruta_columnar(csv_path) + ".partes"
+
+
+def partes_columnares(csv_path):
+    """Partes agregadas después del Parquet principal, en orden de escritura."""
+    directorio = ruta_partes(csv_path)
+    if not os.path.isdir(directorio):
+        return []
+    return [os.path.join(directorio, f) for f in sorted(os.listdir(directorio)) if f.endswith(".parquet")]
+
+
+def limpiar_partes(csv_path):
+    """Borra las partes agregadas: se llama cada vez que se reescribe el Parquet principal."""
+    shutil.rmtree(ruta_partes(csv_path), ignore_errors=True)
+
+
+def _columnar_vigente(csv_path):
+    # El Parquet solo sirve si existe y no es más viejo que el CSV (contando la última parte agregada)
+    pq_path = ruta_columnar(csv_path)
+    if not os.path.exists(pq_path):
+        return None
+    escrito = max(os.path.getmtime(p) for p in [pq_path] + partes_columnares(csv_path))
+    if os.path.exists(csv_path) and escrito < os.path.getmtime(csv_path):
+        return None
+    return pq_path
+
+
+def _hay_parquet():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def nombres_como_csv(columns):
+    """Renombra columnas repetidas igual que ``read_csv`` (``x``, ``x.1``, ``x.2``...).
+
+    Parquet no admite nombres duplicados; así ambos formatos exponen las mismas columnas.
+    """
+    vistos, nombres = {}, []
+    for c in columns:
+        c = str(c)
+        if c in vistos:
+            vistos[c] += 1
+            nuevo = f"{c}.{vistos[c]}"
+            while nuevo in vistos:
+                vistos[c] += 1
+                nuevo = f"{c}.{vistos[c]}"
+            vistos[nuevo] = 0
+            c = nuevo
+        else:
+            vistos[c] = 0
+        nombres.append(c)
+    return nombres
+
+
+def guardar_dataset(df, csv_path):
+    """Guarda el dataset como CSV y, si hay pyarrow, también como Parquet."""
+    df.to_csv(csv_path, index=False, encoding='utf-8')
+    pq_path = ruta_columnar(csv_path)
+    limpiar_partes(csv_path)
+    if not _hay_parquet():
+        print("⚠️ pyarrow no está instalado: solo se guarda el CSV")
+        return None
+    try:
+        df.set_axis(nombres_como_csv(df.columns), axis=1).to_parquet(pq_path, index=False)
+    except Exception as e:
+        # Columnas con tipos mezclados que Arrow no acepta: se queda solo el CSV
+        print(f"⚠️ No se pudo guardar {pq_path}: {e}")
+        if os.path.exists(pq_path):
+            os.remove(pq_path)
+        return None
+    return pq_path
+
+
+def ruta_lectura(csv_path):
+    """Archivo que realmente se lee: el Parquet si está al día, si no el CSV."""
+    if _hay_parquet():
+        pq_path = _columnar_vigente(csv_path)
+        if pq_path:
+            return pq_path
+    return csv_path
+
+
+def archivos_lectura(csv_path):
+    """Todos los archivos que se leen: el Parquet y sus partes si están al día, si no el CSV."""
+    path = ruta_lectura(csv_path)
+    if path.endswith(".parquet"):
+        return [path] + partes_columnares(csv_path)
+    return [path]
+
+
+def columnas_dataset(csv_path):
+    """Nombres de columnas sin leer los datos."""
+    path = ruta_lectura(csv_path)
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def leer_dataset(csv_path, columns=None):
+    """Lee solo ``columns`` (o todas) del dataset limpio, en el orden pedido."""
+    archivos = archivos_lectura(csv_path)
+    path = archivos[0]
+    with etapa("carga_datos", ruta=path, partes=len(archivos) - 1,
+               columnas=len(columns) if columns is not None else None):
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path, columns=columns)
+            if len(archivos) > 1:
+                # Las partes se escriben con el esquema del principal: se concatenan sin conversiones
+                df = pd.concat([df] + [pd.read_parquet(p, columns=columns) for p in archivos[1:]],
+                               ignore_index=True)
+        else:
+            df = pd.read_csv(path, usecols=columns)
+    return df[columns] if columns is not None else df
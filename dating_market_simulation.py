@@ -2,73 +2,121 @@
 # Dating Market Simulation v4.2 - Black Edition + Match Effect
 # =========================================================
 
+import os
+import numpy as np
 import pygame
-import random
-import math
-import pandas as pd
-from modelos_grupoA import ModelosGrupoA
+from instrumentacion import PERFIL_NULO, PerfilFrames
+from simulation_engine import SimulationEngine, load_prediction_table, load_rules
 
 # ------------------------------
-# Clase Particle (efecto visual del match)
+# Partículas (efecto visual del match)
 # ------------------------------
-class HeartParticle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-3, -0.5)
-        self.life = 60  # frames (~2 segundos)
-        self.color = random.choice([(255, 80, 120), (255, 150, 200), (255, 0, 100)])
+class PoolParticulas:
+    """Corazones del efecto de match en arrays NumPy de capacidad fija.
 
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.1  # gravedad leve
-        self.life -= 1
-        return self.life > 0
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 4)
-        pygame.draw.circle(screen, self.color, (int(self.x + 5), int(self.y)), 4)
-        pygame.draw.polygon(screen, self.color, [
-            (self.x - 3, self.y),
-            (self.x + 8, self.y),
-            (self.x + 2, self.y + 6)
-        ])
+    Las ``n`` partículas vivas ocupan siempre las primeras posiciones de
+    ``x``, ``y``, ``vx``, ``vy``, ``life`` y ``color``: mover, envejecer y
+    compactar las muertas son operaciones vectorizadas, y dibujar es un solo
+    ``blits`` de un sprite por color. Pasado ``capacidad``, las partículas
+    nuevas se descartan, así que el costo por frame tiene techo aunque haya
+    cientos de matches a la vez.
+    """
+    VIDA = 60  # frames (~2 segundos)
+    GRAVEDAD = 0.1  # gravedad leve
+    COLORES = [(255, 80, 120), (255, 150, 200), (255, 0, 100)]
+    # El sprite cubre x ∈ [-4, 9], y ∈ [-4, 6] alrededor de la partícula
+    ORIGEN = (4, 4)
 
-# ------------------------------
-# Clase Agent
-# ------------------------------
-class Agent:
-    def __init__(self, x, y, gender, attr, fun, shar):
-        self.x = x
-        self.y = y
-        self.gender = gender
-        self.attr = attr
-        self.fun = fun
-        self.shar = shar
-        self.color = (66, 135, 245) if gender == 'M' else (245, 99, 173)
-        self.radius = 8
-        self.vx = random.choice([-2, -1, 1, 2])
-        self.vy = random.choice([-2, -1, 1, 2])
-        self.matched = False
-
-    def move(self, width, height):
-        if self.matched: return
-        self.x += self.vx
-        self.y += self.vy
-        if self.x <= 10 or self.x >= width - 10: self.vx *= -1
-        if self.y <= 10 or self.y >= height - 10: self.vy *= -1
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, (255,255,255), (int(self.x), int(self.y)), self.radius+2, 1)
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+    def __init__(self, capacidad=5000, seed=None):
+        self.capacidad = capacidad
+        self.rng = np.random.default_rng(seed)
+        self.x = np.empty(capacidad, dtype=np.float32)
+        self.y = np.empty(capacidad, dtype=np.float32)
+        self.vx = np.empty(capacidad, dtype=np.float32)
+        self.vy = np.empty(capacidad, dtype=np.float32)
+        self.life = np.empty(capacidad, dtype=np.int16)
+        self.color = np.empty(capacidad, dtype=np.uint8)
+        self.n = 0
+        self._sprites = None
+
+    def __len__(self):
+        return self.n
+
+    def vaciar(self):
+        self.n = 0
+
+    def emitir(self, cx, cy, por_punto=12):
+        """``por_punto`` partículas en cada centro (``cx``, ``cy`` arrays), hasta la capacidad."""
+        cx = np.repeat(np.asarray(cx, dtype=np.float32), por_punto)
+        cy = np.repeat(np.asarray(cy, dtype=np.float32), por_punto)
+        k = min(len(cx), self.capacidad - self.n)
+        if k <= 0:
+            return 0
+        sl = slice(self.n, self.n + k)
+        self.x[sl], self.y[sl] = cx[:k], cy[:k]
+        self.vx[sl] = self.rng.uniform(-2, 2, k)
+        self.vy[sl] = self.rng.uniform(-3, -0.5, k)
+        self.life[sl] = self.VIDA
+        self.color[sl] = self.rng.integers(0, len(self.COLORES), k)
+        self.n += k
+        return k
+
+    def actualizar(self):
+        """Avanza un frame y compacta las vivas al inicio de los arrays."""
+        n = self.n
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += self.GRAVEDAD
+        self.life[:n] -= 1
+        vivas = self.life[:n] > 0
+        k = int(vivas.sum())
+        if k < n:
+            for arr in (self.x, self.y, self.vx, self.vy, self.life, self.color):
+                arr[:k] = arr[:n][vivas]
+        self.n = k
+
+    def _crear_sprites(self):
+        # Mismo corazón que antes (dos círculos y un triángulo), dibujado una vez por color
+        sprites = []
+        ox, oy = self.ORIGEN
+        for color in self.COLORES:
+            s = pygame.Surface((14, 11), pygame.SRCALPHA)
+            pygame.draw.circle(s, color, (ox, oy), 4)
+            pygame.draw.circle(s, color, (ox + 5, oy), 4)
+            pygame.draw.polygon(s, color, [(ox - 3, oy), (ox + 8, oy), (ox + 2, oy + 6)])
+            sprites.append(s)
+        return sprites
+
+    def dibujar(self, screen, zonas=False):
+        """Dibuja las vivas; con ``zonas`` devuelve los rectángulos tocados (si no, ``None``)."""
+        if self.n == 0:
+            return []
+        if self._sprites is None:
+            self._sprites = self._crear_sprites()
+        ox, oy = self.ORIGEN
+        xs = (self.x[:self.n].astype(np.int32) - ox).tolist()
+        ys = (self.y[:self.n].astype(np.int32) - oy).tolist()
+        sprites = self._sprites
+        tocados = screen.blits([(sprites[c], (x, y)) for c, x, y in zip(self.color[:self.n].tolist(), xs, ys)],
+                               doreturn=zonas)
+        return tocados if zonas else None
 
 # ------------------------------
-# Clase principal
+# Clase principal (visor pygame sobre SimulationEngine)
 # ------------------------------
 class DatingMarketSimulationV42:
-    def __init__(self, n_agents=50, width=1280, height=720, rules_path="apriori_rules_GroupA.csv"):
+    MAX_AGENTS = 20000
+    AGENT_RADIUS = 8
+    COLOR_M = (66, 135, 245)
+    COLOR_F = (245, 99, 173)
+    COLOR_MATCH = (50, 255, 100)
+    FPS = 30
+    # Con más zonas cambiadas que esto se envía el mundo entero: una copia grande rinde más que cientos chicas
+    MAX_ZONAS = 256
+
+    def __init__(self, n_agents=50, width=1280, height=720, rules_path="apriori_rules_GroupA.csv",
+                 data_path="data/speed_dating_cleaned.csv", seed=None, perfil=None, max_particulas=5000,
+                 motor=None):
         pygame.init()
         self.width, self.height = width, height
         self.margin_right = 380
@@ -77,147 +125,271 @@ class DatingMarketSimulationV42:
         pygame.display.set_caption("💘 Dating Market Simulation v4.2 - Black Edition")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("arial", 22)
+        self.font_perfil = pygame.font.SysFont("monospace", 14)
+
+        # Render: el mundo se redibuja cada frame; el panel solo cuando cambia su texto
+        self.world_rect = pygame.Rect(0, 0, self.world_width, height)
+        self.panel_rect = pygame.Rect(self.world_width, 0, self.margin_right, height)
+        self.btn_rect = pygame.Rect(self.world_width + 100, height - 80, 160, 40)
+        self._textos = {}          # ranura -> (texto, superficie renderizada)
+        self._panel_lineas = None  # líneas con las que se compuso el panel actual
+        self._panel = self._fondo_panel = None
+        self._sprites_agente = None
+        self._fondo_perfil = {}
+        # Los agentes con match no se mueven: ellos y su línea se dibujan una vez en esta capa
+        self.capa_matches = pygame.Surface((self.world_width, height))
+        self.capa_matches.set_colorkey((0, 0, 0))
+        self._lineas_dibujadas = 0
+        # Zonas del mundo que cambiaron en este frame y en el anterior (None: todo el mundo)
+        self._zonas = []
+        self._zonas_previas = None
+
+        # Perfil por frame: con ruta se registra siempre; la tecla P muestra el overlay
+        self.perfil_path = perfil
+        self.perfil = PerfilFrames(perfil) if perfil else PERFIL_NULO
+        self.mostrar_perfil = False
 
-        # Modelo
-        self.model = ModelosGrupoA("data/speed_dating_cleaned.csv")
-        self.model.cargar_datos()
-        self.model.entrenar_modelos()
-        self.tree = self.model.models["Decision Tree"]
+        # Estado: todo vive en el motor, el visor solo dibuja
+        self.particles = PoolParticulas(max_particulas, seed)  # efectos visuales, con tope fijo
+        if motor is not None:
+            # Replay (registro_eventos.MotorReplay): ni modelo ni física, solo lo grabado
+            self.engine = motor
+            self.rules = motor.rules
+            self.n_agents, self.diversity = motor.n_agents, motor.diversity
+            motor.perfil = self.perfil
+            return
 
-        # Reglas
-        df = pd.read_csv(rules_path)
-        df = df[df["antecedents"].str.contains("attr|fun|shar", case=False, na=False)]
-        self.rules = [{"text": r["antecedents"], "strength": min(1.0, 0.6 + r["lift"]/2)} for _, r in df.iterrows()][:5]
+        # Modelo y reglas
+        self.prediction_table = load_prediction_table(data_path)
+        self.rules = load_rules(rules_path)
 
-        # Estado
         self.n_agents = n_agents
         self.diversity = 3
-        self.agents = []
-        self.total_matches = 0
-        self.total_interactions = 0
-        self.contact_memory = set()
-        self.matches_log = []
-        self.particles = []  # lista para efectos visuales
-        self.create_agents()
+        self.engine = SimulationEngine(rules=self.rules, prediction_table=self.prediction_table,
+                                       n_agents=n_agents, width=self.world_width,
+                                       height=height, diversity=self.diversity, seed=seed,
+                                       perfil=self.perfil)
 
     def create_agents(self):
-        self.agents.clear()
-        for i in range(self.n_agents):
-            g = 'M' if i < self.n_agents / 2 else 'F'
-            base = 5
-            attr = max(1, min(10, base + random.randint(-self.diversity, self.diversity)))
-            fun = max(1, min(10, base + random.randint(-self.diversity, self.diversity)))
-            shar = max(1, min(10, base + random.randint(-self.diversity, self.diversity)))
-            x, y = random.randint(50, self.world_width - 50), random.randint(50, self.height - 50)
-            self.agents.append(Agent(x, y, g, attr, fun, shar))
-        self.total_matches = 0
-        self.total_interactions = 0
-        self.contact_memory.clear()
-        self.matches_log.clear()
-        self.particles.clear()
+        self.engine.reset(self.n_agents, self.diversity)
+        # En un replay la población es la grabada: el panel muestra la del motor
+        self.n_agents, self.diversity = self.engine.n_agents, self.engine.diversity
+        self.particles.vaciar()
+        self._limpiar_capa_matches()
+
+    def _texto(self, ranura, texto, color, font=None):
+        """Superficie del texto de una ranura del panel; solo se vuelve a renderizar si cambió."""
+        previo = self._textos.get(ranura)
+        if previo is None or previo[0] != texto:
+            previo = (texto, (font or self.font).render(texto, True, color))
+            self._textos[ranura] = previo
+        return previo[1]
 
     def draw_panel(self):
-        x = self.world_width
-        s = pygame.Surface((self.margin_right, self.height))
-        s.set_alpha(230)
-        s.fill((25, 25, 25))
-        self.screen.blit(s, (x, 0))
+        """Compone el panel en una superficie propia y lo dibuja solo si cambió.
 
+        Devuelve ``(btn_rect, cambió)``: si no cambió, lo que está en pantalla sigue valiendo.
+        """
         lines = [
             "Dating Market Simulation v4.2 💞",
             f"Agents: {self.n_agents}",
             f"Diversity: ±{self.diversity}",
-            f"Interactions: {self.total_interactions}",
-            f"Matches: {self.total_matches}",
-            f"Success Rate: {self.total_matches/max(1,self.total_interactions)*100:.1f}%",
+            f"Interactions: {self.engine.total_interactions}",
+            f"Matches: {self.engine.total_matches}",
+            f"Success Rate: {self.engine.success_rate*100:.1f}%",
             "",
             "Apriori Rules:"
         ]
+        if lines == self._panel_lineas:
+            return self.btn_rect, False
+        self._panel_lineas = lines
+
+        if self._panel is None:
+            # Mismo tono que el panel translúcido (alpha 230) sobre fondo negro, ya compuesto
+            fondo = pygame.Surface((self.margin_right, self.height))
+            translucido = pygame.Surface((self.margin_right, self.height))
+            translucido.set_alpha(230)
+            translucido.fill((25, 25, 25))
+            fondo.fill((0, 0, 0))
+            fondo.blit(translucido, (0, 0))
+            self._fondo_panel = fondo
+            self._panel = fondo.copy()
+        panel = self._panel
+        panel.blit(self._fondo_panel, (0, 0))
         y = 20
-        for line in lines:
-            t = self.font.render(line, True, (255,255,255))
-            self.screen.blit(t, (x + 15, y)); y += 26
-        for rule in self.rules:
-            t = self.font.render(f"- {rule['text']}", True, (255,180,120))
-            self.screen.blit(t, (x + 25, y)); y += 22
+        for k, line in enumerate(lines):
+            panel.blit(self._texto(("linea", k), line, (255,255,255)), (15, y)); y += 26
+        for k, rule in enumerate(self.rules):
+            panel.blit(self._texto(("regla", k), f"- {rule['text']}", (255,180,120)), (25, y)); y += 22
 
         # Botón de reinicio
-        btn_rect = pygame.Rect(x + 100, self.height - 80, 160, 40)
-        pygame.draw.rect(self.screen, (255,105,180), btn_rect, border_radius=10)
-        txt = self.font.render("Restart ♻️", True, (0,0,0))
-        self.screen.blit(txt, (x + 115, self.height - 70))
-        return btn_rect
-
-    def check_interaction(self, a1, a2):
-        if a1.gender == a2.gender or a1.matched or a2.matched: return
-        pair = tuple(sorted((id(a1), id(a2))))
-        dist = math.hypot(a1.x - a2.x, a1.y - a2.y)
-        if dist < 25:
-            if pair not in self.contact_memory:
-                self.contact_memory.add(pair)
-                self.total_interactions += 1
-                df = pd.DataFrame({'attr_o':[a1.attr],'fun_o':[a1.fun],'int_corr':[abs(a1.shar - a2.shar)/10]})
-                prediction = self.tree.predict(df)[0]
-                # Reglas Apriori + boost visual
-                for rule in self.rules:
-                    r = rule["text"].lower(); s = rule["strength"]
-                    if "attr" in r and a1.attr>7 and a2.attr>7 and random.random()<s: prediction=1
-                    if "fun" in r and a1.fun>7 and a2.fun>7 and random.random()<s: prediction=1
-                    if "shar" in r and a1.shar>7 and a2.shar>7 and random.random()<s: prediction=1
-                if random.random()<0.25: prediction=1  # boost de matches
-                if prediction==1:
-                    a1.matched=a2.matched=True
-                    self.total_matches+=1
-                    self.matches_log.append((a1,a2))
-                    # efecto visual
-                    cx, cy = (a1.x + a2.x)/2, (a1.y + a2.y)/2
-                    for _ in range(12):
-                        self.particles.append(HeartParticle(cx, cy))
+        btn_local = self.btn_rect.move(-self.world_width, 0)
+        pygame.draw.rect(panel, (255,105,180), btn_local, border_radius=10)
+        panel.blit(self._texto("boton", "Restart ♻️", (0,0,0)), (115, self.height - 70))
+        self.screen.blit(panel, self.panel_rect.topleft)
+        return self.btn_rect, True
+
+    def update(self):
+        """Avanza el motor un tick y lanza el efecto visual de los matches nuevos."""
+        nuevos = self.engine.step()
+        if nuevos:
+            a, b = np.array(nuevos).T
+            self.particles.emitir((self.engine.x[a] + self.engine.x[b]) / 2,
+                                  (self.engine.y[a] + self.engine.y[b]) / 2)
+
+    def _crear_sprites_agente(self):
+        # Borde blanco + círculo de color, una vez por género; el negro es transparente (colorkey)
+        r = self.AGENT_RADIUS + 2
+        sprites = []
+        for color in (self.COLOR_F, self.COLOR_M):
+            s = pygame.Surface((2 * r + 1, 2 * r + 1))
+            pygame.draw.circle(s, (255,255,255), (r, r), r, 1)
+            pygame.draw.circle(s, color, (r, r), self.AGENT_RADIUS)
+            s.set_colorkey((0, 0, 0))
+            sprites.append(s.convert())
+        return sprites
+
+    def _blit_agentes(self, destino, idx):
+        """Dibuja los agentes ``idx``; devuelve sus rectángulos, o ``None`` si son más de ``MAX_ZONAS``."""
+        if self._sprites_agente is None:
+            self._sprites_agente = self._crear_sprites_agente()
+        eng, r, sprites = self.engine, self.AGENT_RADIUS + 2, self._sprites_agente
+        xs = (eng.x[idx].astype(int) - r).tolist()
+        ys = (eng.y[idx].astype(int) - r).tolist()
+        zonas = len(idx) <= self.MAX_ZONAS
+        tocados = destino.blits([(sprites[m], (x, y)) for m, x, y in zip(eng.male[idx].tolist(), xs, ys)],
+                                doreturn=zonas)
+        return tocados if zonas else None
+
+    def _marcar(self, zonas):
+        """Anota zonas del mundo que cambiaron en este frame; ``None`` (o demasiadas) es el mundo entero."""
+        if self._zonas is None:
+            return
+        if zonas is None or len(self._zonas) + len(zonas) > self.MAX_ZONAS:
+            self._zonas = None
+        else:
+            self._zonas.extend(zonas)
+
+    def draw_agents(self):
+        """Solo los agentes libres: los que tienen match ya están en la capa de matches."""
+        self._marcar(self._blit_agentes(self.screen, np.flatnonzero(~self.engine.matched)))
 
     def draw_particles(self):
-        for p in self.particles[:]:
-            p.draw(self.screen)
-            if not p.update():
-                self.particles.remove(p)
+        self._marcar(self.particles.dibujar(self.screen, zonas=len(self.particles) <= self.MAX_ZONAS))
+        self.particles.actualizar()
+
+    def _limpiar_capa_matches(self):
+        self.capa_matches.fill((0, 0, 0))
+        self._lineas_dibujadas = 0
+        # Desaparecen todos los matches dibujados
+        self._marcar(None)
 
     def draw_matches(self):
-        for a1,a2 in self.matches_log:
-            pygame.draw.line(self.screen,(50,255,100),(int(a1.x),int(a1.y)),(int(a2.x),int(a2.y)),2)
+        """Agrega a la capa persistente solo los matches nuevos (agentes + línea) y la dibuja."""
+        pares = self.engine.match_pairs
+        if len(pares) < self._lineas_dibujadas:  # el motor se reinició por fuera
+            self._limpiar_capa_matches()
+        nuevos = pares[self._lineas_dibujadas:]
+        if nuevos:
+            self._marcar(self._blit_agentes(self.capa_matches, np.array(nuevos).ravel()))
+        x, y = self.engine.x, self.engine.y
+        self._marcar([pygame.draw.line(self.capa_matches,self.COLOR_MATCH,(int(x[a]),int(y[a])),(int(x[b]),int(y[b])),2)
+                      for a,b in nuevos])
+        self._lineas_dibujadas = len(pares)
+        self.screen.blit(self.capa_matches, (0, 0))
 
-    def run(self):
+    def toggle_perfil(self):
+        """Muestra/oculta el overlay; sin log ni overlay no se mide nada."""
+        self.mostrar_perfil = not self.mostrar_perfil
+        if self.mostrar_perfil and self.perfil is PERFIL_NULO:
+            self.perfil = PerfilFrames()
+        elif not self.mostrar_perfil and not self.perfil_path:
+            self.perfil = PERFIL_NULO
+        self.engine.perfil = self.perfil
+
+    def draw_perfil(self):
+        lineas = [f"{nombre:<15}{ms:7.2f} ms" for nombre, ms in self.perfil.promedios().items()]
+        fondo = self._fondo_perfil.get(len(lineas))
+        if fondo is None:
+            fondo = pygame.Surface((230, 18 * len(lineas) + 12))
+            fondo.set_alpha(180)
+            fondo.fill((20, 20, 20))
+            self._fondo_perfil[len(lineas)] = fondo
+        self._marcar([self.screen.blit(fondo, (10, 10))])
+        for k, linea in enumerate(lineas):
+            self.screen.blit(self._texto(("perfil", k), linea, (180, 255, 180), self.font_perfil), (16, 16 + 18 * k))
+
+    def run(self, frames=None):
+        """Bucle principal; con ``frames`` se cierra solo tras ese número de frames."""
         running=True
-        while running:
+        frame=0
+        while running and (frames is None or frame < frames):
+            frame+=1
+            self._zonas = []
+            self.perfil.iniciar_frame()
+            with self.perfil.seccion("draw_panel"):
+                btn_rect, panel_nuevo = self.draw_panel()
+            # Todo lo del mundo queda recortado a su zona: el panel no se ensucia
+            self.screen.set_clip(self.world_rect)
             self.screen.fill((0,0,0))
-            btn_rect=self.draw_panel()
 
             for e in pygame.event.get():
                 if e.type==pygame.QUIT: running=False
                 elif e.type==pygame.KEYDOWN:
-                    if e.key==pygame.K_UP: self.n_agents=min(100,self.n_agents+2); self.create_agents()
-                    elif e.key==pygame.K_DOWN: self.n_agents=max(10,self.n_agents-2); self.create_agents()
+                    if e.key==pygame.K_UP: self.n_agents=min(self.MAX_AGENTS,self.n_agents+max(2,self.n_agents//10)); self.create_agents()
+                    elif e.key==pygame.K_DOWN: self.n_agents=max(10,self.n_agents-max(2,self.n_agents//11)); self.create_agents()
                     elif e.key==pygame.K_RIGHT: self.diversity=min(5,self.diversity+1); self.create_agents()
                     elif e.key==pygame.K_LEFT: self.diversity=max(1,self.diversity-1); self.create_agents()
+                    elif e.key==pygame.K_p: self.toggle_perfil()
                     elif e.key==pygame.K_q: running=False
                 elif e.type==pygame.MOUSEBUTTONDOWN:
                     if btn_rect.collidepoint(e.pos): self.create_agents()
 
-            for ag in self.agents:
-                ag.move(self.world_width,self.height)
-                ag.draw(self.screen)
-            for i in range(len(self.agents)):
-                for j in range(i+1,len(self.agents)):
-                    self.check_interaction(self.agents[i],self.agents[j])
+            self.update()
+            with self.perfil.seccion("draw_agents"):
+                self.draw_agents()
 
-            self.draw_matches()
-            self.draw_particles()
+            with self.perfil.seccion("draw_matches"):
+                self.draw_matches()
+            with self.perfil.seccion("draw_particles"):
+                self.draw_particles()
+            if self.mostrar_perfil:
+                self.draw_perfil()
+            self.screen.set_clip(None)
 
-            pygame.display.flip()
-            self.clock.tick(30)
+            # Solo se envían a pantalla las zonas que cambiaron: lo dibujado en este frame
+            # y lo del anterior (ahí quedó fondo negro). El mundo se sigue componiendo entero
+            # en la superficie; lo que se ahorra es la copia a la ventana
+            if frame == 1:
+                pygame.display.flip()
+            else:
+                if self._zonas is None or self._zonas_previas is None:
+                    zonas = [self.world_rect]
+                else:
+                    zonas = self._zonas + self._zonas_previas
+                pygame.display.update(zonas + [self.panel_rect] if panel_nuevo else zonas)
+            self._zonas_previas = self._zonas
+            self.perfil.cerrar_frame(agentes=self.n_agents)
+            self.clock.tick(self.FPS)
+        self.perfil.cerrar()
         pygame.quit()
 
 
 if __name__=="__main__":
-    sim=DatingMarketSimulationV42()
+    import argparse
+    parser = argparse.ArgumentParser(description="Visor de la simulación (en vivo o replay de una corrida grabada)")
+    parser.add_argument("--replay", help="directorio grabado con simulation_engine.py --registro")
+    parser.add_argument("--velocidad", type=float, default=1.0, help="ticks por frame en el replay")
+    args = parser.parse_args()
+
+    # DATING_PERFIL_FRAMES=frames.jsonl guarda los ms por sección de cada frame
+    perfil = os.environ.get("DATING_PERFIL_FRAMES")
+    if args.replay:
+        from registro_eventos import MotorReplay
+        motor = MotorReplay(args.replay, args.velocidad)
+        sim = DatingMarketSimulationV42(width=motor.width + 380, height=motor.height, perfil=perfil, motor=motor)
+    else:
+        sim = DatingMarketSimulationV42(perfil=perfil)
     sim.run()
 
 
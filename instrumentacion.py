@@ -0,0 +1,239 @@
+# ==========================================
+# Instrumentación opcional por etapas y por frame
+# Tiempo de pared, CPU y pico de memoria → log estructurado (JSON lines)
+# Se activa con la variable de entorno DATING_PERFIL=ruta.jsonl (o activar(ruta))
+# ==========================================
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+
+# Apagada, etapa() devuelve siempre este mismo objeto y no mide nada
+_NULO = nullcontext()
+_ESTADO = {"ruta": os.environ.get("DATING_PERFIL") or None}
+_LOCK = threading.Lock()
+
+
+def activar(ruta):
+    """Empieza a registrar etapas en ``ruta`` (se agregan líneas, no se sobrescribe)."""
+    _ESTADO["ruta"] = ruta
+
+
+def desactivar():
+    _ESTADO["ruta"] = None
+
+
+def activa():
+    return _ESTADO["ruta"] is not None
+
+
+# ===========================
+# Memoria
+# ===========================
+def rss_mb():
+    """RSS actual del proceso en Linux (/proc); None donde no existe."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PicoRSS(threading.Thread):
+    """Muestrea el RSS del proceso cada ``intervalo`` segundos y guarda el máximo."""
+
+    def __init__(self, intervalo=0.005):
+        super().__init__(daemon=True)
+        self.intervalo, self.pico, self._fin = intervalo, rss_mb(), threading.Event()
+
+    def run(self):
+        while not self._fin.wait(self.intervalo):
+            self.pico = max(self.pico, rss_mb())
+
+    def detener(self):
+        self._fin.set()
+        self.join()
+        self.pico = max(self.pico, rss_mb())
+        return self.pico
+
+
+class _Medicion:
+    """Tiempo de pared, CPU del proceso y pico de memoria entre ``iniciar`` y ``terminar``.
+
+    La memoria es el aumento máximo de RSS sobre el inicio, muestreado en un
+    hilo: incluye lo que reservan las librerías nativas (XGBoost, Arrow) y no
+    frena el código Python. Sin /proc (fuera de Linux) se usa tracemalloc, que
+    solo ve las asignaciones de Python/NumPy y encarece bastante el tiempo.
+    """
+
+    def iniciar(self):
+        self.base = rss_mb()
+        self.tracemalloc = self.base is None and not tracemalloc.is_tracing()
+        if self.base is not None:
+            self.muestreo = PicoRSS()
+            self.muestreo.start()
+        elif self.tracemalloc:
+            tracemalloc.start()
+        self.w0, self.c0 = time.perf_counter(), time.process_time()
+        return self
+
+    def terminar(self):
+        wall, cpu = time.perf_counter() - self.w0, time.process_time() - self.c0
+        if self.base is not None:
+            pico, metodo = self.muestreo.detener() - self.base, "rss"
+        elif self.tracemalloc:
+            pico, metodo = tracemalloc.get_traced_memory()[1] / 2**20, "tracemalloc"
+            tracemalloc.stop()
+        else:
+            # tracemalloc ya lo usa una etapa externa: no se puede aislar el pico de esta
+            pico, metodo = None, None
+        return {"wall_s": wall, "cpu_s": cpu, "pico_mb": pico, "memoria": metodo}
+
+
+def medir(fn, *args, **kwargs):
+    """Corre ``fn`` y devuelve ``(resultado, {"wall_s", "cpu_s", "pico_mb", "memoria"})``."""
+    m = _Medicion().iniciar()
+    salida = fn(*args, **kwargs)
+    return salida, m.terminar()
+
+
+# ===========================
+# Etapas
+# ===========================
+def _escribir(registro):
+    ruta = _ESTADO["ruta"]
+    if ruta is None:
+        return
+    linea = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+    with _LOCK, open(ruta, "a", encoding="utf-8") as f:
+        f.write(linea)
+
+
+class _Etapa:
+    def __init__(self, nombre, meta):
+        self.nombre, self.meta = nombre, meta
+
+    def __enter__(self):
+        self.medicion = _Medicion().iniciar()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        registro = {"t": time.time(), "pid": os.getpid(), "hilo": threading.current_thread().name,
+                    "etapa": self.nombre, **self.medicion.terminar(), **self.meta}
+        if tipo is not None:
+            registro["error"] = tipo.__name__
+        _escribir(registro)
+        return False
+
+
+def etapa(nombre, **meta):
+    """Context manager que registra una etapa con ``meta`` extra (filas, modelo...).
+
+    Apagada la instrumentación, devuelve un contexto vacío compartido.
+    """
+    if _ESTADO["ruta"] is None:
+        return _NULO
+    return _Etapa(nombre, meta)
+
+
+def instrumentar(nombre):
+    """Decorador: cada llamada a la función queda registrada como la etapa ``nombre``."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            if _ESTADO["ruta"] is None:
+                return fn(*args, **kwargs)
+            with _Etapa(nombre, {}):
+                return fn(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+# ===========================
+# Tiempos por frame (simulación)
+# ===========================
+class _Seccion:
+    __slots__ = ("perfil", "nombre", "t0")
+
+    def __init__(self, perfil, nombre):
+        self.perfil, self.nombre = perfil, nombre
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        actual = self.perfil.actual
+        actual[self.nombre] = actual.get(self.nombre, 0.0) + (time.perf_counter() - self.t0) * 1000
+        return False
+
+
+class PerfilFrames:
+    """Milisegundos por sección de cada frame (o tick), para un overlay y un log JSON lines.
+
+    ``seccion(nombre)`` acumula el tiempo de un bloque dentro del frame y
+    ``cerrar_frame()`` lo guarda (y lo escribe en ``ruta`` si se dio); si se
+    llamó ``iniciar_frame()``, también guarda el total como ``frame``.
+    ``promedios()`` da la media de las últimas ``ventana`` frames.
+    """
+
+    def __init__(self, ruta=None, ventana=30):
+        self.ruta = ruta
+        self._archivo = open(ruta, "a", encoding="utf-8") if ruta else None
+        self.historial = deque(maxlen=ventana)
+        self.actual = {}
+        self.frame = 0
+        self._t0 = None
+
+    def seccion(self, nombre):
+        return _Seccion(self, nombre)
+
+    def iniciar_frame(self):
+        self._t0 = time.perf_counter()
+
+    def cerrar_frame(self, **meta):
+        self.frame += 1
+        if self._t0 is not None:
+            self.actual["frame"] = (time.perf_counter() - self._t0) * 1000
+            self._t0 = None
+        self.historial.append(self.actual)
+        if self._archivo is not None:
+            self._archivo.write(json.dumps({"frame": self.frame, "ms": self.actual, **meta}) + "\n")
+        self.actual = {}
+
+    def promedios(self):
+        if not self.historial:
+            return {}
+        nombres = {n for frame in self.historial for n in frame}
+        return {n: sum(f.get(n, 0.0) for f in self.historial) / len(self.historial) for n in sorted(nombres)}
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+
+class _PerfilNulo:
+    """Perfil apagado: mismas llamadas que ``PerfilFrames`` sin medir nada."""
+
+    def seccion(self, nombre):
+        return _NULO
+
+    def iniciar_frame(self):
+        pass
+
+    def cerrar_frame(self, **meta):
+        pass
+
+    def promedios(self):
+        return {}
+
+    def cerrar(self):
+        pass
+
+
+PERFIL_NULO = _PerfilNulo()
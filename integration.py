@@ -1,20 +1,31 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.sax.saxutils import escape
+
 import pandas as pd
-from sklearn.tree import export_text
-import matplotlib.pyplot as plt
-import seaborn as sns
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 from modelos_grupoA import ModelosGrupoA
+from rule_store import leer_reglas, texto_items
+from instrumentacion import etapa, instrumentar
 
 
 class IntegracionSintesisPDF:
-    def __init__(self, reglas_path="apriori_rules_GroupA.csv", data_path="data/speed_dating_cleaned.csv", output_path="data/Informe_Integracion_Sintesis.pdf"):
+    def __init__(self, reglas_path="apriori_rules_GroupA.csv", data_path="data/speed_dating_cleaned.csv", output_path="data/Informe_Integracion_Sintesis.pdf",
+                 reglas=None, titulo=None, datos=None, data_hash=None):
         self.reglas_path = reglas_path
         self.data_path = data_path
         self.output_path = output_path
-        self.reglas = None
+        # Un AlmacenReglas ya cargado (informes por segmento) evita releer las reglas
+        self.reglas = reglas
+        self.titulo = titulo
+        # Filas ya en memoria (informes por segmento) con el hash que las identifica en el caché de modelos
+        self.datos = datos
+        self.data_hash = data_hash
         self.reglas_filtradas = None
         self.modelo = None
 
@@ -22,11 +33,14 @@ class IntegracionSintesisPDF:
     # Cargar reglas Apriori
     # =======================
     def cargar_reglas(self):
-        self.reglas = pd.read_csv(self.reglas_path)
-        self.reglas_filtradas = self.reglas[
-            self.reglas['antecedents'].str.contains('attr|fun|shar', case=False, na=False)
-            & self.reglas['consequents'].str.contains('match', case=False, na=False)
-        ].sort_values(by='lift', ascending=False)
+        if self.reglas is None:
+            self.reglas = leer_reglas(self.reglas_path)
+        # Filtro sobre los ítems (una vez por ítem distinto) y cruce de ids en el índice
+        con_atributos = set(self.reglas.donde_item(lambda it: any(k in it.lower() for k in ('attr', 'fun', 'shar'))))
+        con_match = self.reglas.donde_item(lambda it: 'match' in it.lower(), en="consecuente")
+        self.reglas_filtradas = self.reglas.seleccionar(
+            [k for k in con_match if k in con_atributos]
+        ).dataframe().sort_values(by='lift', ascending=False)
         return self.reglas_filtradas.head(5)
 
     # =======================
@@ -34,21 +48,34 @@ class IntegracionSintesisPDF:
     # =======================
     def entrenar_modelo(self):
         self.modelo = ModelosGrupoA(self.data_path)
-        self.modelo.cargar_datos()
-        self.modelo.entrenar_modelos()
+        if self.datos is None:
+            self.modelo.cargar_datos()
+        else:
+            self.modelo.usar_datos(self.datos, self.data_hash)
+        self.modelo.entrenar_modelos(["Decision Tree"])
         return self.modelo.models["Decision Tree"]
 
     # =======================
     # Extraer estructura del árbol
     # =======================
     def extraer_reglas_arbol(self):
+        from sklearn.tree import export_text
         tree_model = self.modelo.models["Decision Tree"]
         return export_text(tree_model, feature_names=self.modelo.X_train.columns)
 
     # =======================
     # Generar informe PDF
     # =======================
+    @instrumentar("informe_pdf")
     def generar_informe(self):
+        # Gráficos y PDF solo se importan al generar el informe
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+
         print("\n📝 Generando informe PDF de Integración y Síntesis...")
 
         reglas_top = self.cargar_reglas()
@@ -67,18 +94,25 @@ class IntegracionSintesisPDF:
         sns.barplot(data=importancia_df, x='Importancia', y='Variable', palette='viridis')
         plt.title("Importancia de Variables (Decision Tree)")
         plt.tight_layout()
-        grafico_path = "data/importancia_variables.png"
-        plt.savefig(grafico_path)
+        # En memoria: cada informe tiene su propio gráfico, sin rutas compartidas entre procesos
+        grafico = io.BytesIO()
+        plt.savefig(grafico, format="png")
         plt.close()
+        grafico.seek(0)
 
         # === Crear PDF ===
-        doc = SimpleDocTemplate(self.output_path, pagesize=letter)
+        # Se escribe a un temporal propio y se renombra: nunca queda un PDF a medias
+        tmp_path = f"{self.output_path}.{os.getpid()}.tmp"
+        doc = SimpleDocTemplate(tmp_path, pagesize=letter)
         styles = getSampleStyleSheet()
         elements = []
 
         # Portada
         elements.append(Paragraph("<b>Componente 5: Integración y Síntesis</b>", styles['Title']))
         elements.append(Spacer(1, 12))
+        if self.titulo:
+            elements.append(Paragraph(f"<b>Segmento:</b> {escape(self.titulo)}", styles['Heading3']))
+            elements.append(Spacer(1, 12))
         elements.append(Paragraph("Este componente integra los resultados del análisis Apriori y los modelos predictivos (Decision Tree, Random Forest y XGBoost), mostrando su coherencia e interpretación conjunta.", styles['BodyText']))
         elements.append(Spacer(1, 20))
 
@@ -86,7 +120,7 @@ class IntegracionSintesisPDF:
         elements.append(Paragraph("<b>1. Reglas Apriori más relevantes</b>", styles['Heading2']))
         data = [["Antecedentes", "Consecuentes", "Support", "Confidence", "Lift"]]
         for _, r in reglas_top.iterrows():
-            data.append([r["antecedents"], r["consequents"], f"{r['support']:.2f}", f"{r['confidence']:.2f}", f"{r['lift']:.2f}"])
+            data.append([texto_items(r["antecedents"]), texto_items(r["consequents"]), f"{r['support']:.2f}", f"{r['confidence']:.2f}", f"{r['lift']:.2f}"])
         tabla = Table(data, hAlign="LEFT")
         tabla.setStyle(TableStyle([("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey), ("GRID", (0, 0), (-1, -1), 0.5, colors.grey)]))
         elements.append(tabla)
@@ -99,7 +133,7 @@ class IntegracionSintesisPDF:
 
         # Importancia de variables
         elements.append(Paragraph("<b>3. Importancia de variables</b>", styles['Heading2']))
-        elements.append(Image(grafico_path, width=400, height=300))
+        elements.append(Image(grafico, width=400, height=300))
         elements.append(Spacer(1, 20))
 
         # Síntesis final
@@ -118,14 +152,166 @@ class IntegracionSintesisPDF:
         elements.append(Paragraph(texto, styles['BodyText']))
 
         # Generar PDF
-        doc.build(elements)
+        with etapa("pdf_build", ruta=self.output_path):
+            doc.build(elements)
+        os.replace(tmp_path, self.output_path)
         print(f"✅ Informe generado exitosamente en: {self.output_path}")
 
 
+# =======================
+# Informes por segmento
+# =======================
+# Columnas que necesita el modelo en el dataset de cada segmento
+COLUMNAS_MODELO = ['match', 'attr_o', 'fun_o', 'int_corr']
+
+# Estado por proceso: reglas y dataset llegan una sola vez al arrancar cada worker
+_WORKER = {}
+
+
+def _init_worker(reglas_path, datos, columnas):
+    _WORKER["reglas"] = leer_reglas(reglas_path)
+    _WORKER["datos"] = datos
+    # Posiciones de las filas de cada segmento: cada tarea solo recorta, sin releer ni reagrupar
+    _WORKER["grupos"] = {col: datos.groupby(col, sort=True).indices for col in columnas}
+
+
+def _informe_segmento(task):
+    clave, titulo, col, valor, huella, data_path, reglas_path, pdf_path = task
+    t0 = time.perf_counter()
+    filas = _WORKER["datos"].iloc[_WORKER["grupos"][col][valor]]
+    IntegracionSintesisPDF(reglas_path, data_path, pdf_path, reglas=_WORKER["reglas"], titulo=titulo,
+                           datos=filas, data_hash=huella).generar_informe()
+    return clave, time.perf_counter() - t0
+
+
+def _nombre_archivo(texto):
+    return re.sub(r"[^\w.-]+", "_", str(texto)).strip("_") or "vacio"
+
+
+def generar_informes_por_segmento(columnas=("wave",), data_path="data/speed_dating_cleaned.csv",
+                                  reglas_path="apriori_rules_GroupA.csv", out_dir="data/informes",
+                                  workers=None, min_filas=50, forzar=False):
+    """Un informe PDF por cada valor de cada columna de ``columnas`` (evento, wave, ciudad...).
+
+    El dataset se lee una vez y cada worker lo recibe una sola vez al
+    arrancar; cada informe recorta sus filas en memoria. La firma de un
+    segmento (huella de sus filas + hash de las reglas) queda en
+    ``out_dir/informes_estado.json`` y la huella de las filas es también su
+    clave en el caché de ``ModelosGrupoA``, así que un segmento sin cambios
+    reutiliza su árbol. Si la firma no cambió y el PDF existe, el segmento se
+    salta sin escribir nada; los PDF de segmentos de estas columnas que ya no
+    tienen informe (desaparecieron o quedaron con pocos datos) se borran.
+    Segmentos con menos de ``min_filas`` filas completas o sin ambas clases se
+    omiten. Devuelve un dict segmento -> ``"ok"``, ``"cache"``, ``"omitido"``,
+    ``"error"`` o ``"eliminado"``.
+    """
+    from data_store import hash_archivo, leer_dataset
+    columnas = list(columnas)
+    df = leer_dataset(data_path, list(dict.fromkeys(columnas + COLUMNAS_MODELO)))
+    os.makedirs(out_dir, exist_ok=True)
+    estado_path = os.path.join(out_dir, "informes_estado.json")
+    estado = {}
+    if os.path.exists(estado_path):
+        with open(estado_path, encoding="utf-8") as f:
+            estado = json.load(f)
+    hash_reglas = hash_archivo(reglas_path)
+
+    resultado, tasks, nuevos = {}, [], {}
+    for col in columnas:
+        for valor, grupo in df.groupby(col, sort=True):
+            clave = f"{col}={valor}"
+            filas = grupo[COLUMNAS_MODELO].dropna()
+            if len(filas) < min_filas or filas['match'].nunique() < 2:
+                resultado[clave] = "omitido"
+                continue
+            huella = hashlib.sha256(pd.util.hash_pandas_object(filas, index=False).values.tobytes()).hexdigest()
+            firma = hashlib.sha256((huella + hash_reglas).encode()).hexdigest()
+            pdf = f"Informe_{_nombre_archivo(col)}_{_nombre_archivo(valor)}.pdf"
+            pdf_path = os.path.join(out_dir, pdf)
+            registro = estado.get(clave, {})
+            if not forzar and registro.get("firma") == firma and os.path.exists(pdf_path):
+                resultado[clave] = "cache"
+                continue
+            nuevos[clave] = {"columna": col, "firma": firma, "pdf": pdf}
+            tasks.append((clave, f"{col} = {valor} ({len(filas)} citas)", col, valor, huella,
+                          data_path, reglas_path, pdf_path))
+
+    def guardar_estado():
+        tmp = estado_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, indent=1, sort_keys=True)
+        os.replace(tmp, estado_path)
+
+    # Segmentos de estas columnas que ya no tienen informe: fuera su PDF y su entrada
+    vigentes = {c for c, r in resultado.items() if r == "cache"} | nuevos.keys()
+    for clave in [c for c, r in estado.items() if r["columna"] in columnas and c not in vigentes]:
+        pdf_path = os.path.join(out_dir, estado.pop(clave)["pdf"])
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        if resultado.get(clave) != "omitido":
+            resultado[clave] = "eliminado"
+    guardar_estado()
+
+    cuenta = lambda r: sum(v == r for v in resultado.values())
+    print(f"\n🗂️ {len(vigentes) + cuenta('omitido')} segmentos: {len(tasks)} por generar, "
+          f"{cuenta('cache')} sin cambios, {cuenta('omitido')} con pocos datos, {cuenta('eliminado')} eliminados")
+    workers = workers or os.cpu_count() or 1
+
+    def terminar(clave, segundos=None, error=None):
+        if error is None:
+            resultado[clave] = "ok"
+            estado[clave] = nuevos[clave]
+        else:
+            resultado[clave] = "error"
+            # Sin firma: se reintenta la próxima vez, pero el PDF anterior sigue registrado
+            estado[clave] = dict(nuevos[clave], firma=None)
+            print(f"❌ {clave}: {error!r}")
+        # El estado se guarda tras cada informe: una corrida cortada no repite lo hecho
+        guardar_estado()
+
+    if workers == 1:
+        _init_worker(reglas_path, df, columnas)
+        for task in tasks:
+            try:
+                terminar(*_informe_segmento(task))
+            except Exception as e:
+                terminar(task[0], error=e)
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(reglas_path, df, columnas)) as pool:
+            futuros = {pool.submit(_informe_segmento, task): task[0] for task in tasks}
+            for fut in as_completed(futuros):
+                try:
+                    terminar(*fut.result())
+                except Exception as e:
+                    terminar(futuros[fut], error=e)
+    return resultado
+
+
 # =======================
 # Ejecución
 # =======================
 if __name__ == "__main__":
-    integracion_pdf = IntegracionSintesisPDF()
-    integracion_pdf.generar_informe()
+    parser = argparse.ArgumentParser(description="Informe PDF de integración (general o por segmento)")
+    parser.add_argument("--segmentos", default=None,
+                        help="columnas separadas por coma (p. ej. wave): un informe por valor de cada una")
+    parser.add_argument("--data", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--reglas", default="apriori_rules_GroupA.csv")
+    parser.add_argument("--out-dir", default="data/informes")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-filas", type=int, default=50)
+    parser.add_argument("--forzar", action="store_true", help="regenera aunque el segmento no haya cambiado")
+    args = parser.parse_args()
+
+    if args.segmentos:
+        # Los workers no abren ventanas: los gráficos van directo al PDF
+        os.environ["MPLBACKEND"] = "Agg"
+        t0 = time.perf_counter()
+        resultado = generar_informes_por_segmento(args.segmentos.split(","), args.data, args.reglas, args.out_dir,
+                                                  args.workers, args.min_filas, args.forzar)
+        print(f"\n🏁 {sum(r == 'ok' for r in resultado.values())} informes generados en "
+              f"{time.perf_counter() - t0:.1f}s en: {args.out_dir}")
+    else:
+        integracion_pdf = IntegracionSintesisPDF(args.reglas, args.data)
+        integracion_pdf.generar_informe()
 
@@ -3,23 +3,73 @@
 # Grupo A: Atractivo, Diversión, Intereses Compartidos
 # ==========================================
 
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.tree import DecisionTreeClassifier, plot_tree
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import (
-    accuracy_score,
-    classification_report,
-    confusion_matrix
-)
-from xgboost import XGBClassifier
+from data_store import archivos_lectura, hash_archivo, leer_dataset
+from instrumentacion import etapa
+
+# sklearn, joblib, XGBoost, matplotlib y seaborn se importan en el método que los usa:
+# importar el módulo es instantáneo y la simulación y el informe (solo el Decision Tree)
+# no cargan XGBoost ni las librerías de gráficos
+
+
+def _version(paquete):
+    # Versión instalada sin importar el paquete (importar xgboost cuesta más que entrenar el árbol)
+    try:
+        return metadata.version(paquete)
+    except metadata.PackageNotFoundError:
+        return None
+
 
 class ModelosGrupoA:
-    def __init__(self, data_path="data/speed_dating_cleaned.csv"):
+    # Partición train/test
+    TEST_SIZE = 0.3
+    RANDOM_STATE = 42
+
+    # Hiperparámetros de cada modelo (forman parte de la clave de caché)
+    HIPERPARAMETROS = {
+        "Decision Tree": dict(max_depth=4, random_state=42, class_weight='balanced'),
+        "Random Forest": dict(n_estimators=200, max_depth=6, random_state=42, class_weight='balanced'),
+        "XGBoost": dict(random_state=42, n_estimators=250, learning_rate=0.1, max_depth=5,
+                        subsample=0.8, colsample_bytree=0.8, eval_metric='logloss'),
+    }
+
+    # Espacios de búsqueda del modo de ajuste. El recurso de successive halving es el número de
+    # árboles/rondas (RF, XGBoost) o de filas (Decision Tree): los candidatos malos se descartan
+    # con poco cómputo y solo los mejores llegan al recurso completo
+    ESPACIOS = {
+        "Decision Tree": {
+            "max_depth": [2, 3, 4, 5, 6, 8, 10, 12, None],
+            "min_samples_leaf": [1, 5, 10, 20, 50, 100],
+            "criterion": ["gini", "entropy"],
+        },
+        "Random Forest": {
+            "max_depth": [3, 4, 6, 8, 10, 12, None],
+            "min_samples_leaf": [1, 5, 10, 20, 50],
+            "max_features": [1, 2, 3],
+            "bootstrap": [True, False],
+        },
+        "XGBoost": {
+            "learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2, 0.3],
+            "max_depth": [2, 3, 4, 5, 6, 8],
+            "min_child_weight": [1, 3, 5, 10],
+            "subsample": [0.6, 0.7, 0.8, 0.9, 1.0],
+            "colsample_bytree": [0.67, 1.0],
+            "reg_lambda": [0.1, 1.0, 10.0],
+        },
+    }
+    RECURSO = {"Decision Tree": ("n_samples", None), "Random Forest": ("n_estimators", 400),
+               "XGBoost": ("n_estimators", 400)}
+
+    def __init__(self, data_path="data/speed_dating_cleaned.csv", cache_dir="data/model_cache"):
         self.data_path = data_path
+        self.cache_dir = cache_dir
+        self.data_hash = None
         self.models = {}
         self.results = {}
         self.metrics_df = None
@@ -28,60 +78,260 @@ class ModelosGrupoA:
     # 1. Cargar y preparar datos
     # ===========================
     def cargar_datos(self):
-        df = pd.read_csv(self.data_path)
+        self.data_hash = self._hash_datos()
         cols = ['match', 'attr_o', 'fun_o', 'int_corr']
-        data = df[cols].dropna()
+        self._dividir(leer_dataset(self.data_path, cols))
+
+    def usar_datos(self, data, data_hash):
+        """Como ``cargar_datos`` pero con filas ya en memoria; ``data_hash`` identifica su contenido en el caché."""
+        self.data_hash = data_hash
+        self._dividir(data)
+
+    def _dividir(self, data):
+        from sklearn.model_selection import train_test_split
+        data = data[['match', 'attr_o', 'fun_o', 'int_corr']].dropna()
         X = data[['attr_o', 'fun_o', 'int_corr']]
         y = (data['match'] == 1).astype(int)
         self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
-            X, y, test_size=0.3, random_state=42, stratify=y
+            X, y, test_size=self.TEST_SIZE, random_state=self.RANDOM_STATE, stratify=y
         )
         print(f"✅ Datos cargados y divididos: {self.X_train.shape[0]} entrenamiento / {self.X_test.shape[0]} prueba")
 
     # ===========================
-    # 2. Entrenar modelos
+    # Caché de modelos entrenados
     # ===========================
-    def entrenar_modelos(self):
-        # Calcular proporción de clases
-        pos_weight = (self.y_train.value_counts()[0] / self.y_train.value_counts()[1])
-        print(f"\n⚖️ Balance de clases - scale_pos_weight (XGBoost): {pos_weight:.2f}")
-
-        # Decision Tree balanceado
-        self.models["Decision Tree"] = DecisionTreeClassifier(
-            max_depth=4, random_state=42, class_weight='balanced'
-        )
+    def _hash_datos(self):
+        """SHA-256 de lo que realmente se lee (Parquet y sus partes, o CSV); se recuerda por tamaño y mtime."""
+        ruta_huellas = os.path.join(self.cache_dir, "huellas_datos.json")
+        try:
+            with open(ruta_huellas, encoding="utf-8") as f:
+                huellas = json.load(f)
+        except (OSError, ValueError):
+            huellas = {}
+        previas = dict(huellas)
+        hashes = [hash_archivo(p, huellas) for p in archivos_lectura(self.data_path)]
+        # Un solo archivo: su hash tal cual (las claves de caché no cambian si no hay partes)
+        h = hashes[0] if len(hashes) == 1 else hashlib.sha256(" ".join(hashes).encode()).hexdigest()
+        if huellas != previas:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = ruta_huellas + f".{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(huellas, f)
+            os.replace(tmp, ruta_huellas)
+        return h
 
-        # Random Forest balanceado
-        self.models["Random Forest"] = RandomForestClassifier(
-            n_estimators=200, max_depth=6, random_state=42, class_weight='balanced'
-        )
+    def ruta_cacheada(self, name):
+        """Ruta en caché del modelo ``name`` con sus hiperparámetros por defecto (exista o no)."""
+        self.data_hash = self._hash_datos()
+        return self._ruta_cache(name, dict(self.HIPERPARAMETROS[name]))
 
-        # XGBoost con peso ajustado
-        self.models["XGBoost"] = XGBClassifier(
-            random_state=42,
-            n_estimators=250,
-            learning_rate=0.1,
-            max_depth=5,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            eval_metric='logloss',
-            scale_pos_weight=pos_weight
-        )
+    def cargar_cacheado(self, name):
+        """El modelo ``name`` con sus hiperparámetros por defecto, solo si ya está en caché.
+
+        La clave sale del hash de los datos y los parámetros, así que no se lee
+        el dataset ni se importa ``sklearn.model_selection``: es el camino
+        rápido de la simulación. Devuelve ``None`` si no está (o si el modelo
+        depende de los datos de entrenamiento, como el peso de XGBoost).
+        """
+        if name == "XGBoost":
+            return None
+        ruta = self.ruta_cacheada(name)
+        if not os.path.exists(ruta):
+            return None
+        import joblib
+        model, resultado = joblib.load(ruta)
+        self.models[name] = model
+        self.results[name] = dict(resultado, cached=True)
+        print(f"{name} cargado desde caché ♻️")
+        return model
+
+    def _clave_cache(self, name, params):
+        # Contenido de los datos + partición + hiperparámetros + versiones de librerías
+        clave = {
+            "formato": 2,
+            "data": self.data_hash,
+            "split": {"test_size": self.TEST_SIZE, "random_state": self.RANDOM_STATE},
+            "model": name,
+            "params": params,
+            "versions": {"sklearn": _version("scikit-learn"), "xgboost": _version("xgboost")},
+        }
+        texto = json.dumps(clave, sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode()).hexdigest()[:20]
+
+    def _ruta_cache(self, name, params):
+        slug = name.lower().replace(" ", "_")
+        return os.path.join(self.cache_dir, f"{slug}_{self._clave_cache(name, params)}.joblib")
+
+    def _peso_positivos(self):
+        # Proporción de clases para el scale_pos_weight de XGBoost
+        return self.y_train.value_counts()[0] / self.y_train.value_counts()[1]
+
+    def _ruta_ajuste(self):
+        return os.path.join(self.cache_dir, "mejores_hiperparametros.json")
+
+    def _construir_modelo(self, name, params, n_jobs=1):
+        # n_jobs no cambia el resultado, por eso no forma parte de la clave de caché
+        if name == "Decision Tree":
+            from sklearn.tree import DecisionTreeClassifier
+            return DecisionTreeClassifier(**params)
+        if name == "Random Forest":
+            from sklearn.ensemble import RandomForestClassifier
+            return RandomForestClassifier(**params, n_jobs=n_jobs)
+        from xgboost import XGBClassifier
+        return XGBClassifier(**params, n_jobs=n_jobs)
 
-        # Entrenamiento
-        for name, model in self.models.items():
+    # Modelos con paralelismo interno (el Decision Tree siempre usa un núcleo)
+    PARALELOS = ("Random Forest", "XGBoost")
+
+    def _repartir_nucleos(self, nombres, n_jobs):
+        """Reparte el presupuesto de núcleos entre los modelos que se entrenan a la vez."""
+        paralelos = [n for n in nombres if n in self.PARALELOS]
+        libres = max(1, n_jobs - (len(nombres) - len(paralelos)))
+        reparto = {n: 1 for n in nombres}
+        for k, name in enumerate(paralelos):
+            # Los núcleos sobrantes de la división van a los primeros modelos
+            reparto[name] = max(1, libres // len(paralelos) + (k < libres % len(paralelos)))
+        return reparto
+
+    def _entrenar_uno(self, name, params, n_jobs, usar_cache):
+        import joblib
+        ruta = self._ruta_cache(name, params)
+        if usar_cache and os.path.exists(ruta):
+            model, resultado = joblib.load(ruta)
+            return model, dict(resultado, cached=True)
+
+        model = self._construir_modelo(name, params, n_jobs)
+        t0 = time.perf_counter()
+        with etapa("fit", modelo=name, filas=len(self.X_train), n_jobs=n_jobs):
             model.fit(self.X_train, self.y_train)
+        t1 = time.perf_counter()
+        with etapa("predict", modelo=name, filas=len(self.X_test)):
             preds = model.predict(self.X_test)
-            self.results[name] = preds
-            acc = accuracy_score(self.y_test, preds)
-            print(f"{name} entrenado ✅ - Accuracy: {acc:.3f}")
+        resultado = {"preds": preds, "fit_s": t1 - t0, "predict_s": time.perf_counter() - t1,
+                     "n_jobs": n_jobs}
+        if usar_cache:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Escritura atómica: otro proceso nunca ve un archivo a medias
+            tmp = ruta + f".{os.getpid()}.{name.replace(' ', '_')}.tmp"
+            joblib.dump((model, resultado), tmp)
+            os.replace(tmp, ruta)
+        return model, dict(resultado, cached=False)
+
+    # ===========================
+    # 2. Entrenar modelos
+    # ===========================
+    def entrenar_modelos(self, modelos=None, n_jobs=None, usar_cache=True, ajustados=False):
+        """Entrena los modelos pedidos (por defecto los tres) en paralelo.
+
+        ``modelos`` es una lista de nombres de ``HIPERPARAMETROS``; ``n_jobs`` es
+        el total de núcleos a repartir entre los modelos y su paralelismo
+        interno (por defecto todos). En ``self.results[name]`` quedan las
+        predicciones sobre ``X_test`` y los tiempos de fit y predict. Con
+        ``ajustados`` se usan los hiperparámetros guardados por
+        ``ajustar_hiperparametros`` para estos mismos datos (si los hay).
+        """
+        nombres = list(modelos) if modelos is not None else list(self.HIPERPARAMETROS)
+        desconocidos = [n for n in nombres if n not in self.HIPERPARAMETROS]
+        if desconocidos:
+            raise ValueError(f"Modelos desconocidos: {desconocidos}. Opciones: {list(self.HIPERPARAMETROS)}")
+        n_jobs = n_jobs or os.cpu_count() or 1
+        from sklearn.metrics import accuracy_score
+
+        # Decision Tree y Random Forest balanceados, XGBoost con peso ajustado
+        params = {name: dict(self.HIPERPARAMETROS[name]) for name in nombres}
+        if ajustados:
+            for name, ajuste in self.cargar_ajuste().items():
+                if name in params:
+                    print(f"🎛️ {name}: hiperparámetros ajustados (F1 CV {ajuste['f1_cv']:.3f})")
+                    params[name].update(ajuste["params"])
+        if "XGBoost" in params:
+            # Calcular proporción de clases
+            pos_weight = self._peso_positivos()
+            print(f"\n⚖️ Balance de clases - scale_pos_weight (XGBoost): {pos_weight:.2f}")
+            params["XGBoost"]["scale_pos_weight"] = pos_weight
+
+        # Entrenamiento concurrente (o carga desde caché si datos e hiperparámetros no cambiaron).
+        # sklearn y XGBoost liberan el GIL al entrenar, así que basta con hilos.
+        reparto = self._repartir_nucleos(nombres, n_jobs)
+        with ThreadPoolExecutor(max_workers=len(nombres)) as pool:
+            futuros = {name: pool.submit(self._entrenar_uno, name, params[name], reparto[name], usar_cache)
+                       for name in nombres}
+            for name in nombres:
+                model, resultado = futuros[name].result()
+                self.models[name] = model
+                self.results[name] = resultado
+                acc = accuracy_score(self.y_test, resultado["preds"])
+                origen = "cargado desde caché ♻️" if resultado["cached"] else "entrenado ✅"
+                print(f"{name} {origen} - Accuracy: {acc:.3f} "
+                      f"(fit {resultado['fit_s']:.2f}s, predict {resultado['predict_s']:.3f}s)")
+
+    # ===========================
+    # 2b. Ajuste de hiperparámetros
+    # ===========================
+    def ajustar_hiperparametros(self, modelos=None, candidatos=200, folds=5, factor=3, n_jobs=None):
+        """Búsqueda aleatoria con successive halving y k-fold estratificado sobre ``X_train``.
+
+        Cada modelo prueba ``candidatos`` configuraciones de ``ESPACIOS``; en cada
+        ronda sobrevive 1 de cada ``factor`` y el recurso (árboles o filas) se
+        multiplica por ``factor``. Los folds son los mismos para todos los
+        candidatos y los datos se cargan una sola vez; los candidatos se reparten
+        entre ``n_jobs`` procesos (cada modelo entrena con un núcleo). El
+        ``X_test`` no se toca. Guarda la mejor configuración y su F1 de Match en
+        ``mejores_hiperparametros.json`` del caché y devuelve ese dict.
+        """
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold
+        nombres = list(modelos) if modelos is not None else list(self.ESPACIOS)
+        n_jobs = n_jobs or os.cpu_count() or 1
+        cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=self.RANDOM_STATE)
+        ajuste = self.cargar_ajuste()
+
+        for name in nombres:
+            base = dict(self.HIPERPARAMETROS[name])
+            if name == "XGBoost":
+                base["scale_pos_weight"] = self._peso_positivos()
+            recurso, maximo = self.RECURSO[name]
+            busqueda = HalvingRandomSearchCV(
+                self._construir_modelo(name, base, n_jobs=1), self.ESPACIOS[name],
+                n_candidates=candidatos, factor=factor, resource=recurso,
+                max_resources=maximo or "auto", min_resources="exhaust",
+                aggressive_elimination=True, cv=cv, scoring="f1", refit=False,
+                random_state=self.RANDOM_STATE, n_jobs=n_jobs)
+            t0 = time.perf_counter()
+            with etapa("ajuste", modelo=name, candidatos=candidatos, folds=folds, n_jobs=n_jobs):
+                busqueda.fit(self.X_train, self.y_train)
+            segundos = time.perf_counter() - t0
+            mejores = {k: (v.item() if hasattr(v, "item") else v) for k, v in busqueda.best_params_.items()}
+            ajuste[name] = {"params": mejores, "f1_cv": float(busqueda.best_score_), "folds": folds,
+                            "candidatos": candidatos, "ajustes": len(busqueda.cv_results_["params"]) * folds,
+                            "segundos": segundos, "data": self.data_hash}
+            print(f"🎛️ {name}: F1 CV (Match) {busqueda.best_score_:.3f} con {mejores} "
+                  f"({candidatos} candidatos, {busqueda.n_iterations_} rondas, {segundos:.1f}s)")
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._ruta_ajuste(), "w", encoding="utf-8") as f:
+            json.dump(ajuste, f, indent=2, ensure_ascii=False)
+        print(f"💾 Mejores hiperparámetros guardados en: {self._ruta_ajuste()}")
+        return ajuste
+
+    def cargar_ajuste(self):
+        """Ajustes guardados que corresponden a los datos actuales (``{}`` si no hay)."""
+        if not os.path.exists(self._ruta_ajuste()):
+            return {}
+        with open(self._ruta_ajuste(), encoding="utf-8") as f:
+            ajuste = json.load(f)
+        return {name: a for name, a in ajuste.items() if a.get("data") == self.data_hash}
 
     # ===========================
     # 3. Evaluar modelos
     # ===========================
     def evaluar_modelos(self):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        from sklearn.metrics import classification_report, confusion_matrix
         resumen = []
-        for name, y_pred in self.results.items():
+        for name, resultado in self.results.items():
+            y_pred = resultado["preds"]
             print(f"\n==============================")
             print(f"📊 MÉTRICAS DE {name.upper()}")
             print(f"==============================")
@@ -128,6 +378,7 @@ class ModelosGrupoA:
     # 4. Importancia de variables
     # ===========================
     def importancia_variables(self):
+        import matplotlib.pyplot as plt
         importancia_df = pd.DataFrame({
             'Variable': self.X_train.columns,
             'DecisionTree': self.models["Decision Tree"].feature_importances_,
@@ -163,9 +414,19 @@ class ModelosGrupoA:
 # Ejecución completa
 # ===========================
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Modelos predictivos del Grupo A")
+    parser.add_argument("--ajustar", action="store_true", help="busca hiperparámetros con CV antes de entrenar")
+    parser.add_argument("--candidatos", type=int, default=200)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--ajustados", action="store_true", help="entrena con los hiperparámetros guardados")
+    args = parser.parse_args()
+
     modeloA = ModelosGrupoA("data/speed_dating_cleaned.csv")
     modeloA.cargar_datos()
-    modeloA.entrenar_modelos()
+    if args.ajustar:
+        modeloA.ajustar_hiperparametros(candidatos=args.candidatos, folds=args.folds)
+    modeloA.entrenar_modelos(ajustados=args.ajustar or args.ajustados)
     modeloA.evaluar_modelos()
     modeloA.importancia_variables()
     modeloA.conclusiones()
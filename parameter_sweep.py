@@ -0,0 +1,112 @@
+# ==========================================
+# Barrido Monte Carlo de parámetros de la simulación
+# n_agents × diversity × ticks × réplicas, en paralelo
+# ==========================================
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from simulation_engine import SimulationEngine, load_prediction_table, load_rules
+
+# Estado por proceso: el modelo se recibe una sola vez al arrancar cada worker
+_WORKER = {}
+
+
+def _init_worker(prediction_table, rules):
+    _WORKER["prediction_table"] = prediction_table
+    _WORKER["rules"] = rules
+
+
+def _run_replicate(task):
+    n_agents, diversity, ticks, replicate, base_seed, task_id = task
+    seed = np.random.SeedSequence(base_seed, spawn_key=(task_id,))
+    engine = SimulationEngine(rules=_WORKER["rules"], prediction_table=_WORKER["prediction_table"],
+                              n_agents=n_agents, diversity=diversity, seed=seed)
+    stats = engine.run(ticks)
+    stats.update({"ticks": ticks, "ticks_run": engine.tick, "replicate": replicate, "task_id": task_id})
+    return stats
+
+
+def run_sweep(prediction_table, rules, n_agents=(50, 100, 500), diversity=(1, 2, 3, 4, 5), ticks=(300,),
+              replicates=100, seed=42, workers=None):
+    """Corre todas las combinaciones del grid y devuelve una fila por réplica.
+
+    Cada réplica usa su propia semilla derivada de ``seed`` y de su posición en
+    el grid, así que el mismo barrido siempre da la misma tabla sin importar el
+    número de workers.
+    """
+    grid = itertools.product(n_agents, diversity, ticks, range(replicates))
+    tasks = [(n, d, t, r, seed, k) for k, (n, d, t, r) in enumerate(grid)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 8))
+
+    if workers == 1:
+        _init_worker(prediction_table, rules)
+        rows = [_run_replicate(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(prediction_table, rules)) as pool:
+            rows = list(pool.map(_run_replicate, tasks, chunksize=chunksize))
+
+    cols = ["n_agents", "diversity", "ticks", "replicate", "task_id", "ticks_run",
+            "total_interactions", "total_matches", "success_rate"]
+    return pd.DataFrame(rows)[cols]
+
+
+def resumir(results):
+    """Distribución de matches, interacciones y tasa de éxito por configuración."""
+    grouped = results.groupby(["n_agents", "diversity", "ticks"])
+    return grouped.agg(
+        replicates=("replicate", "count"),
+        matches_mean=("total_matches", "mean"),
+        matches_std=("total_matches", "std"),
+        interactions_mean=("total_interactions", "mean"),
+        interactions_std=("total_interactions", "std"),
+        success_mean=("success_rate", "mean"),
+        success_std=("success_rate", "std"),
+        success_p05=("success_rate", lambda s: s.quantile(0.05)),
+        success_p50=("success_rate", "median"),
+        success_p95=("success_rate", lambda s: s.quantile(0.95)),
+    ).reset_index()
+
+
+def _lista(texto):
+    return [int(v) for v in texto.split(",")]
+
+
+# ===========================
+# Ejecución
+# ===========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido Monte Carlo de n_agents × diversity × ticks")
+    parser.add_argument("--agents", type=_lista, default=[50, 100, 500, 1000])
+    parser.add_argument("--diversity", type=_lista, default=[1, 2, 3, 4, 5])
+    parser.add_argument("--ticks", type=_lista, default=[300])
+    parser.add_argument("--replicates", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--rules", default="apriori_rules_GroupA.csv")
+    parser.add_argument("--out", default="data/sweep_results.csv")
+    args = parser.parse_args()
+
+    table = load_prediction_table(args.data)
+    rules = load_rules(args.rules)
+
+    t0 = time.perf_counter()
+    results = run_sweep(table, rules, args.agents, args.diversity, args.ticks, args.replicates,
+                        args.seed, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    results.to_csv(args.out, index=False)
+    resumen = resumir(results)
+    resumen.to_csv(args.out.replace(".csv", "_summary.csv"), index=False)
+    print(f"\n🎲 {len(results)} réplicas en {elapsed:.1f}s")
+    print(resumen.round(3).to_string(index=False))
+    print(f"\n💾 Resultados guardados en: {args.out}")
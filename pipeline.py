@@ -0,0 +1,276 @@
+# ==========================================
+# Pipeline completo como DAG con caché
+# preprocesamiento → (EDA | reglas | modelos) → informe de integración
+# Uso: python pipeline.py [--min-support 0.1] [--workers N] [--forzar reglas ...]
+# ==========================================
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from data_store import hash_archivo
+
+RAW_PATH = "data/Speed Dating Data.csv"
+CLEAN_PATH = "data/speed_dating_cleaned.csv"
+RULES_PATH = "apriori_rules_GroupA.csv"
+ESTADO_PATH = "data/pipeline_estado.json"
+
+
+class Etapa:
+    """Nodo del DAG: ``funcion(entradas, salidas, params)`` lee y escribe solo esos archivos.
+
+    ``entradas`` y ``salidas`` van de nombre lógico a ruta. Las dependencias
+    salen de las rutas: una etapa depende de la que produce alguna de sus
+    entradas. ``params`` entra en la firma de caché junto con el contenido de
+    las entradas, así que cambiar un parámetro solo invalida esta etapa y las
+    que lean lo que ella escribe (si su salida cambia).
+
+    ``despues`` son etapas que solo tienen que terminar antes (orden, no
+    contenido): no entran en la firma, así que cambiar lo que producen no
+    invalida esta etapa.
+    """
+
+    def __init__(self, nombre, funcion, entradas, salidas, params=None, despues=()):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.entradas = dict(entradas)
+        self.salidas = dict(salidas)
+        self.params = dict(params or {})
+        self.despues = set(despues)
+
+
+# ===========================
+# Etapas
+# ===========================
+# Cada una importa lo suyo al correr: el worker que hace EDA no carga XGBoost
+def _etapa_preprocesamiento(entradas, salidas, params):
+    from preprocessing_stream import preprocesar_por_chunks
+    info = preprocesar_por_chunks(entradas["crudo"], salidas["limpio"], params["chunksize"])
+    return {"filas": info["final_count"], "duplicados": info["initial_count"] - info["final_count"]}
+
+
+def _etapa_eda(entradas, salidas, params):
+    from ExploratoryDataAnalysis import analisis_exploratorio
+    analisis_exploratorio(entradas["limpio"], os.path.dirname(salidas["resumen"]))
+    return {}
+
+
+def _etapa_reglas(entradas, salidas, params):
+    from Apriori import minar_reglas
+    rules, basket = minar_reglas(entradas["limpio"], salidas["reglas"], params["min_support"],
+                                 (params["algoritmo"],), params["amplia"], comparar=False)
+    return {"reglas": len(rules), "transacciones": len(basket)}
+
+
+def _etapa_modelos(entradas, salidas, params):
+    import matplotlib.pyplot as plt
+    from modelos_grupoA import ModelosGrupoA
+    modelo = ModelosGrupoA(entradas["limpio"])
+    modelo.cargar_datos()
+    # Mismo caché de modelos que usa el informe: allí el Decision Tree ya no se reentrena
+    modelo.entrenar_modelos(params["modelos"])
+    with warnings.catch_warnings():
+        # Sin ventana (backend Agg): las matrices de confusión no se muestran
+        warnings.simplefilter("ignore", UserWarning)
+        modelo.evaluar_modelos()
+    plt.close("all")
+    modelo.metrics_df.to_csv(salidas["metricas"], index=False)
+    return {"modelos": len(modelo.models)}
+
+
+def _etapa_informe(entradas, salidas, params):
+    from integration import IntegracionSintesisPDF
+    IntegracionSintesisPDF(entradas["reglas"], entradas["limpio"], salidas["pdf"]).generar_informe()
+    return {}
+
+
+def construir_etapas(chunksize=100_000, min_support=0.1, algoritmo="apriori", amplia=False,
+                     modelos=("Decision Tree", "Random Forest", "XGBoost")):
+    """El DAG del proyecto con las rutas de siempre."""
+    limpio = {"limpio": CLEAN_PATH}
+    return [
+        Etapa("preprocesamiento", _etapa_preprocesamiento, {"crudo": RAW_PATH}, limpio,
+              {"chunksize": chunksize}),
+        Etapa("eda", _etapa_eda, limpio, {"resumen": "data/eda/resumen_grupoA.csv"}),
+        Etapa("reglas", _etapa_reglas, limpio,
+              {"reglas": RULES_PATH, "reglas_json": RULES_PATH.replace(".csv", ".rules.json")},
+              {"min_support": min_support, "algoritmo": algoritmo, "amplia": amplia}),
+        Etapa("modelos", _etapa_modelos, limpio, {"metricas": "data/metricas_modelos.csv"},
+              {"modelos": list(modelos)}),
+        # El informe no lee las métricas: va después de modelos solo para encontrar
+        # el Decision Tree ya entrenado en el caché de modelos
+        Etapa("informe", _etapa_informe,
+              {**limpio, "reglas": RULES_PATH, "reglas_json": RULES_PATH.replace(".csv", ".rules.json")},
+              {"pdf": "data/Informe_Integracion_Sintesis.pdf"}, despues=("modelos",)),
+    ]
+
+
+# ===========================
+# Firmas y estado
+# ===========================
+def firma(etapa, huellas):
+    """Hash de la función, los parámetros y el contenido de cada entrada."""
+    datos = {"funcion": f"{etapa.funcion.__module__}.{etapa.funcion.__qualname__}", "params": etapa.params,
+             "entradas": {k: hash_archivo(p, huellas) for k, p in sorted(etapa.entradas.items())}}
+    return hashlib.sha256(json.dumps(datos, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _vigente(etapa, registro, f, huellas):
+    # Misma firma y salidas intactas (nadie las borró ni las editó a mano)
+    if not registro or registro.get("firma") != f:
+        return False
+    return all(os.path.exists(p) and hash_archivo(p, huellas) == registro["salidas"].get(p)
+               for p in etapa.salidas.values())
+
+
+def cargar_estado(path):
+    if not os.path.exists(path):
+        return {"huellas": {}, "etapas": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_estado(estado, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=1)
+    os.replace(tmp, path)
+
+
+def dependencias(etapas):
+    """Etapa -> etapas de las que depende; falla si hay ciclos o nombres/salidas repetidos."""
+    productores = {}
+    for e in etapas:
+        for p in e.salidas.values():
+            if p in productores:
+                raise ValueError(f"'{p}' lo producen '{productores[p]}' y '{e.nombre}'")
+            productores[p] = e.nombre
+    deps = {e.nombre: {productores[p] for p in e.entradas.values() if p in productores} | e.despues
+            for e in etapas}
+    if len(deps) != len(etapas):
+        raise ValueError("Nombres de etapa repetidos")
+    for n, d in deps.items():
+        if d - deps.keys():
+            raise ValueError(f"'{n}' va después de etapas que no existen: {sorted(d - deps.keys())}")
+    # Kahn: si no se pueden ordenar todas, hay un ciclo
+    restantes, hechas = dict(deps), set()
+    while restantes:
+        listas = [n for n, d in restantes.items() if d <= hechas]
+        if not listas:
+            raise ValueError(f"Ciclo en el DAG entre: {sorted(restantes)}")
+        hechas.update(listas)
+        for n in listas:
+            del restantes[n]
+    return deps
+
+
+# ===========================
+# Ejecución
+# ===========================
+def _correr(etapa):
+    t0 = time.perf_counter()
+    extra = etapa.funcion(etapa.entradas, etapa.salidas, etapa.params)
+    return {"segundos": time.perf_counter() - t0, **(extra or {})}
+
+
+def ejecutar(etapas, estado_path=ESTADO_PATH, workers=None, forzar=()):
+    """Corre el DAG: las etapas listas e independientes van en paralelo, las vigentes se saltan.
+
+    Una etapa está lista cuando terminaron todas las que producen sus entradas
+    y las de ``despues``; recién entonces se hashean (ya tienen su contenido
+    final). Devuelve un dict etapa -> ``"cache"``, ``"ok"``, ``"error"`` u
+    ``"omitida"`` (depende de una que falló).
+    """
+    deps = dependencias(etapas)
+    por_nombre = {e.nombre: e for e in etapas}
+    estado = cargar_estado(estado_path)
+    huellas = estado.setdefault("huellas", {})
+    registros = estado.setdefault("etapas", {})
+    resultado = {}
+    workers = workers or min(len(etapas), os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    corriendo, firmas = {}, {}
+
+    def terminar(nombre, f, salida=None, error=None):
+        if error is not None:
+            resultado[nombre] = "error"
+            print(f"❌ {nombre}: {error!r}")
+            registros.pop(nombre, None)
+        else:
+            resultado[nombre] = "ok"
+            print(f"✅ {nombre} en {salida['segundos']:.2f}s")
+            registros[nombre] = {"firma": f, "params": por_nombre[nombre].params, **salida,
+                                 "salidas": {p: hash_archivo(p, huellas) for p in por_nombre[nombre].salidas.values()}}
+        guardar_estado(estado, estado_path)
+
+    try:
+        while len(resultado) < len(etapas):
+            for nombre, d in deps.items():
+                if nombre in resultado or nombre in corriendo.values() or not d <= set(resultado):
+                    continue
+                if any(resultado[x] in ("error", "omitida") for x in d):
+                    resultado[nombre] = "omitida"
+                    print(f"⚠️ {nombre} omitida: falló una etapa previa")
+                    continue
+                etapa = por_nombre[nombre]
+                try:
+                    f = firma(etapa, huellas)
+                except OSError as e:
+                    terminar(nombre, None, error=e)
+                    continue
+                if nombre not in forzar and _vigente(etapa, registros.get(nombre), f, huellas):
+                    resultado[nombre] = "cache"
+                    print(f"⏭️ {nombre}: sin cambios en entradas ni parámetros")
+                elif pool is None:
+                    print(f"▶️ {nombre}")
+                    try:
+                        terminar(nombre, f, _correr(etapa))
+                    except Exception as e:
+                        terminar(nombre, f, error=e)
+                else:
+                    print(f"▶️ {nombre}")
+                    corriendo[pool.submit(_correr, etapa)] = nombre
+                    firmas[nombre] = f
+            if not corriendo:
+                continue
+            listos, _ = wait(corriendo, return_when=FIRST_COMPLETED)
+            for fut in listos:
+                nombre = corriendo.pop(fut)
+                f = firmas.pop(nombre)
+                try:
+                    terminar(nombre, f, fut.result())
+                except Exception as e:
+                    terminar(nombre, f, error=e)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline completo con caché por etapa")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--min-support", type=float, default=0.1)
+    parser.add_argument("--algoritmo", choices=["apriori", "fpgrowth", "eclat"], default="apriori")
+    parser.add_argument("--amplia", action="store_true")
+    parser.add_argument("--modelos", default="Decision Tree,Random Forest,XGBoost")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--forzar", nargs="*", default=[], help="etapas a correr aunque estén vigentes")
+    parser.add_argument("--estado", default=ESTADO_PATH)
+    args = parser.parse_args()
+
+    # Las figuras se guardan a archivo: ni el proceso principal ni los workers abren ventanas
+    os.environ["MPLBACKEND"] = "Agg"
+    etapas = construir_etapas(args.chunksize, args.min_support, args.algoritmo, args.amplia,
+                              args.modelos.split(","))
+    t0 = time.perf_counter()
+    resultado = ejecutar(etapas, args.estado, args.workers, set(args.forzar))
+    print(f"\n🏁 Pipeline en {time.perf_counter() - t0:.2f}s: "
+          + ", ".join(f"{n}={r}" for n, r in resultado.items()))
+    sys.exit(1 if any(r in ("error", "omitida") for r in resultado.values()) else 0)
@@ -0,0 +1,282 @@
+# ==========================================
+# Preprocesamiento incremental por olas
+# Procesa solo filas nuevas con las estadísticas ya ajustadas
+# Uso:
+#   python preprocessing_incremental.py --refit historia.csv [ola_1.csv ...]   (ajuste completo)
+#   python preprocessing_incremental.py ola_nueva.csv                          (solo filas nuevas)
+# ==========================================
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from data_store import limpiar_partes, nombres_como_csv, partes_columnares, ruta_columnar, ruta_partes
+from preprocessing_steps import crear_derivadas, imputar, normalizar
+from preprocessing_stream import HuellasVistas, en_ordenado, preprocesar_por_chunks
+
+# 2: medianas de todas las columnas numéricas e índice de huellas con deltas
+VERSION_ESTADO = 2
+# Deltas del índice antes de fundirlos entre sí (el índice del refit no se reescribe)
+MAX_DELTAS = 16
+_TIPOS = {"bool": bool, "int64": np.int64, "float64": np.float64, "str": str}
+
+
+def rutas_estado(out_path):
+    """Estadísticas ajustadas (JSON) e índice de huellas de filas (.npy) junto al CSV limpio."""
+    base = os.path.splitext(out_path)[0]
+    return base + ".state.json", base + ".fingerprints.npy"
+
+
+def _ruta_delta(out_path, k):
+    return os.path.splitext(out_path)[0] + f".fingerprints.{k:05d}.npy"
+
+
+def _nombre_tipo(t):
+    return {bool: "bool", np.int64: "int64", np.float64: "float64"}.get(t, "str")
+
+
+def _escribir_estado(out_path, estado):
+    estado_path = rutas_estado(out_path)[0]
+    tmp = estado_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, estado_path)
+
+
+def guardar_estado(out_path, dtypes, normalizadas, medianas, columnas, huellas, fuentes):
+    """Estado de un ajuste completo: índice de huellas entero y ordenado, sin deltas."""
+    estado_path, huellas_path = rutas_estado(out_path)
+    if os.path.exists(estado_path):
+        with open(estado_path, encoding="utf-8") as f:
+            for nombre in json.load(f).get("deltas", []):
+                if os.path.exists(nombre):
+                    os.remove(nombre)
+    np.save(huellas_path, np.sort(np.asarray(huellas, dtype=np.uint64)))
+    _escribir_estado(out_path, {
+        "version": VERSION_ESTADO,
+        "fuentes": [os.path.abspath(f) for f in fuentes],
+        "dtypes": {c: _nombre_tipo(t) for c, t in dtypes.items()},
+        "normalizadas": list(normalizadas),
+        # Por posición: el dataset limpio puede repetir nombres (samerace)
+        "columnas": list(columnas),
+        "medianas_imputacion": [[int(p), float(m)] for p, m in medianas.items()],
+        "filas": int(len(huellas)),
+        "deltas": [],
+    })
+
+
+def cargar_estado(out_path):
+    """``(estado, indice)``: ``indice`` es la lista de arrays ordenados de huellas (refit + deltas).
+
+    El del refit se abre con ``mmap``: buscar en él solo lee las páginas que toca.
+    """
+    estado_path, huellas_path = rutas_estado(out_path)
+    if not (os.path.exists(estado_path) and os.path.exists(huellas_path)):
+        raise FileNotFoundError(f"No hay estado guardado para {out_path}: ejecute primero con --refit")
+    with open(estado_path, encoding="utf-8") as f:
+        estado = json.load(f)
+    if estado.get("version") != VERSION_ESTADO:
+        raise ValueError("El estado guardado es de otra versión: ejecute con --refit")
+    estado["dtypes"] = {c: _TIPOS[t] for c, t in estado["dtypes"].items()}
+    estado["medianas_imputacion"] = {p: m for p, m in estado["medianas_imputacion"]}
+    base = np.load(huellas_path, mmap_mode="r") if estado["filas"] else np.empty(0, dtype=np.uint64)
+    return estado, [base] + [np.load(d) for d in estado["deltas"]]
+
+
+def _en_indice(indice, huellas):
+    """Qué ``huellas`` ya están en alguno de los arrays ordenados del índice."""
+    vistas = np.zeros(len(huellas), dtype=bool)
+    for ordenado in indice:
+        vistas |= en_ordenado(ordenado, huellas)
+    return vistas
+
+
+def _agregar_delta(out_path, estado, nuevas):
+    """Guarda las huellas nuevas como un delta ordenado; los deltas se funden si son muchos.
+
+    Fundir solo toca lo agregado desde el último refit, nunca el índice completo.
+    """
+    deltas = estado["deltas"]
+    fundir = len(deltas) >= MAX_DELTAS
+    if fundir:
+        nuevas = np.concatenate([np.load(d) for d in deltas] + [nuevas])
+    k = int(deltas[-1].rsplit(".", 2)[-2]) + 1 if deltas else 0
+    ruta = _ruta_delta(out_path, k)
+    np.save(ruta, np.sort(nuevas))
+    if fundir:
+        for d in deltas:
+            os.remove(d)
+        deltas.clear()
+    deltas.append(ruta)
+
+
+def refit(csv_paths, out_path="data/speed_dating_cleaned.csv", chunksize=100_000):
+    """Ajuste completo sobre toda la historia: reescribe la salida y el estado."""
+    info = preprocesar_por_chunks(csv_paths, out_path, chunksize)
+    guardar_estado(out_path, info["dtypes"], info["normalizadas"], info["medianas_imputacion"],
+                   info["columnas"], info["huellas"], csv_paths)
+    print(f"💾 Estado guardado en: {rutas_estado(out_path)[0]}")
+    return info
+
+
+def _validar_esquema(chunk, dtypes):
+    faltan = set(dtypes) - set(chunk.columns)
+    sobran = set(chunk.columns) - set(dtypes)
+    if faltan or sobran:
+        raise ValueError(f"Cambió el esquema (faltan {sorted(faltan)}, sobran {sorted(sobran)}): "
+                         "ejecute con --refit")
+    enteras_con_nan = [c for c, t in dtypes.items() if t is np.int64 and chunk[c].isna().any()]
+    if enteras_con_nan:
+        raise ValueError(f"Columnas enteras con faltantes {enteras_con_nan}: ejecute con --refit")
+
+
+def agregar_filas(nuevas_path, out_path="data/speed_dating_cleaned.csv", chunksize=100_000):
+    """Procesa solo las filas de ``nuevas_path`` y agrega al dataset limpio las que no estaban.
+
+    Usa las decisiones de normalización y las medianas guardadas en el último
+    ``refit`` y descarta filas cuya huella ya está en el índice (búsqueda
+    binaria sobre arrays ordenados). Las huellas nuevas van a un delta y las
+    filas nuevas al final del CSV y a una parte Parquet aparte, así que el
+    costo es proporcional a las filas nuevas. Si esas estadísticas quedaron
+    viejas, hay que volver a correr ``refit``.
+
+    La ola entera se prepara en temporales (CSV y parte Parquet, chunk a
+    chunk) y solo al final se agrega al dataset junto con el delta y el
+    estado: si un chunk falla (p. ej. cambió el esquema), no queda nada a medias.
+    """
+    estado, indice = cargar_estado(out_path)
+    dtypes = estado["dtypes"]
+    # Enteros como float al leer: así un faltante se detecta en vez de romper la lectura
+    lectura = {c: (np.float64 if t is np.int64 else t) for c, t in dtypes.items()}
+
+    de_esta_ola = HuellasVistas()
+    leidas, agregadas = 0, 0
+    tmp_csv = f"{out_path}.{os.getpid()}.ola.tmp"
+    parte = _ParteParquet(out_path)
+    try:
+        with open(tmp_csv, "w", encoding="utf-8", newline="") as f:
+            for chunk in pd.read_csv(nuevas_path, encoding='latin1', chunksize=chunksize, dtype=lectura):
+                leidas += len(chunk)
+                _validar_esquema(chunk, dtypes)
+                chunk = chunk.astype({c: np.int64 for c, t in dtypes.items() if t is np.int64})
+                chunk = normalizar(chunk[list(dtypes)], cols=estado["normalizadas"])
+                chunk = pd.concat([chunk, crear_derivadas(chunk, verbose=False)], axis=1)
+                if list(chunk.columns) != estado["columnas"]:
+                    raise ValueError("Las columnas derivadas no coinciden con el dataset limpio: ejecute con --refit")
+
+                huellas = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+                nuevas = (~pd.Series(huellas).duplicated().to_numpy() & ~_en_indice(indice, huellas)
+                          & ~de_esta_ola.contiene(huellas))
+                chunk = imputar(chunk[nuevas], estado["medianas_imputacion"])
+                de_esta_ola.agregar(huellas[nuevas])
+                agregadas += len(chunk)
+                if len(chunk):
+                    chunk.to_csv(f, index=False, header=False)
+                    parte.escribir(chunk)
+
+        if agregadas:
+            # Recién acá se toca el dataset: delta, filas del CSV, parte Parquet y por último el estado
+            _agregar_delta(out_path, estado, de_esta_ola.ordenadas())
+            with open(tmp_csv, "rb") as origen, open(out_path, "ab") as destino:
+                shutil.copyfileobj(origen, destino)
+            parte.confirmar()
+            estado["fuentes"].append(os.path.abspath(nuevas_path))
+            estado["filas"] += agregadas
+            estado["dtypes"] = {c: _nombre_tipo(t) for c, t in dtypes.items()}
+            estado["medianas_imputacion"] = [[int(p), float(m)] for p, m in estado["medianas_imputacion"].items()]
+            _escribir_estado(out_path, estado)
+    finally:
+        parte.descartar()
+        if os.path.exists(tmp_csv):
+            os.remove(tmp_csv)
+
+    print(f"Filas nuevas leídas: {leidas} | agregadas: {agregadas} | duplicadas: {leidas - agregadas}")
+    return agregadas
+
+
+class _ParteParquet:
+    """Parte Parquet de una ola, escrita chunk a chunk con el esquema del Parquet principal.
+
+    Parquet no admite append: las filas nuevas van a una parte que
+    ``data_store`` lee junto con el principal. Sin Parquet no se escribe nada;
+    si falla (o no hay pyarrow), al confirmar se borra el Parquet y se usa el CSV.
+    """
+
+    def __init__(self, out_path):
+        self.out_path = out_path
+        self.pq_path = ruta_columnar(out_path)
+        self.writer, self.tmp, self.error = None, None, None
+        self.activa = os.path.exists(self.pq_path)
+        if self.activa:
+            try:
+                import pyarrow.parquet as pq
+                self.schema = pq.read_schema(self.pq_path)
+            except Exception as e:
+                self._fallar(e)
+
+    def _fallar(self, error):
+        self.activa, self.error = False, error
+        self.descartar()
+
+    def escribir(self, chunk):
+        if not self.activa:
+            return
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabla = pa.Table.from_pandas(chunk.set_axis(nombres_como_csv(chunk.columns), axis=1),
+                                         schema=self.schema, preserve_index=False)
+            if self.writer is None:
+                os.makedirs(ruta_partes(self.out_path), exist_ok=True)
+                self.tmp = os.path.join(ruta_partes(self.out_path), f"ola.{os.getpid()}.tmp")
+                self.writer = pq.ParquetWriter(self.tmp, self.schema)
+            self.writer.write_table(tabla)
+        except Exception as e:
+            self._fallar(e)
+
+    def confirmar(self):
+        """Publica la parte; va después de agregar al CSV para que el Parquet no quede más viejo."""
+        if self.error is not None:
+            print(f"⚠️ No se pudo actualizar {self.pq_path} ({self.error}); se usará el CSV")
+            if os.path.exists(self.pq_path):
+                os.remove(self.pq_path)
+            limpiar_partes(self.out_path)
+            return
+        if self.writer is None:
+            return
+        self.writer.close()
+        self.writer = None
+        ruta = os.path.join(ruta_partes(self.out_path), f"parte_{len(partes_columnares(self.out_path)):05d}.parquet")
+        os.replace(self.tmp, ruta)
+        os.utime(ruta)
+        self.tmp = None
+
+    def descartar(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.tmp is not None and os.path.exists(self.tmp):
+            os.remove(self.tmp)
+        self.tmp = None
+
+
+# ===========================
+# Ejecución
+# ===========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocesamiento incremental de olas nuevas")
+    parser.add_argument("csv_paths", nargs="+", help="ola(s) nueva(s), o toda la historia con --refit")
+    parser.add_argument("--refit", action="store_true", help="reajusta estadísticas con toda la historia")
+    parser.add_argument("--out", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    if args.refit:
+        refit(args.csv_paths, args.out, args.chunksize)
+    else:
+        for path in args.csv_paths:
+            agregar_filas(path, args.out, args.chunksize)
@@ -0,0 +1,148 @@
+# ==========================================
+# Etapas vectorizadas del preprocesamiento
+# Normalización (÷10) e imputación por mediana sobre todo el bloque numérico
+# ==========================================
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from instrumentacion import instrumentar
+
+
+def columnas_numericas(df):
+    """Columnas numéricas candidatas a normalizar (mismo criterio que el script original)."""
+    return [c for c in df.columns if df[c].dtype.kind in 'biufc']
+
+
+def _nanmax(bloque):
+    with warnings.catch_warnings():
+        # Columnas completamente vacías: nanmax/nanmedian devuelven NaN y avisan
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmax(bloque, axis=0) if len(bloque) else np.full(bloque.shape[1], np.nan)
+
+
+def _nanmedian(bloque):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(bloque, axis=0) if len(bloque) else np.full(bloque.shape[1], np.nan)
+
+
+def estadisticas_numericas(df, solo_escala_100=False):
+    """Máximo y mediana (ignorando NaN) de todas las columnas a la vez.
+
+    Con ``solo_escala_100`` la mediana (lo caro) solo se calcula donde el
+    máximo supera 10, que es lo único que necesita la regla de normalización.
+    """
+    bloque = df.to_numpy(dtype=float)
+    max_v = _nanmax(bloque)
+    med_v = np.full(df.shape[1], np.nan)
+    mask = max_v > 10 if solo_escala_100 else np.ones(df.shape[1], dtype=bool)
+    if mask.any():
+        med_v[mask] = _nanmedian(bloque[:, mask])
+    return pd.DataFrame({"max": max_v, "median": med_v}, index=df.columns)
+
+
+def columnas_a_normalizar(stats):
+    """Columnas en escala 0–100 (máximo y mediana > 10) que se pasan a 1–10."""
+    return stats.index[(stats["max"] > 10) & (stats["median"] > 10)].tolist()
+
+
+@instrumentar("normalizacion")
+def normalizar(df, cols=None):
+    """Divide entre 10 y recorta a [1, 10] las columnas con max y mediana > 10.
+
+    Equivale a aplicar ``normalize_col`` columna por columna, pero con una sola
+    pasada sobre el bloque numérico. Modifica ``df`` y lo devuelve.
+    """
+    if cols is None:
+        stats = estadisticas_numericas(df[columnas_numericas(df)], solo_escala_100=True)
+        cols = columnas_a_normalizar(stats)
+    if cols:
+        df[cols] = np.clip(df[cols].to_numpy(dtype=float) / 10, 1, 10)
+    return df
+
+
+@instrumentar("derivadas")
+def crear_derivadas(df_norm, verbose=True):
+    """Columnas derivadas fila a fila: diferencias/promedios, samerace y gaps de percepción."""
+    derived = pd.DataFrame(index=df_norm.index)
+
+    ## Crea columnas de diferencia y promedio entre dos variables (ej: attr vs attr_o)
+    def create_diff_mean(col1, col2, base_name):
+        if col1 in df_norm.columns and col2 in df_norm.columns:
+            a = pd.to_numeric(df_norm[col1], errors='coerce')
+            b = pd.to_numeric(df_norm[col2], errors='coerce')
+            derived[f'{base_name}_diff'] = a - b
+            derived[f'{base_name}_mean'] = pd.concat([a, b], axis=1).mean(axis=1)
+            return True
+        return False
+
+    ## Genera diferencias y promedios para atributos clave
+    create_diff_mean('attr', 'attr_o', 'attr')
+    create_diff_mean('fun', 'fun_o', 'fun')
+    create_diff_mean('shar', 'shar_o', 'shar')
+
+    ## Fallback: busca columnas attr si no se crearon las diferencias
+    if not any(c.endswith('_diff') for c in derived.columns):
+        attr_cols = [c for c in df_norm.columns if c.lower().startswith('attr') and 'o' not in c.lower()]
+        attr_o_cols = [c for c in df_norm.columns if ('attr' in c.lower() and 'o' in c.lower()) or (c.lower().endswith('_o') and 'attr' in c.lower())]
+        if attr_cols and attr_o_cols:
+            c1 = attr_cols[0]; c2 = attr_o_cols[0]
+            a = pd.to_numeric(df_norm[c1], errors='coerce'); b = pd.to_numeric(df_norm[c2], errors='coerce')
+            derived['attr_diff'] = a - b
+            derived['attr_mean'] = pd.concat([a, b], axis=1).mean(axis=1)
+            if verbose:
+                print("Creada attr_diff usando", c1, "y", c2)
+
+    ## Crea variable samerace (misma raza entre participantes)
+    if 'samerace' in df_norm.columns:
+        derived['samerace'] = df_norm['samerace']
+    else:
+        if 'race' in df_norm.columns and 'race_o' in df_norm.columns:
+            derived['samerace'] = (df_norm['race'] == df_norm['race_o']).astype(int)
+
+    ## Calcula gaps entre importancia declarada y percibida
+    for colpair in [('attr1_1','attr3_1','attr'), ('fun1_1','fun3_1','fun'), ('shar1_1','shar3_1','shar')]:
+        c1, c2, base = colpair
+        if c1 in df_norm.columns and c2 in df_norm.columns:
+            derived[f'{base}_importance_perception_gap'] = pd.to_numeric(df_norm[c1], errors='coerce') - pd.to_numeric(df_norm[c2], errors='coerce')
+
+    return derived
+
+
+def medianas_imputacion(df):
+    """Mediana por posición de cada columna numérica con faltantes (0 si está vacía).
+
+    Se indexa por posición porque el dataset limpio puede repetir nombres
+    (``samerace`` viene del original y también de las derivadas).
+    """
+    pos = [k for k in range(df.shape[1])
+           if df.dtypes.iloc[k].kind in 'iufc' and df.iloc[:, k].isna().any()]
+    if not pos:
+        return {}
+    med = estadisticas_numericas(df.iloc[:, pos])["median"].fillna(0).to_numpy()
+    return dict(zip(pos, med.tolist()))
+
+
+@instrumentar("imputacion")
+def imputar(df, medianas=None):
+    """Rellena los faltantes numéricos con la mediana de su columna.
+
+    ``medianas`` (posición -> mediana) puede traer columnas sin faltantes: esas no se tocan.
+    """
+    if medianas is None:
+        medianas = medianas_imputacion(df)
+    if not medianas or not len(df):
+        return df
+    pos = np.array(sorted(medianas))
+    bloque = df.iloc[:, pos].to_numpy(dtype=float)
+    faltan = np.isnan(bloque)
+    con_nan = faltan.any(axis=0)
+    if con_nan.any():
+        # Un solo relleno sobre el bloque (por posición: puede haber nombres repetidos)
+        med = np.array([medianas[k] for k in pos[con_nan]])
+        df = df.copy()
+        df.iloc[:, pos[con_nan]] = np.where(faltan[:, con_nan], med, bloque[:, con_nan])
+    return df
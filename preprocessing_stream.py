@@ -0,0 +1,284 @@
+# ==========================================
+# Preprocesamiento por chunks (out-of-core)
+# Para exportaciones de eventos más grandes que la RAM
+# Uso: python preprocessing_stream.py [entrada.csv ...] [--out salida.csv] [--chunksize N]
+# ==========================================
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data_store import limpiar_partes, nombres_como_csv, ruta_columnar
+from instrumentacion import instrumentar
+from preprocessing_steps import crear_derivadas, imputar, normalizar
+
+
+# ===========================
+# Sketch de mediana
+# ===========================
+class SketchMediana:
+    """Mediana en streaming: exacta mientras la columna tenga pocos valores distintos.
+
+    Guarda pares (valor, conteo) ordenados. Las calificaciones, edades o ids
+    tienen pocos valores distintos, así que la mediana es exacta e igual a la
+    de pandas. Si se superan ``max_distintos`` valores, el resumen se comprime
+    en cubetas de igual peso (cada una colapsada en su valor central) y la
+    mediana pasa a tener un error de rango acotado por ``n / max_distintos``
+    por compresión; ``exacta`` indica en qué modo quedó.
+    """
+
+    def __init__(self, max_distintos=20_000):
+        self.max_distintos = max_distintos
+        self.valores = np.empty(0)
+        self.conteos = np.empty(0, dtype=np.int64)
+        self.n = 0
+        self.maximo = np.nan
+        self.exacta = True
+
+    def actualizar(self, x):
+        x = np.asarray(x, dtype=float)
+        x = x[~np.isnan(x)]
+        if not len(x):
+            return
+        self.maximo = np.nanmax([self.maximo, x.max()])
+        v, c = np.unique(x, return_counts=True)
+        todos = np.concatenate([self.valores, v])
+        uniq, inv = np.unique(todos, return_inverse=True)
+        conteos = np.zeros(len(uniq), dtype=np.int64)
+        np.add.at(conteos, inv, np.concatenate([self.conteos, c]))
+        self.valores, self.conteos = uniq, conteos
+        self.n += len(x)
+        if len(self.valores) > self.max_distintos:
+            self._comprimir()
+
+    def _comprimir(self):
+        cubetas = max(1, self.max_distintos // 2)
+        acumulado = np.cumsum(self.conteos)
+        cubeta = np.minimum((acumulado - self.conteos) * cubetas // self.n, cubetas - 1)
+        limites = np.flatnonzero(np.diff(cubeta)) + 1
+        inicio = np.r_[0, limites]
+        pesos = np.add.reduceat(self.conteos, inicio)
+        # Representante de cada cubeta: su valor en el punto medio del peso
+        medio = np.r_[0, acumulado[limites - 1]] + pesos // 2
+        self.valores = self.valores[np.searchsorted(acumulado, medio, side="right")]
+        self.conteos = pesos
+        self.exacta = False
+
+    def mediana(self):
+        if self.n == 0:
+            return np.nan
+        acumulado = np.cumsum(self.conteos)
+        def en_rango(r):
+            return self.valores[np.searchsorted(acumulado, r, side="right")]
+        if self.n % 2:
+            return float(en_rango((self.n - 1) // 2))
+        return float((en_rango(self.n // 2 - 1) + en_rango(self.n // 2)) / 2)
+
+
+# ===========================
+# Huellas de filas ya vistas
+# ===========================
+def en_ordenado(ordenado, huellas):
+    """Qué ``huellas`` están en el array ordenado ``ordenado`` (búsqueda binaria)."""
+    if not len(ordenado):
+        return np.zeros(len(huellas), dtype=bool)
+    pos = np.searchsorted(ordenado, huellas)
+    return ordenado[np.minimum(pos, len(ordenado) - 1)] == huellas
+
+
+class HuellasVistas:
+    """Conjunto de huellas uint64 como tramos ordenados de tamaño decreciente.
+
+    Cada chunk agrega un tramo; cuando el anterior no es más del doble de
+    grande se funden (como un contador binario), así que hay O(log n) tramos
+    y cada huella se reordena O(log n) veces. Consultar un chunk cuesta
+    búsquedas binarias, no recorrer todo lo visto. 8 bytes por huella.
+    """
+
+    def __init__(self):
+        self.tramos = []
+
+    def contiene(self, huellas):
+        vistas = np.zeros(len(huellas), dtype=bool)
+        for tramo in self.tramos:
+            vistas |= en_ordenado(tramo, huellas)
+        return vistas
+
+    def agregar(self, nuevas):
+        """Agrega huellas que no estaban (ni repetidas entre sí)."""
+        if not len(nuevas):
+            return
+        self.tramos.append(np.sort(nuevas))
+        while len(self.tramos) > 1 and len(self.tramos[-2]) <= 2 * len(self.tramos[-1]):
+            b, a = self.tramos.pop(), self.tramos.pop()
+            self.tramos.append(np.sort(np.concatenate([a, b])))
+
+    def __len__(self):
+        return sum(len(t) for t in self.tramos)
+
+    def ordenadas(self):
+        return np.sort(np.concatenate(self.tramos)) if self.tramos else np.empty(0, dtype=np.uint64)
+
+
+# ===========================
+# Pasadas
+# ===========================
+def _leer_chunks(csv_paths, chunksize, dtype=None):
+    # Uno o varios archivos crudos (historia + olas nuevas), en orden
+    if isinstance(csv_paths, (str, os.PathLike)):
+        csv_paths = [csv_paths]
+    for path in csv_paths:
+        yield from pd.read_csv(path, encoding='latin1', chunksize=chunksize, dtype=dtype)
+
+
+def _tipos_globales(tipos_por_chunk):
+    """Tipo final de cada columna como si se hubiera leído el archivo entero."""
+    dtypes = {}
+    for col, kinds in tipos_por_chunk.items():
+        if kinds <= {'b'}:
+            dtypes[col] = bool
+        elif kinds <= {'i', 'u'}:
+            dtypes[col] = np.int64
+        elif kinds <= {'i', 'u', 'f', 'b'}:
+            dtypes[col] = np.float64
+        else:
+            # Texto: se lee tal cual para no reformatear valores
+            dtypes[col] = str
+    return dtypes
+
+
+@instrumentar("pasada_estadisticas")
+def pasada_estadisticas(csv_path, chunksize, max_distintos):
+    """Pasada 1: tipos de columna, máximo y mediana globales de las columnas numéricas."""
+    tipos, sketches, filas = {}, {}, 0
+    for chunk in _leer_chunks(csv_path, chunksize):
+        filas += len(chunk)
+        for col in chunk.columns:
+            serie = chunk[col]
+            # Un chunk sin datos en la columna no dice nada de su tipo
+            kind = serie.dtype.kind if serie.notna().any() else 'f'
+            tipos.setdefault(col, set()).add(kind)
+            if kind in 'iuf':
+                sketches.setdefault(col, SketchMediana(max_distintos)).actualizar(serie.to_numpy(dtype=float))
+    dtypes = _tipos_globales(tipos)
+    numericas = [c for c, t in dtypes.items() if t in (np.int64, np.float64)]
+    # La mediana solo importa donde el máximo supera 10
+    a_normalizar = [c for c in numericas if c in sketches
+                    and sketches[c].maximo > 10 and sketches[c].mediana() > 10]
+    aproximadas = [c for c in a_normalizar if not sketches[c].exacta]
+    return dtypes, a_normalizar, filas, aproximadas
+
+
+@instrumentar("pasada_transformar")
+def pasada_transformar(csv_path, chunksize, dtypes, a_normalizar, tmp_dir, max_distintos):
+    """Pasada 2: normaliza, deriva y deduplica cada chunk; acumula medianas de imputación.
+
+    Se guarda la mediana de todas las columnas numéricas, tengan o no
+    faltantes acá: las olas que se agreguen después pueden traerlos en
+    cualquiera (``preprocessing_incremental``).
+    """
+    vistos = HuellasVistas()  # huellas de filas ya escritas (8 bytes por fila única)
+    sketches, con_nan, partes, columnas = {}, set(), [], None
+    for k, chunk in enumerate(_leer_chunks(csv_path, chunksize, dtype=dtypes)):
+        chunk = normalizar(chunk, cols=a_normalizar)
+        chunk = pd.concat([chunk, crear_derivadas(chunk, verbose=(k == 0))], axis=1)
+        columnas = chunk.columns
+
+        # drop_duplicates global: se descartan filas ya vistas en chunks anteriores
+        huellas = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        nuevas = ~pd.Series(huellas).duplicated().to_numpy() & ~vistos.contiene(huellas)
+        chunk = chunk[nuevas]
+        vistos.agregar(huellas[nuevas])
+
+        for pos in range(chunk.shape[1]):
+            if chunk.dtypes.iloc[pos].kind in 'iufc':
+                valores = chunk.iloc[:, pos].to_numpy(dtype=float)
+                sketches.setdefault(pos, SketchMediana(max_distintos)).actualizar(valores)
+                if np.isnan(valores).any():
+                    con_nan.add(pos)
+
+        ruta = os.path.join(tmp_dir, f"chunk_{k:06d}.pkl")
+        chunk.to_pickle(ruta)
+        partes.append(ruta)
+
+    medianas = {}
+    for pos in sorted(sketches):
+        med = sketches[pos].mediana()
+        medianas[pos] = 0 if pd.isna(med) else med
+    # Se avisa solo donde la mediana se usó para imputar esta salida
+    aproximadas = [columnas[p] for p in sorted(con_nan) if not sketches[p].exacta]
+    return partes, medianas, vistos.ordenadas(), columnas, aproximadas
+
+
+@instrumentar("pasada_escribir")
+def pasada_escribir(partes, medianas, out_path):
+    """Pasada 3: imputa cada chunk y lo agrega al CSV (y al Parquet si hay pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        pa = pq = None
+    pq_path = ruta_columnar(out_path)
+    limpiar_partes(out_path)
+    writer, schema = None, None
+    for k, ruta in enumerate(partes):
+        chunk = imputar(pd.read_pickle(ruta), medianas)
+        os.remove(ruta)
+        chunk.to_csv(out_path, index=False, encoding='utf-8', mode='w' if k == 0 else 'a', header=(k == 0))
+        if pq is not None:
+            tabla = chunk.set_axis(nombres_como_csv(chunk.columns), axis=1)
+            if writer is None:
+                schema = pa.Table.from_pandas(tabla, preserve_index=False).schema
+                writer = pq.ParquetWriter(pq_path, schema)
+            writer.write_table(pa.Table.from_pandas(tabla, schema=schema, preserve_index=False))
+    if writer is not None:
+        writer.close()
+
+
+def preprocesar_por_chunks(csv_path="data/Speed Dating Data.csv", out_path="data/speed_dating_cleaned.csv",
+                           chunksize=100_000, max_distintos=20_000):
+    """Mismo resultado que ``preprocessing.py`` con memoria acotada por el tamaño del chunk.
+
+    ``csv_path`` puede ser un archivo o una lista de archivos que se procesan
+    como si estuvieran concatenados.
+
+    Tres pasadas: (1) estadísticas globales para decidir la normalización,
+    (2) transformación + deduplicado + medianas de imputación, con los chunks
+    intermedios en disco, y (3) imputación y escritura. Lo único que crece con
+    la entrada es el arreglo de huellas para el deduplicado (8 bytes por fila).
+    """
+    dtypes, a_normalizar, initial_count, aprox_norm = pasada_estadisticas(csv_path, chunksize, max_distintos)
+    tmp_dir = tempfile.mkdtemp(prefix="preproc_", dir=os.path.dirname(out_path) or ".")
+    try:
+        partes, medianas, huellas, columnas, aprox_imp = pasada_transformar(
+            csv_path, chunksize, dtypes, a_normalizar, tmp_dir, max_distintos)
+        pasada_escribir(partes, medianas, out_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    final_count = len(huellas)
+    print("Guardado en:", out_path)
+    print("Filas iniciales:", initial_count, "Filas finales:", final_count,
+          "Duplicados removidos:", initial_count - final_count)
+    if aprox_norm or aprox_imp:
+        print("⚠️ Medianas aproximadas (sketch comprimido) en:", sorted(set(aprox_norm) | set(aprox_imp)))
+    return {"initial_count": initial_count, "final_count": final_count, "normalizadas": a_normalizar,
+            "medianas_imputacion": medianas, "dtypes": dtypes, "columnas": list(columnas), "huellas": huellas}
+
+
+# ===========================
+# Ejecución
+# ===========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocesamiento por chunks con memoria acotada")
+    parser.add_argument("csv_path", nargs="*", default=["data/Speed Dating Data.csv"])
+    parser.add_argument("--out", dest="out_path", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--max-distintos", type=int, default=20_000,
+                        help="valores distintos por columna antes de pasar a mediana aproximada")
+    args = parser.parse_args()
+    preprocesar_por_chunks(args.csv_path, args.out_path, args.chunksize, args.max_distintos)
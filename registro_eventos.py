@@ -0,0 +1,310 @@
+# ==========================================
+# Registro binario columnar de una corrida + replay
+# Contactos (predicción, regla, boost, match) por tick y snapshots de posiciones
+# Uso: python registro_eventos.py data/corrida [--csv serie_por_tick.csv]
+# ==========================================
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+VERSION = 1
+
+# Una fila por interacción: contacto nuevo en el que ninguno de los dos tenía match todavía
+CONTACTOS = {
+    "tick": np.int32,
+    "i": np.int32,
+    "j": np.int32,
+    "prediccion": np.int8,  # salida del árbol (0/1)
+    "regla": np.int8,       # primera regla Apriori que dio boost, -1 si ninguna
+    "base": np.bool_,       # boost base aleatorio
+    "match": np.bool_,
+}
+# Atributos fijos de cada agente, guardados una vez
+AGENTES = {"male": np.bool_, "attr": np.int8, "fun": np.int8, "shar": np.int8}
+
+
+def _ruta(directorio, tabla, columna):
+    return os.path.join(directorio, f"{tabla}.{columna}.bin")
+
+
+def _columna(path, dtype):
+    # memmap: leer una corrida larga no la carga entera (un archivo vacío no se puede mapear)
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+# ===========================
+# Escritura
+# ===========================
+class RegistroEventos:
+    """Graba una corrida de ``SimulationEngine`` en ``directorio``, una columna por archivo.
+
+    Cada columna es un ``.bin`` crudo que solo crece por el final, así que
+    grabar es copiar arrays que el motor ya tiene: los contactos se acumulan
+    en memoria y se escriben cada ``max_filas`` filas. Cada ``cada`` ticks se
+    guarda un snapshot de las posiciones (enteras: arrancan en enteros y las
+    velocidades son enteras, así que van en int16). ``meta.json`` se escribe
+    al cerrar y describe tipos, tamaños y parámetros de la corrida.
+    """
+
+    def __init__(self, directorio, cada=10, max_filas=1_000_000):
+        self.directorio = directorio
+        self.cada = cada
+        self.max_filas = max_filas
+        self.engine = None
+        self._archivos = {}
+
+    def inicio(self, engine):
+        """Empieza un registro nuevo (lo llama ``engine.reset``): pisa el que hubiera."""
+        self._cerrar_archivos()
+        os.makedirs(self.directorio, exist_ok=True)
+        self.engine = engine
+        self.coord = np.int16 if max(engine.width, engine.height) < 2**15 else np.float32
+        self._archivos = {("contactos", c): open(_ruta(self.directorio, "contactos", c), "wb") for c in CONTACTOS}
+        for c in ("tick", "x", "y"):
+            self._archivos[("snapshots", c)] = open(_ruta(self.directorio, "snapshots", c), "wb")
+        for c, dtype in AGENTES.items():
+            getattr(engine, c).astype(dtype).tofile(_ruta(self.directorio, "agentes", c))
+        self._buffer = {c: [] for c in CONTACTOS}
+        self._filas_buffer = 0
+        self.filas = 0
+        self.snapshots = 0
+        self._ultimo_snapshot = None
+        self._snapshot()
+
+    def registrar(self, contactos=None):
+        """Cierra el tick actual del motor: ``contactos`` es columna -> array de sus interacciones."""
+        if contactos is not None and len(contactos["i"]):
+            m = len(contactos["i"])
+            self._buffer["tick"].append(np.full(m, self.engine.tick, dtype=np.int32))
+            for c, dtype in CONTACTOS.items():
+                if c != "tick":
+                    self._buffer[c].append(np.asarray(contactos[c], dtype=dtype))
+            self._filas_buffer += m
+            if self._filas_buffer >= self.max_filas:
+                self._volcar()
+        if self.engine.tick % self.cada == 0:
+            self._snapshot()
+
+    def _snapshot(self):
+        eng = self.engine
+        np.array([eng.tick], dtype=np.int32).tofile(self._archivos[("snapshots", "tick")])
+        eng.x.astype(self.coord).tofile(self._archivos[("snapshots", "x")])
+        eng.y.astype(self.coord).tofile(self._archivos[("snapshots", "y")])
+        self.snapshots += 1
+        self._ultimo_snapshot = eng.tick
+
+    def _volcar(self):
+        for c, partes in self._buffer.items():
+            if partes:
+                np.concatenate(partes).tofile(self._archivos[("contactos", c)])
+                partes.clear()
+        self.filas += self._filas_buffer
+        self._filas_buffer = 0
+
+    def _cerrar_archivos(self):
+        for f in self._archivos.values():
+            f.close()
+        self._archivos = {}
+
+    def cerrar(self):
+        """Vuelca lo pendiente, guarda el snapshot final y escribe ``meta.json``."""
+        if self.engine is None:
+            return
+        eng = self.engine
+        if self._ultimo_snapshot != eng.tick:
+            self._snapshot()
+        self._volcar()
+        self._cerrar_archivos()
+        meta = {
+            "version": VERSION, "n_agents": eng.n_agents, "width": eng.width, "height": eng.height,
+            "diversity": eng.diversity, "ticks": eng.tick, "cada": self.cada,
+            "filas_contactos": self.filas, "snapshots": self.snapshots,
+            "reglas": [rule["text"] for rule in eng.rules],
+            "columnas": {"contactos": {c: np.dtype(t).str for c, t in CONTACTOS.items()},
+                         "agentes": {c: np.dtype(t).str for c, t in AGENTES.items()},
+                         "snapshots": {"tick": np.dtype(np.int32).str, "x": np.dtype(self.coord).str,
+                                       "y": np.dtype(self.coord).str}},
+        }
+        with open(os.path.join(self.directorio, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=1)
+        self.engine = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+
+# ===========================
+# Lectura y análisis
+# ===========================
+class LecturaEventos:
+    """Una corrida grabada, con las columnas mapeadas en memoria (sin copiarlas)."""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != VERSION:
+            raise ValueError(f"Versión de registro {self.meta['version']} no soportada")
+        cols = self.meta["columnas"]
+        self.contactos = {c: _columna(_ruta(directorio, "contactos", c), t) for c, t in cols["contactos"].items()}
+        self.agentes = {c: np.fromfile(_ruta(directorio, "agentes", c), dtype=t) for c, t in cols["agentes"].items()}
+        n = self.meta["n_agents"]
+        self.snap_tick = np.fromfile(_ruta(directorio, "snapshots", "tick"), dtype=cols["snapshots"]["tick"])
+        self.snap_x = _columna(_ruta(directorio, "snapshots", "x"), cols["snapshots"]["x"]).reshape(-1, n)
+        self.snap_y = _columna(_ruta(directorio, "snapshots", "y"), cols["snapshots"]["y"]).reshape(-1, n)
+
+    def matches(self):
+        """``(tick, i, j)`` de cada match, en el orden en que ocurrieron."""
+        m = np.flatnonzero(self.contactos["match"])
+        return self.contactos["tick"][m], self.contactos["i"][m], self.contactos["j"][m]
+
+    def tick_de_match(self):
+        """Tick en que hizo match cada agente (``ticks + 1`` si nunca)."""
+        t = np.full(self.meta["n_agents"], self.meta["ticks"] + 1, dtype=np.int64)
+        tick, i, j = self.matches()
+        t[i] = tick; t[j] = tick
+        return t
+
+    def serie_por_tick(self):
+        """DataFrame por tick: interacciones, matches, predicciones, boosts y acumulados."""
+        import pandas as pd
+        ticks = self.meta["ticks"] + 1
+        c = self.contactos
+        cuenta = lambda pesos=None: np.bincount(c["tick"], weights=pesos, minlength=ticks).astype(np.int64)
+        serie = pd.DataFrame({
+            "tick": np.arange(ticks),
+            "interacciones": cuenta(),
+            "matches": cuenta(c["match"]),
+            "pred_positiva": cuenta(c["prediccion"] == 1),
+            "boost_regla": cuenta(c["regla"] >= 0),
+            "boost_base": cuenta(c["base"]),
+        })
+        serie["interacciones_acum"] = serie["interacciones"].cumsum()
+        serie["matches_acum"] = serie["matches"].cumsum()
+        serie["success_rate"] = serie["matches_acum"] / serie["interacciones_acum"].clip(lower=1)
+        return serie
+
+    def stats(self):
+        """Mismas estadísticas finales que ``SimulationEngine.stats()``."""
+        interacciones = len(self.contactos["tick"])
+        matches = int(np.count_nonzero(self.contactos["match"]))
+        return {"n_agents": self.meta["n_agents"], "diversity": self.meta["diversity"],
+                "ticks": self.meta["ticks"], "total_interactions": interacciones,
+                "total_matches": matches, "success_rate": matches / max(1, interacciones)}
+
+    def reglas_por_uso(self):
+        """Boosts dados por cada regla (se cuenta la primera que disparó en cada interacción)."""
+        r = np.asarray(self.contactos["regla"])
+        usos = np.bincount(r[r >= 0], minlength=len(self.meta["reglas"]))
+        return dict(zip(self.meta["reglas"], usos.tolist()))
+
+    def posiciones(self, tick, tick_match=None):
+        """Posiciones en ``tick`` a partir de los snapshots, sin recalcular la física.
+
+        Entre dos snapshots se interpola linealmente; un agente que ya hizo
+        match no se mueve más, así que toma la posición exacta del snapshot siguiente.
+        """
+        k = int(np.searchsorted(self.snap_tick, tick, side="right")) - 1
+        k = min(max(k, 0), len(self.snap_tick) - 1)
+        x0, y0 = self.snap_x[k].astype(float), self.snap_y[k].astype(float)
+        if self.snap_tick[k] == tick or k + 1 == len(self.snap_tick):
+            return x0, y0
+        t0, t1 = self.snap_tick[k], self.snap_tick[k + 1]
+        x1, y1 = self.snap_x[k + 1].astype(float), self.snap_y[k + 1].astype(float)
+        a = (tick - t0) / (t1 - t0)
+        x, y = x0 + (x1 - x0) * a, y0 + (y1 - y0) * a
+        if tick_match is None:
+            tick_match = self.tick_de_match()
+        quietos = tick_match <= tick
+        x[quietos], y[quietos] = x1[quietos], y1[quietos]
+        return x, y
+
+
+# ===========================
+# Replay
+# ===========================
+class MotorReplay:
+    """Reproduce una corrida grabada con la interfaz que usa el visor de ``SimulationEngine``.
+
+    ``step()`` avanza ``velocidad`` ticks (puede ser fraccionaria o mayor que
+    1) y devuelve los matches de ese tramo; posiciones, matches y contadores
+    salen del registro, no se recalculan ni la física ni el modelo.
+    """
+
+    def __init__(self, registro, velocidad=1.0):
+        self.log = registro if isinstance(registro, LecturaEventos) else LecturaEventos(registro)
+        meta = self.log.meta
+        self.velocidad = velocidad
+        self.width, self.height = meta["width"], meta["height"]
+        self.n_agents, self.diversity = meta["n_agents"], meta["diversity"]
+        self.rules = [{"text": texto} for texto in meta["reglas"]]
+        self.male = self.log.agentes["male"]
+        self.attr, self.fun, self.shar = (self.log.agentes[c].astype(int) for c in ("attr", "fun", "shar"))
+        self.perfil = None
+        self._tick_match = self.log.tick_de_match()
+        self._m_tick, self._m_i, self._m_j = (np.asarray(a) for a in self.log.matches())
+        self._int_tick = np.asarray(self.log.contactos["tick"])
+        self.reset()
+
+    def reset(self, n_agents=None, diversity=None, seed=None):
+        """Vuelve al tick 0 (la población es la grabada: ``n_agents`` y ``diversity`` se ignoran)."""
+        self._t = 0.0
+        self.tick = 0
+        self.x, self.y = self.log.posiciones(0, self._tick_match)
+        self.matched = np.zeros(self.n_agents, dtype=bool)
+        self.match_pairs, self.last_matches = [], []
+        self.total_matches = self.total_interactions = 0
+
+    @property
+    def terminado(self):
+        return self.tick >= self.log.meta["ticks"]
+
+    def step(self):
+        if self.terminado:
+            self.last_matches = []
+            return self.last_matches
+        self._t = min(self._t + self.velocidad, self.log.meta["ticks"])
+        previo, self.tick = self.tick, int(self._t)
+        self.x, self.y = self.log.posiciones(self.tick, self._tick_match)
+        a, b = np.searchsorted(self._m_tick, [previo, self.tick], side="right")
+        self.last_matches = list(zip(self._m_i[a:b].tolist(), self._m_j[a:b].tolist()))
+        self.matched[self._m_i[a:b]] = self.matched[self._m_j[a:b]] = True
+        self.match_pairs.extend(self.last_matches)
+        self.total_matches = b
+        self.total_interactions = int(np.searchsorted(self._int_tick, self.tick, side="right"))
+        return self.last_matches
+
+    @property
+    def success_rate(self):
+        return self.total_matches / max(1, self.total_interactions)
+
+
+# ===========================
+# Ejecución
+# ===========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumen de una corrida grabada, sin volver a simularla")
+    parser.add_argument("registro", help="directorio grabado con simulation_engine.py --registro")
+    parser.add_argument("--csv", help="guarda la serie por tick en este CSV")
+    args = parser.parse_args()
+
+    log = LecturaEventos(args.registro)
+    tamaño = sum(os.path.getsize(os.path.join(args.registro, f)) for f in os.listdir(args.registro))
+    print(f"\n📼 {args.registro}: {log.meta['ticks']} ticks, {log.meta['n_agents']} agentes, "
+          f"{log.meta['filas_contactos']:,} contactos, {log.meta['snapshots']} snapshots "
+          f"({tamaño / 2**20:.1f} MB)")
+    print(f"📈 Resultado: {log.stats()}")
+    for texto, usos in log.reglas_por_uso().items():
+        print(f"   🔗 {texto}: {usos} boosts")
+    if args.csv:
+        log.serie_por_tick().to_csv(args.csv, index=False)
+        print(f"💾 Serie por tick guardada en: {args.csv}")
@@ -0,0 +1,105 @@
+# ==========================================
+# Almacén de reglas de asociación
+# Ítems como conjuntos reales (JSON junto al CSV) e índice ítem -> reglas
+# ==========================================
+
+import json
+import os
+import re
+
+import pandas as pd
+
+# Ítems entre comillas dentro de "frozenset({'High_Fun', 'Match'})" (CSV heredado)
+_ITEM_CSV = re.compile(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"")
+
+
+def ruta_reglas(csv_path):
+    """Ruta del JSON estructurado que acompaña al CSV de reglas (``x.csv`` -> ``x.rules.json``)."""
+    return os.path.splitext(csv_path)[0] + ".rules.json"
+
+
+def guardar_reglas(rules, csv_path):
+    """Guarda las reglas como CSV (legible, igual que antes) y como JSON con los ítems en listas."""
+    rules.to_csv(csv_path, index=False)
+    metricas = [c for c in rules.columns if c not in ("antecedents", "consequents")]
+    registros = [{"antecedents": sorted(map(str, a)), "consequents": sorted(map(str, c)),
+                  **{m: float(v) for m, v in zip(metricas, valores)}}
+                 for a, c, *valores in rules[["antecedents", "consequents"] + metricas].itertuples(index=False)]
+    json_path = ruta_reglas(csv_path)
+    with open(json_path, "w", encoding="utf-8") as f:
+        # conviction puede ser inf: json de Python lo escribe y lo lee como Infinity
+        json.dump({"metricas": metricas, "reglas": registros}, f, indent=1, ensure_ascii=False)
+    return json_path
+
+
+def _items_desde_texto(texto):
+    return frozenset(a or b for a, b in _ITEM_CSV.findall(str(texto)))
+
+
+def leer_reglas(csv_path="apriori_rules_GroupA.csv"):
+    """Carga las reglas desde el JSON si está al día; si no, convierte el CSV una sola vez."""
+    json_path = ruta_reglas(csv_path)
+    if os.path.exists(json_path) and not (
+            os.path.exists(csv_path) and os.path.getmtime(json_path) < os.path.getmtime(csv_path)):
+        with open(json_path, encoding="utf-8") as f:
+            datos = json.load(f)
+        reglas = datos["reglas"]
+        metricas = pd.DataFrame([[r[m] for m in datos["metricas"]] for r in reglas], columns=datos["metricas"])
+        return AlmacenReglas([frozenset(r["antecedents"]) for r in reglas],
+                             [frozenset(r["consequents"]) for r in reglas], metricas)
+    df = pd.read_csv(csv_path)
+    return AlmacenReglas(df["antecedents"].map(_items_desde_texto).tolist(),
+                         df["consequents"].map(_items_desde_texto).tolist(),
+                         df.drop(columns=["antecedents", "consequents"]))
+
+
+class AlmacenReglas:
+    """Reglas con ítems como ``frozenset`` e índices ítem -> ids de reglas.
+
+    ``indice`` va de cada ítem a las reglas cuyo antecedente lo contiene e
+    ``indice_consecuente`` lo mismo para el consecuente: filtrar reglas por
+    ítem cuesta lo que las reglas que lo tienen, sin parsear texto. El motor
+    de simulación compila las reglas elegidas a una matriz booleana
+    (``SimulationEngine.rule_mask``) para evaluarlas en lote.
+    """
+
+    def __init__(self, antecedentes, consecuentes, metricas):
+        self.antecedentes = [frozenset(a) for a in antecedentes]
+        self.consecuentes = [frozenset(c) for c in consecuentes]
+        self.metricas = metricas.reset_index(drop=True)
+        self.items = sorted(set().union(*self.antecedentes, *self.consecuentes))
+
+        self.indice, self.indice_consecuente = {}, {}
+        for k, (a, c) in enumerate(zip(self.antecedentes, self.consecuentes)):
+            for it in a:
+                self.indice.setdefault(it, []).append(k)
+            for it in c:
+                self.indice_consecuente.setdefault(it, []).append(k)
+
+    def __len__(self):
+        return len(self.antecedentes)
+
+    def con_items(self, items, en="antecedente"):
+        """Ids (en orden) de reglas cuyo antecedente (o consecuente) contiene alguno de ``items``."""
+        indice = self.indice if en == "antecedente" else self.indice_consecuente
+        return sorted(set().union(*(indice.get(it, ()) for it in items)))
+
+    def donde_item(self, predicado, en="antecedente"):
+        """Como ``con_items``, eligiendo los ítems con ``predicado(nombre)`` (se evalúa una vez por ítem)."""
+        return self.con_items([it for it in self.items if predicado(it)], en)
+
+    def seleccionar(self, ids):
+        """Subconjunto de reglas (en el orden de ``ids``)."""
+        ids = list(ids)
+        return AlmacenReglas([self.antecedentes[k] for k in ids], [self.consecuentes[k] for k in ids],
+                             self.metricas.iloc[ids])
+
+    def dataframe(self):
+        """Mismas columnas que ``association_rules``, con los ítems como ``frozenset``."""
+        df = pd.DataFrame({"antecedents": self.antecedentes, "consequents": self.consecuentes})
+        return pd.concat([df, self.metricas.reset_index(drop=True)], axis=1)
+
+
+def texto_items(items):
+    """Ítems legibles para informes y paneles: ``High_Attractive, High_Fun``."""
+    return ", ".join(sorted(items))
@@ -0,0 +1,161 @@
+# ==========================================
+# Barrido de umbrales para las reglas del Grupo A
+# attr_o × fun_o × int_corr × min_support × lift, en paralelo
+# ==========================================
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_store import leer_dataset
+from itemset_mining import reglas_asociacion
+from rule_store import guardar_reglas
+
+COLUMNAS = ["match", "attr_o", "fun_o", "int_corr"]
+# Mismos nombres de ítem que Apriori.py
+ITEMS = ["High_Attractive", "High_Fun", "High_SharedInterests", "Match"]
+
+# Estado por proceso: el cubo de conteos se recibe una sola vez al arrancar cada worker
+_WORKER = {}
+
+
+# ===========================
+# Conteos compartidos
+# ===========================
+def cubo_conteos(data, umbrales_attr, umbrales_fun, umbrales_int):
+    """Conteos acumulados para cualquier combinación de umbrales, en una sola pasada.
+
+    Cada fila se codifica por cuántos umbrales supera en cada columna y se
+    cuentan las filas por código (attr, fun, int_corr, match). Con sumas
+    acumuladas desde el final en cada eje, ``cubo[a, f, i, m]`` es el número
+    de filas con attr_o >= umbrales_attr[a-1], fun_o >= ..., int_corr >= ... y
+    match >= m (índice 0 = sin condición). El soporte de cualquier itemset con
+    cualquier umbral es una sola lectura del cubo, sin volver a los datos.
+    """
+    codigos = [np.searchsorted(np.sort(umbrales), data[col].to_numpy(), side="right")
+               for col, umbrales in (("attr_o", umbrales_attr), ("fun_o", umbrales_fun), ("int_corr", umbrales_int))]
+    codigos.append((data["match"].to_numpy() == 1).astype(np.int64))
+    forma = (len(umbrales_attr) + 1, len(umbrales_fun) + 1, len(umbrales_int) + 1, 2)
+    cubo = np.bincount(np.ravel_multi_index(codigos, forma), minlength=int(np.prod(forma))).reshape(forma)
+    for eje in range(4):
+        cubo = np.flip(np.cumsum(np.flip(cubo, eje), axis=eje), eje)
+    return cubo
+
+
+def _init_worker(cubo, n_rows):
+    _WORKER["cubo"] = cubo
+    _WORKER["n_rows"] = n_rows
+
+
+def _minar_configuracion(task):
+    """Reglas de una binarización para todos los soportes y lifts del grid a la vez.
+
+    Se mina una sola vez con el soporte y el lift más bajos: por la clausura
+    hacia abajo, las reglas con soporte >= s y lift >= l son exactamente las que
+    daría minar con (s, l), así que el resto del grid sale filtrando.
+    """
+    config_id, (ia, if_, ii), umbrales, soportes, lifts = task
+    cubo, n_rows = _WORKER["cubo"], _WORKER["n_rows"]
+    # Posición en el cubo de cada ítem con estos umbrales (0 = ítem ausente)
+    posiciones = (ia, if_, ii, 1)
+    filas = []
+    for k in range(1, len(ITEMS) + 1):
+        for comb in itertools.combinations(range(len(ITEMS)), k):
+            indice = tuple(posiciones[e] if e in comb else 0 for e in range(len(ITEMS)))
+            soporte = cubo[indice] / n_rows
+            if soporte >= min(soportes):
+                filas.append((soporte, frozenset(ITEMS[e] for e in comb)))
+    frecuentes = pd.DataFrame(filas, columns=["support", "itemsets"])
+    if not len(frecuentes):
+        return []
+    reglas = reglas_asociacion(frecuentes, metric="lift", min_threshold=min(lifts))
+    if reglas.empty:
+        # Hay ítems frecuentes pero ningún itemset de dos o más: no hay reglas
+        return []
+    # Máscara como array: una Series vacía de tipo object se tomaría como selección de columnas
+    reglas = reglas[reglas["consequents"].map(lambda x: "Match" in x).to_numpy(dtype=bool)]
+
+    partes = []
+    for k, (s, l) in enumerate(itertools.product(soportes, lifts)):
+        sel = reglas[(reglas["support"] >= s) & (reglas["lift"] >= l)].sort_values(by="lift", ascending=False)
+        if len(sel):
+            # config_id global: binarización × soporte × lift, en el orden del producto
+            config = {"config_id": config_id * len(soportes) * len(lifts) + k,
+                      "attr_o_min": umbrales[0], "fun_o_min": umbrales[1], "int_corr_min": umbrales[2],
+                      "min_support": s, "min_lift": l}
+            partes.append(sel.assign(**config))
+    return partes
+
+
+def run_rule_sweep(data, umbrales_attr=(6, 7, 8), umbrales_fun=(6, 7, 8), umbrales_int=(0.4, 0.5, 0.6),
+                   soportes=(0.05, 0.1, 0.15), lifts=(1.0, 1.2, 1.5), workers=None):
+    """Mina las reglas de todas las configuraciones y las junta en una sola tabla.
+
+    Cada fila es una regla con las columnas de ``association_rules`` más la
+    configuración que la produjo (``config_id`` y sus umbrales); una misma
+    regla aparece una vez por cada configuración en la que sale.
+    """
+    data = data[COLUMNAS].dropna()
+    cubo = cubo_conteos(data, umbrales_attr, umbrales_fun, umbrales_int)
+    orden = [np.sort(u) for u in (umbrales_attr, umbrales_fun, umbrales_int)]
+    binarizaciones = list(itertools.product(*(range(len(u)) for u in orden)))
+    tasks = [(k, (a + 1, f + 1, i + 1), (orden[0][a].item(), orden[1][f].item(), orden[2][i].item()),
+              tuple(soportes), tuple(lifts))
+             for k, (a, f, i) in enumerate(binarizaciones)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 8))
+
+    if workers == 1:
+        _init_worker(cubo, len(data))
+        partes = [_minar_configuracion(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cubo, len(data))) as pool:
+            partes = list(pool.map(_minar_configuracion, tasks, chunksize=chunksize))
+
+    partes = [p for grupo in partes for p in grupo]
+    if not partes:
+        return pd.DataFrame()
+    tabla = pd.concat(partes, ignore_index=True)
+    primeras = ["config_id", "attr_o_min", "fun_o_min", "int_corr_min", "min_support", "min_lift"]
+    return tabla[primeras + [c for c in tabla.columns if c not in primeras]]
+
+
+def _lista(texto):
+    return [float(v) for v in texto.split(",")]
+
+
+# ===========================
+# Ejecución
+# ===========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido de umbrales de binarización, soporte y lift para Apriori")
+    parser.add_argument("--attr", type=_lista, default=[6, 7, 8])
+    parser.add_argument("--fun", type=_lista, default=[6, 7, 8])
+    parser.add_argument("--int-corr", type=_lista, default=[0.4, 0.5, 0.6])
+    parser.add_argument("--support", type=_lista, default=[0.05, 0.1, 0.15])
+    parser.add_argument("--lift", type=_lista, default=[1.0, 1.2, 1.5])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--out", default="data/apriori_sweep_rules.csv")
+    args = parser.parse_args()
+
+    # Las columnas se leen una sola vez para todo el grid
+    data = leer_dataset(args.data, COLUMNAS)
+
+    t0 = time.perf_counter()
+    tabla = run_rule_sweep(data, args.attr, args.fun, args.int_corr, args.support, args.lift, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    n_configs = len(args.attr) * len(args.fun) * len(args.int_corr) * len(args.support) * len(args.lift)
+    print(f"\n⛏️ {n_configs} configuraciones en {elapsed:.2f}s: {len(tabla)} reglas "
+          f"({tabla['config_id'].nunique() if len(tabla) else 0} configuraciones con reglas)")
+    if len(tabla):
+        guardar_reglas(tabla, args.out)
+        print(tabla.groupby("config_id").size().describe().round(2).to_string())
+        print(f"\n💾 Tabla consolidada guardada en: {args.out}")
@@ -0,0 +1,183 @@
+# ==========================================
+# Puntuación por lotes de parejas candidatas
+# Lee attr_o / fun_o / int_corr por chunks (CSV o Parquet), predice en paralelo y escribe en orden
+# Uso: python scoring.py parejas.csv --out probabilidades.csv [--modelo "XGBoost"] [--workers N] [--top K]
+# ==========================================
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from instrumentacion import etapa
+
+COLUMNAS = ["attr_o", "fun_o", "int_corr"]
+
+# Estado por proceso: el modelo se recibe una sola vez al arrancar cada worker
+_WORKER = {}
+
+
+# ===========================
+# Lectura y escritura por chunks
+# ===========================
+def leer_chunks(path, chunksize, columnas=COLUMNAS):
+    """Bloques de ``chunksize`` filas con solo ``columnas``, sin cargar el archivo entero."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columnas):
+            yield lote.to_pandas()[columnas]
+    else:
+        yield from (chunk[columnas] for chunk in pd.read_csv(path, usecols=columnas, chunksize=chunksize))
+
+
+class EscritorProbabilidades:
+    """Agrega DataFrames al final del archivo, en CSV o Parquet según la extensión."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._primero = True
+
+    def escribir(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, tabla.schema)
+            self._writer.write_table(tabla)
+        else:
+            df.to_csv(self.path, index=False, mode="w" if self._primero else "a", header=self._primero)
+        self._primero = False
+
+    def cerrar(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# ===========================
+# Workers
+# ===========================
+def _init_worker(modelo):
+    # Cada proceso predice con un solo hilo: el paralelismo lo ponen los procesos
+    if "n_jobs" in modelo.get_params():
+        modelo.set_params(n_jobs=1)
+    _WORKER["modelo"] = modelo
+
+
+def _puntuar(X):
+    """Probabilidad de Match de cada fila; NaN si le falta alguna columna (como en el entrenamiento)."""
+    prob = np.full(len(X), np.nan)
+    completas = ~np.isnan(X).any(axis=1)
+    if completas.any():
+        entrada = pd.DataFrame(X[completas], columns=COLUMNAS)
+        prob[completas] = _WORKER["modelo"].predict_proba(entrada)[:, 1]
+    return prob
+
+
+def cargar_modelo(nombre="Decision Tree", data_path="data/speed_dating_cleaned.csv"):
+    """Modelo de ``ModelosGrupoA`` desde su caché (se entrena solo si no está)."""
+    from modelos_grupoA import ModelosGrupoA
+    modelos = ModelosGrupoA(data_path)
+    modelo = modelos.cargar_cacheado(nombre)
+    if modelo is not None:
+        return modelo
+    modelos.cargar_datos()
+    modelos.entrenar_modelos([nombre])
+    return modelos.models[nombre]
+
+
+# ===========================
+# Puntuación en streaming
+# ===========================
+def puntuar_archivo(entrada, salida, modelo, chunksize=500_000, workers=None, con_entrada=False, top=0):
+    """Puntúa ``entrada`` y escribe las probabilidades en ``salida`` en el orden original.
+
+    Se leen chunks mientras haya a lo sumo ``2 * workers`` en vuelo y el
+    resultado se escribe siempre desde el más viejo, así que la memoria no
+    depende del tamaño del archivo y la salida queda en el orden de entrada.
+    Con ``top`` se guardan además las ``top`` filas con mayor probabilidad
+    (se conservan a lo sumo ``2 * top`` candidatas, sin ordenar todo). Devuelve
+    ``(filas, top_df)``.
+    """
+    workers = workers or os.cpu_count() or 1
+    escritor = EscritorProbabilidades(salida)
+    mejores = pd.DataFrame(columns=["prob_match", "fila"] + COLUMNAS)
+    filas = 0
+
+    def volcar(offset, chunk, prob):
+        nonlocal mejores
+        df = pd.DataFrame({"fila": np.arange(offset, offset + len(chunk)), "prob_match": prob})
+        if con_entrada:
+            df = pd.concat([df, chunk.reset_index(drop=True)], axis=1)
+        escritor.escribir(df)
+        if top:
+            # Solo los candidatos del chunk que pueden entrar al top; en empates,
+            # la fila más temprana (igual que nlargest con keep="first")
+            validos = np.flatnonzero(~np.isnan(prob))
+            k = validos[np.argsort(-prob[validos], kind="stable")[:top]]
+            cand = pd.DataFrame({"prob_match": prob[k], "fila": offset + k,
+                                 **{c: chunk[c].to_numpy()[k] for c in COLUMNAS}})
+            mejores = pd.concat([mejores, cand] if len(mejores) else [cand], ignore_index=True)
+            mejores = mejores.nlargest(top, "prob_match", keep="first")
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(modelo,)) if workers > 1 else None
+    if pool is None:
+        _init_worker(modelo)
+    en_vuelo = deque()
+    try:
+        with etapa("scoring", entrada=entrada, workers=workers, chunksize=chunksize):
+            for chunk in leer_chunks(entrada, chunksize):
+                X = chunk.to_numpy(dtype=float)
+                if pool is None:
+                    volcar(filas, chunk, _puntuar(X))
+                else:
+                    en_vuelo.append((filas, chunk, pool.submit(_puntuar, X)))
+                    if len(en_vuelo) >= 2 * workers:
+                        offset, c, fut = en_vuelo.popleft()
+                        volcar(offset, c, fut.result())
+                filas += len(chunk)
+            while en_vuelo:
+                offset, c, fut = en_vuelo.popleft()
+                volcar(offset, c, fut.result())
+    finally:
+        escritor.cerrar()
+        if pool is not None:
+            pool.shutdown()
+
+    return filas, mejores.reset_index(drop=True)
+
+
+# ===========================
+# Ejecución
+# ===========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probabilidad de Match para un archivo grande de parejas")
+    parser.add_argument("entrada", help="CSV o Parquet con attr_o, fun_o, int_corr")
+    parser.add_argument("--out", default="data/probabilidades_match.csv", help=".csv o .parquet")
+    parser.add_argument("--modelo", default="Decision Tree", choices=["Decision Tree", "Random Forest", "XGBoost"])
+    parser.add_argument("--data", default="data/speed_dating_cleaned.csv", help="dataset del modelo en caché")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--con-entrada", action="store_true", help="copia attr_o/fun_o/int_corr a la salida")
+    parser.add_argument("--top", type=int, default=0, help="guarda aparte las K parejas más probables")
+    args = parser.parse_args()
+
+    modelo = cargar_modelo(args.modelo, args.data)
+    t0 = time.perf_counter()
+    filas, top_df = puntuar_archivo(args.entrada, args.out, modelo, args.chunksize, args.workers,
+                                    args.con_entrada, args.top)
+    elapsed = time.perf_counter() - t0
+    print(f"\n🎯 {filas:,} parejas puntuadas con {args.modelo} en {elapsed:.2f}s "
+          f"({filas / max(elapsed, 1e-9):,.0f} filas/s)")
+    print(f"💾 Probabilidades guardadas en: {args.out}")
+    if args.top:
+        top_path = os.path.splitext(args.out)[0] + f"_top{args.top}.csv"
+        top_df.to_csv(top_path, index=False)
+        print(f"🏆 Top {args.top} guardado en: {top_path}")
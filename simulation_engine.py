@@ -0,0 +1,462 @@
+# =========================================================
+# Motor headless de la simulación (NumPy, struct-of-arrays)
+# Sin pygame: se puede correr en servidores sin pantalla
+# =========================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from instrumentacion import PERFIL_NULO
+from rule_store import leer_reglas, texto_items
+
+
+# ------------------------------
+# Grid espacial (vecinos por celdas)
+# ------------------------------
+class SpatialGrid:
+    """Índice de vecinos en celdas uniformes del tamaño del radio de interacción.
+
+    Dos agentes a distancia < radio siempre caen en la misma celda o en celdas
+    adyacentes, así que solo se comparan los pares de las 9 celdas vecinas en
+    lugar de los n² pares. Se reconstruye cada tick después de mover.
+    """
+    # Mitad de la vecindad 3x3: cada par de celdas distintas se visita una sola vez
+    OFFSETS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, radius=25):
+        self.radius = radius
+
+    def pares_cercanos(self, xs, ys):
+        """Devuelve (i, j) con i < j y distancia < radio, ordenados como el doble bucle."""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        n = len(xs)
+        if n < 2:
+            vacio = np.empty(0, dtype=np.int64)
+            return vacio, vacio
+
+        cx = np.floor(xs / self.radius).astype(np.int64)
+        cy = np.floor(ys / self.radius).astype(np.int64)
+        cx -= cx.min() - 1
+        cy -= cy.min() - 1
+        stride = cy.max() + 2  # deja una fila libre para los offsets dy=±1
+        keys = cx * stride + cy
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        ii, jj = [], []
+        for dx, dy in self.OFFSETS:
+            target = keys + dx * stride + dy
+            start = np.searchsorted(sorted_keys, target, side="left")
+            counts = np.searchsorted(sorted_keys, target, side="right") - start
+            total = counts.sum()
+            if total == 0:
+                continue
+            i = np.repeat(np.arange(n), counts)
+            offs = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            j = order[np.repeat(start, counts) + offs]
+            keep = i < j if (dx, dy) == (0, 0) else i != j
+            ii.append(i[keep]); jj.append(j[keep])
+
+        if not ii:
+            vacio = np.empty(0, dtype=np.int64)
+            return vacio, vacio
+        i = np.concatenate(ii); j = np.concatenate(jj)
+        dxs = xs[i] - xs[j]; dys = ys[i] - ys[j]
+        cerca = dxs * dxs + dys * dys < self.radius * self.radius
+        a, b = np.minimum(i[cerca], j[cerca]), np.maximum(i[cerca], j[cerca])
+        # Mismo orden que el doble bucle i<j
+        idx = np.lexsort((b, a))
+        return a[idx], b[idx]
+
+
+# ------------------------------
+# Memoria de contactos (pares i < j ya vistos)
+# ------------------------------
+class MemoriaTriangular:
+    """Un bit por par posible i < j de ``n`` agentes (triángulo superior, n(n-1)/2 bits).
+
+    Consultas e inserciones son vectoriales sobre arrays de índices; ocupa
+    lo mismo vacía que llena, así que conviene en poblaciones chicas o densas.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.bits = np.zeros((n * (n - 1) // 2 + 7) // 8, dtype=np.uint8)
+        self._len = 0
+
+    def _indices(self, i, j):
+        i = np.asarray(i, dtype=np.int64); j = np.asarray(j, dtype=np.int64)
+        return i * self.n - i * (i + 1) // 2 + (j - i - 1)
+
+    def _leer(self, idx):
+        return (self.bits[idx >> 3] >> (idx & 7).astype(np.uint8)) & 1 == 1
+
+    def contiene(self, i, j):
+        """Máscara booleana: qué pares (i, j) con i < j ya están."""
+        return self._leer(self._indices(i, j))
+
+    def agregar(self, i, j):
+        idx = np.unique(self._indices(i, j))
+        idx = idx[~self._leer(idx)]
+        np.bitwise_or.at(self.bits, idx >> 3, (1 << (idx & 7)).astype(np.uint8))
+        self._len += len(idx)
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+
+class MemoriaDispersa:
+    """Claves ``i * n + j`` (int64) en un array ordenado más un delta ordenado chico.
+
+    Las inserciones van al delta, que se funde con el principal cuando pasa
+    de ``1/8`` de su tamaño: cada inserción cuesta O(delta) y no O(total).
+    Ocupa 8 bytes por contacto, así que escala a poblaciones grandes y ralas.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.claves = np.empty(0, dtype=np.int64)
+        self.delta = np.empty(0, dtype=np.int64)
+
+    def _claves(self, i, j):
+        return np.asarray(i, dtype=np.int64) * self.n + np.asarray(j, dtype=np.int64)
+
+    @staticmethod
+    def _en(ordenado, claves):
+        pos = np.searchsorted(ordenado, claves)
+        return ordenado[np.minimum(pos, len(ordenado) - 1)] == claves if len(ordenado) else np.zeros(len(claves), bool)
+
+    def _contiene_claves(self, claves):
+        return self._en(self.claves, claves) | self._en(self.delta, claves)
+
+    def contiene(self, i, j):
+        """Máscara booleana: qué pares (i, j) con i < j ya están."""
+        return self._contiene_claves(self._claves(i, j))
+
+    def agregar(self, i, j):
+        claves = np.unique(self._claves(i, j))
+        claves = claves[~self._contiene_claves(claves)]
+        if len(claves) == 0:
+            return
+        self.delta = self._fundir(self.delta, claves)
+        if len(self.delta) > max(4096, len(self.claves) // 8):
+            self.claves = self._fundir(self.claves, self.delta)
+            self.delta = self.delta[:0]
+
+    @staticmethod
+    def _fundir(a, b):
+        # Dos tramos ordenados y disjuntos: el sort estable (timsort) los une en tiempo lineal
+        return np.sort(np.concatenate([a, b]), kind="stable")
+
+    def __len__(self):
+        return len(self.claves) + len(self.delta)
+
+    @property
+    def nbytes(self):
+        return self.claves.nbytes + self.delta.nbytes
+
+
+def memoria_contactos(n, max_bytes_bits=32 * 2**20):
+    """Bits triangulares si entran en ``max_bytes_bits`` (n ≲ 23k); si no, claves ordenadas."""
+    if n * (n - 1) // 16 <= max_bytes_bits:
+        return MemoriaTriangular(n)
+    return MemoriaDispersa(n)
+
+
+# ------------------------------
+# Carga de modelo y reglas
+# ------------------------------
+def load_tree(data_path="data/speed_dating_cleaned.csv"):
+    """Entrena (o carga) el Decision Tree de ModelosGrupoA que usa la simulación."""
+    from modelos_grupoA import ModelosGrupoA
+    model = ModelosGrupoA(data_path)
+    tree = model.cargar_cacheado("Decision Tree")
+    if tree is not None:
+        return tree
+    model.cargar_datos()
+    model.entrenar_modelos(["Decision Tree"])
+    return model.models["Decision Tree"]
+
+
+# Atributo del agente al que se refiere cada ítem de las reglas (High_Attractive -> attr...)
+ATRIBUTOS = ("attr", "fun", "shar")
+
+
+def load_rules(rules_path="apriori_rules_GroupA.csv", top=5):
+    """Reglas Apriori sobre attr/fun/shar con su fuerza de boost."""
+    store = leer_reglas(rules_path)
+    ids = store.donde_item(lambda it: any(clave in it.lower() for clave in ATRIBUTOS))[:top]
+    lift = store.metricas["lift"].to_numpy()
+    return [{"antecedents": store.antecedentes[k], "text": texto_items(store.antecedentes[k]),
+             "strength": min(1.0, 0.6 + lift[k]/2)} for k in ids]
+
+
+def load_prediction_table(data_path="data/speed_dating_cleaned.csv"):
+    """Tabla de ``build_prediction_table`` del Decision Tree en caché, guardada junto al modelo.
+
+    La clave es la del modelo (hash de los datos, hiperparámetros y versiones),
+    así que la tabla se invalida con él. Si ya está en disco no se importa
+    sklearn: arrancar la simulación es leer 1000 valores.
+    """
+    from modelos_grupoA import ModelosGrupoA
+    ruta = os.path.splitext(ModelosGrupoA(data_path).ruta_cacheada("Decision Tree"))[0] + ".tabla.npy"
+    if os.path.exists(ruta):
+        return np.load(ruta)
+    tabla = build_prediction_table(load_tree(data_path))
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    tmp = ruta + f".{os.getpid()}.tmp.npy"
+    np.save(tmp, tabla)
+    os.replace(tmp, ruta)
+    return tabla
+
+
+def build_prediction_table(tree):
+    """Predicciones del árbol para toda la grilla discreta attr × fun × |Δshar| (1–10).
+
+    Los agentes solo toman valores enteros 1–10, así que basta con una única
+    llamada a ``predict`` sobre las 1000 combinaciones posibles.
+    """
+    attr, fun, diff = np.meshgrid(np.arange(1, 11), np.arange(1, 11), np.arange(10), indexing="ij")
+    grid = pd.DataFrame({'attr_o': attr.ravel(), 'fun_o': fun.ravel(), 'int_corr': diff.ravel() / 10})
+    return np.asarray(tree.predict(grid)).reshape(10, 10, 10)
+
+
+# ------------------------------
+# Motor
+# ------------------------------
+class SimulationEngine:
+    """Estado de la simulación en arrays NumPy con física y matches vectorizados.
+
+    Cada agente es un índice estable 0..n-1 en los arrays ``x``, ``y``, ``vx``,
+    ``vy``, ``male``, ``attr``, ``fun``, ``shar`` y ``matched``. Toda la
+    aleatoriedad sale de un único ``np.random.Generator`` creado con ``seed``,
+    así que una corrida es reproducible.
+
+    ``perfil`` (un ``instrumentacion.PerfilFrames``) mide cada tick por
+    secciones: ``move``, ``pares`` (contactos nuevos), ``predicciones`` y
+    ``resolucion``. Por defecto no mide nada.
+
+    ``registro`` (un ``registro_eventos.RegistroEventos``) graba cada tick:
+    contactos con su predicción, boosts y match, y snapshots de posiciones.
+
+    ``contact_memory`` guarda los pares (i, j) que ya interactuaron, por
+    índice estable (ver ``memoria_contactos``); se rehace en cada ``reset``.
+    """
+    INTERACTION_RADIUS = 25
+    BORDER = 10
+    BASE_BOOST = 0.25
+    SPEEDS = np.array([-2, -1, 1, 2])
+
+    def __init__(self, tree=None, rules=(), n_agents=50, width=900, height=720, diversity=3,
+                 seed=None, prediction_table=None, perfil=None, registro=None):
+        if prediction_table is None:
+            if tree is None:
+                raise ValueError("Se necesita un modelo (tree) o una prediction_table")
+            prediction_table = build_prediction_table(tree)
+        self.tree = tree
+        self.prediction_table = np.asarray(prediction_table)
+        self.width, self.height = width, height
+        self.grid = SpatialGrid(self.INTERACTION_RADIUS)
+        self.perfil = perfil or PERFIL_NULO
+        self.registro = registro
+
+        # Reglas compiladas una sola vez: qué atributos activa cada una (por sus ítems) y su fuerza
+        self.rules = list(rules)
+        self.rule_mask = np.array([[any(clave in it.lower() for it in rule["antecedents"]) for clave in ATRIBUTOS]
+                                   for rule in self.rules], dtype=bool).reshape(-1, 3)
+        self.rule_strength = np.array([rule["strength"] for rule in self.rules], dtype=float)
+
+        self.reset(n_agents, diversity, seed)
+
+    def reset(self, n_agents=None, diversity=None, seed=None):
+        """Crea una población nueva (equivalente a ``create_agents``)."""
+        if n_agents is not None: self.n_agents = n_agents
+        if diversity is not None: self.diversity = diversity
+        if seed is not None or not hasattr(self, "rng"):
+            self.rng = np.random.default_rng(seed)
+        n, d, rng = self.n_agents, self.diversity, self.rng
+
+        self.male = np.arange(n) < n / 2
+        self.attr = np.clip(5 + rng.integers(-d, d + 1, n), 1, 10)
+        self.fun = np.clip(5 + rng.integers(-d, d + 1, n), 1, 10)
+        self.shar = np.clip(5 + rng.integers(-d, d + 1, n), 1, 10)
+        self.x = rng.integers(50, self.width - 50 + 1, n).astype(float)
+        self.y = rng.integers(50, self.height - 50 + 1, n).astype(float)
+        self.vx = rng.choice(self.SPEEDS, n).astype(float)
+        self.vy = rng.choice(self.SPEEDS, n).astype(float)
+        self.matched = np.zeros(n, dtype=bool)
+
+        self.tick = 0
+        self.total_matches = 0
+        self.total_interactions = 0
+        self.contact_memory = memoria_contactos(n)
+        self.match_pairs = []   # (i, j) de cada match, en orden
+        self.last_matches = []  # matches del último tick
+        if self.registro is not None:
+            self.registro.inicio(self)
+
+    # ===========================
+    # Física
+    # ===========================
+    def move(self):
+        libres = ~self.matched
+        self.x[libres] += self.vx[libres]
+        self.y[libres] += self.vy[libres]
+        rebote_x = libres & ((self.x <= self.BORDER) | (self.x >= self.width - self.BORDER))
+        rebote_y = libres & ((self.y <= self.BORDER) | (self.y >= self.height - self.BORDER))
+        self.vx[rebote_x] *= -1
+        self.vy[rebote_y] *= -1
+
+    def candidate_pairs(self):
+        """Pares (i, j) de agentes libres, de distinto género y a menos del radio."""
+        activos = np.flatnonzero(~self.matched)
+        i, j = self.grid.pares_cercanos(self.x[activos], self.y[activos])
+        i, j = activos[i], activos[j]
+        distinto = self.male[i] != self.male[j]
+        return i[distinto], j[distinto]
+
+    # ===========================
+    # Interacciones
+    # ===========================
+    def predict_pairs(self, i, j):
+        """Predicción del árbol para los contactos (i, j) vía la tabla precomputada."""
+        diff = np.abs(self.shar[i] - self.shar[j])
+        return self.prediction_table[self.attr[i] - 1, self.fun[i] - 1, diff]
+
+    def score_parts(self, i, j):
+        """Componentes del éxito: predicción del árbol, primera regla con boost (-1 si ninguna) y boost base."""
+        prediccion = self.predict_pairs(i, j)
+        m = len(i)
+        regla = np.full(m, -1)
+        if len(self.rules):
+            altos = np.stack([(self.attr[i] > 7) & (self.attr[j] > 7),
+                              (self.fun[i] > 7) & (self.fun[j] > 7),
+                              (self.shar[i] > 7) & (self.shar[j] > 7)], axis=1)
+            sorteo = self.rng.random((m, len(self.rules), 3)) < self.rule_strength[None, :, None]
+            dispara = (sorteo & self.rule_mask[None, :, :] & altos[:, None, :]).any(axis=2)
+            regla = np.where(dispara.any(axis=1), dispara.argmax(axis=1), -1)
+        base = self.rng.random(m) < self.BASE_BOOST
+        return prediccion, regla, base
+
+    def score_pairs(self, i, j):
+        """Éxito de cada contacto: predicción del árbol + reglas Apriori + boost base."""
+        prediccion, regla, base = self.score_parts(i, j)
+        return (prediccion == 1) | (regla >= 0) | base
+
+    def step(self):
+        """Un tick: mover, detectar contactos nuevos, puntuarlos en lote y resolver matches."""
+        self.tick += 1
+        perfil = self.perfil
+        with perfil.seccion("move"):
+            self.move()
+        self.last_matches = []
+        with perfil.seccion("pares"):
+            i, j = self.candidate_pairs()
+            nuevos = ~self.contact_memory.contiene(i, j)
+            i, j = i[nuevos], j[nuevos]
+        if len(i) == 0:
+            if self.registro is not None:
+                self.registro.registrar()
+            return self.last_matches
+
+        with perfil.seccion("predicciones"):
+            prediccion, regla, base = self.score_parts(i, j)
+            exito = (prediccion == 1) | (regla >= 0) | base
+        # Resolución en orden: un agente que ya hizo match en este tick no interactúa más
+        with perfil.seccion("resolucion"):
+            matched = self.matched
+            interactuan = np.zeros(len(i), dtype=bool)
+            es_match = np.zeros(len(i), dtype=bool)
+            for k, (a, b, ok) in enumerate(zip(i.tolist(), j.tolist(), exito.tolist())):
+                if matched[a] or matched[b]: continue
+                interactuan[k] = True
+                if ok:
+                    es_match[k] = True
+                    matched[a] = matched[b] = True
+                    self.total_matches += 1
+                    self.last_matches.append((a, b))
+            # Los pares de un tick son distintos entre sí: se guardan todos juntos al final
+            self.contact_memory.agregar(i[interactuan], j[interactuan])
+            self.total_interactions += int(interactuan.sum())
+            self.match_pairs.extend(self.last_matches)
+        if self.registro is not None:
+            with perfil.seccion("registro"):
+                k = interactuan
+                self.registro.registrar({"i": i[k], "j": j[k], "prediccion": prediccion[k], "regla": regla[k],
+                                         "base": base[k], "match": es_match[k]})
+        return self.last_matches
+
+    def run(self, ticks):
+        """Corre ``ticks`` pasos lo más rápido posible y devuelve las estadísticas."""
+        for _ in range(ticks):
+            libres = ~self.matched
+            # Sin parejas posibles de distinto género ya no cambia ninguna estadística
+            if not (libres & self.male).any() or not (libres & ~self.male).any():
+                break
+            self.step()
+            self.perfil.cerrar_frame(tick=self.tick)
+        return self.stats()
+
+    @property
+    def success_rate(self):
+        return self.total_matches / max(1, self.total_interactions)
+
+    def stats(self):
+        return {
+            "n_agents": self.n_agents,
+            "diversity": self.diversity,
+            "ticks": self.tick,
+            "total_interactions": self.total_interactions,
+            "total_matches": self.total_matches,
+            "success_rate": self.success_rate,
+        }
+
+
+# ===========================
+# Ejecución headless
+# ===========================
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Simulación del mercado de citas sin pantalla")
+    parser.add_argument("--agents", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--diversity", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data", default="data/speed_dating_cleaned.csv")
+    parser.add_argument("--rules", default="apriori_rules_GroupA.csv")
+    parser.add_argument("--perfil", help="log JSON lines con los ms por sección de cada tick")
+    parser.add_argument("--registro", help="directorio donde grabar los eventos de la corrida")
+    parser.add_argument("--snapshot-cada", type=int, default=10, help="ticks entre snapshots de posiciones")
+    args = parser.parse_args()
+
+    from instrumentacion import PerfilFrames
+    perfil = PerfilFrames(args.perfil) if args.perfil else None
+    registro = None
+    if args.registro:
+        from registro_eventos import RegistroEventos
+        registro = RegistroEventos(args.registro, cada=args.snapshot_cada)
+    engine = SimulationEngine(rules=load_rules(args.rules), prediction_table=load_prediction_table(args.data),
+                              n_agents=args.agents, diversity=args.diversity, seed=args.seed, perfil=perfil,
+                              registro=registro)
+    t0 = time.perf_counter()
+    stats = engine.run(args.ticks)
+    elapsed = time.perf_counter() - t0
+    if registro is not None:
+        registro.cerrar()
+        print(f"📼 Eventos grabados en: {args.registro}")
+    print(f"\n📈 Resultado: {stats}")
+    print(f"⏱️ {stats['ticks']} ticks en {elapsed:.2f}s "
+          f"({stats['ticks'] * args.agents / max(elapsed, 1e-9):,.0f} agente-ticks/s)")
+    if perfil is not None:
+        perfil.cerrar()
+        print(f"🔬 Tiempos por tick guardados en: {args.perfil}")
@@ -0,0 +1,52 @@
+# ==========================================
+# Datos sintéticos chicos para los tests (esquema del Speed Dating Data)
+# ==========================================
+
+import numpy as np
+import pandas as pd
+
+ATRIBUTOS = ["attr", "sinc", "intel", "fun", "amb", "shar"]
+
+
+def _con_faltantes(rng, valores, proporcion):
+    valores = np.asarray(valores, dtype=float)
+    valores[rng.random(len(valores)) < proporcion] = np.nan
+    return valores
+
+
+def speed_dating(n_rows, seed=0, repetidas=0.1):
+    """Citas con calificaciones 1–10, importancias 0–100, texto, faltantes y filas repetidas.
+
+    Una fracción ``repetidas`` de filas se copia al final (para el deduplicado).
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "iid": rng.integers(1, 300, n_rows),
+        "wave": rng.integers(1, 6, n_rows),
+        "age": rng.integers(18, 45, n_rows),
+        "race": rng.integers(1, 7, n_rows),
+        "race_o": rng.integers(1, 7, n_rows),
+        "field": rng.choice(["Law", "Economics", "Social Work", "Medicine"], n_rows),
+        "int_corr": _con_faltantes(rng, rng.uniform(-0.8, 0.95, n_rows).round(2), 0.02),
+    })
+    df["samerace"] = (df["race"] == df["race_o"]).astype(int)
+    for a in ATRIBUTOS:
+        df[a] = _con_faltantes(rng, rng.integers(1, 11, n_rows), 0.03)
+        df[f"{a}_o"] = _con_faltantes(rng, rng.integers(1, 11, n_rows), 0.03)
+    pesos = np.round(rng.dirichlet(np.full(len(ATRIBUTOS), 4.0), n_rows) * 100)
+    for k, a in enumerate(ATRIBUTOS):
+        df[f"{a}1_1"] = _con_faltantes(rng, pesos[:, k], 0.01)
+        df[f"{a}3_1"] = _con_faltantes(rng, rng.integers(2, 11, n_rows), 0.01)
+    df["like"] = np.clip(np.round((df["attr"].fillna(6) + df["fun"].fillna(6)) / 2 + rng.normal(0, 1, n_rows)), 1, 10)
+    z = (df["attr_o"].fillna(6) - 6.5) * 0.7 + (df["fun_o"].fillna(6) - 6.5) * 0.5 + df["int_corr"].fillna(0) - 1.5
+    df["match"] = (rng.random(n_rows) < 1 / (1 + np.exp(-z))).astype(int)
+    df["income"] = _con_faltantes(rng, np.round(rng.lognormal(10.8, 0.4, n_rows)), 0.4)
+    return pd.concat([df, df.iloc[:int(n_rows * repetidas)]], ignore_index=True)
+
+
+def canasta(n_items, n_rows, seed=0):
+    """Canasta booleana con ítems correlacionados (factor latente común)."""
+    rng = np.random.default_rng(seed)
+    latente = rng.random(n_rows)
+    prob = rng.uniform(0.05, 0.4, n_items)
+    return pd.DataFrame({f"I{k}": (rng.random(n_rows) * 0.7 + latente * 0.3) < p for k, p in enumerate(prob)})
@@ -0,0 +1,42 @@
+# ==========================================
+# Copia columnar del dataset limpio: mismo contenido que el CSV
+# ==========================================
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import archivos_lectura, columnas_dataset, guardar_dataset, leer_dataset, ruta_columnar
+
+
+@pytest.fixture
+def limpio(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"match": rng.integers(0, 2, 50), "attr_o": rng.uniform(1, 10, 50).round(1),
+                       "field": rng.choice(["Law", "Business"], 50), "samerace": rng.integers(0, 2, 50)})
+    # Nombre repetido, como el samerace original y el derivado del dataset limpio
+    df = pd.concat([df, df[["samerace"]]], axis=1)
+    path = str(tmp_path / "limpio.csv")
+    guardar_dataset(df, path)
+    return path
+
+
+def test_parquet_igual_al_csv(limpio):
+    pytest.importorskip("pyarrow")
+    assert archivos_lectura(limpio) == [ruta_columnar(limpio)]
+    csv = pd.read_csv(limpio)
+    assert columnas_dataset(limpio) == list(csv.columns) == ["match", "attr_o", "field", "samerace", "samerace.1"]
+    pd.testing.assert_frame_equal(leer_dataset(limpio), csv)
+    # Proyección de columnas en el orden pedido
+    pd.testing.assert_frame_equal(leer_dataset(limpio, ["samerace.1", "match"]), csv[["samerace.1", "match"]])
+
+
+def test_csv_mas_nuevo_invalida_el_parquet(limpio):
+    time.sleep(0.01)
+    pd.read_csv(limpio).head(10).to_csv(limpio, index=False)
+    os.utime(limpio)
+    assert archivos_lectura(limpio) == [limpio]
+    assert len(leer_dataset(limpio)) == 10
@@ -0,0 +1,79 @@
+# ==========================================
+# Preprocesamiento incremental: olas nuevas sobre un refit
+# ==========================================
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import leer_dataset, partes_columnares
+from preprocessing_incremental import agregar_filas, cargar_estado, refit, rutas_estado
+from sinteticos import speed_dating
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def limpio(tmp_path):
+    crudo = speed_dating(2600, seed=2, repetidas=0)
+    historia = tmp_path / "historia.csv"
+    crudo.iloc[:2000].to_csv(historia, index=False, encoding="latin1")
+    out = str(tmp_path / "limpio.csv")
+    refit([str(historia)], out, chunksize=700)
+    return crudo, str(historia), out
+
+
+def test_agrega_imputa_y_deduplica(limpio, tmp_path):
+    crudo, historia, out = limpio
+    # Ola nueva: filas ya vistas + filas nuevas con faltantes en una columna que venía completa
+    nuevas = crudo.iloc[2000:2600].copy()
+    nuevas.loc[nuevas.index[::4], "like"] = np.nan
+    ola = tmp_path / "ola.csv"
+    pd.concat([crudo.iloc[:300], nuevas]).to_csv(ola, index=False, encoding="latin1")
+
+    agregadas = agregar_filas(str(ola), out, chunksize=200)
+    assert agregadas > 0
+    assert agregar_filas(str(ola), out, chunksize=200) == 0
+
+    csv = pd.read_csv(out)
+    assert not csv.select_dtypes("number").isna().any().any()
+    assert len(partes_columnares(out)) == 1
+    columnar = leer_dataset(out)
+    assert len(columnar) == len(csv)
+    numericas = csv.select_dtypes("number").columns
+    np.testing.assert_allclose(columnar[numericas].to_numpy(dtype=float), csv[numericas].to_numpy(dtype=float))
+
+    # El índice del refit no se reescribe: las huellas nuevas quedan en un delta
+    estado, indice = cargar_estado(out)
+    assert estado["filas"] == len(csv)
+    assert [len(a) for a in indice] == [len(csv) - agregadas, agregadas]
+
+    # Un refit vuelve a un índice único y borra las partes Parquet
+    refit([historia, str(ola)], out, chunksize=700)
+    assert partes_columnares(out) == []
+    assert not any(".fingerprints.0" in f for f in os.listdir(tmp_path))
+
+
+def test_ola_con_error_no_deja_nada(limpio, tmp_path):
+    crudo, _, out = limpio
+    antes = {p: open(p, "rb").read() for p in [out, *rutas_estado(out)]}
+    nuevas = crudo.iloc[2000:2600].copy()
+    # El error aparece recién en el tercer chunk: los dos primeros no deben quedar en el dataset
+    nuevas.loc[nuevas.index[450], "age"] = np.nan
+    ola = tmp_path / "ola.csv"
+    nuevas.to_csv(ola, index=False, encoding="latin1")
+
+    with pytest.raises(ValueError, match="enteras con faltantes"):
+        agregar_filas(str(ola), out, chunksize=200)
+    assert {p: open(p, "rb").read() for p in antes} == antes
+    assert partes_columnares(out) == []
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+
+    # Corregida la ola, se agrega una sola vez
+    nuevas.loc[nuevas.index[450], "age"] = 30
+    nuevas.to_csv(ola, index=False, encoding="latin1")
+    agregadas = agregar_filas(str(ola), out, chunksize=200)
+    assert agregadas == 600
+    assert len(pd.read_csv(out)) == 2600 == len(leer_dataset(out))
@@ -0,0 +1,71 @@
+# ==========================================
+# Informes por segmento: reutilización, regeneración y limpieza
+# ==========================================
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("reportlab")
+pytest.importorskip("seaborn")
+pytest.importorskip("matplotlib").use("Agg")
+
+from integration import generar_informes_por_segmento
+from rule_store import guardar_reglas
+from sinteticos import speed_dating
+
+
+@pytest.fixture
+def proyecto(tmp_path, monkeypatch):
+    # El caché de modelos va en data/model_cache relativo al directorio actual
+    monkeypatch.chdir(tmp_path)
+    datos = speed_dating(1500, seed=2, repetidas=0)
+    # Un valor con caracteres de marcado de ReportLab en el título del segmento
+    datos["ciudad"] = np.where(datos["wave"] < 3, "R&D <norte", "sur")
+    datos.to_csv("datos.csv", index=False)
+    guardar_reglas(pd.DataFrame({
+        "antecedents": [frozenset({"High_Attractive", "High_Fun"}), frozenset({"High_Fun"})],
+        "consequents": [frozenset({"Match"}), frozenset({"Match"})],
+        "support": [0.1, 0.2], "confidence": [0.6, 0.4], "lift": [2.0, 1.5],
+    }), "reglas.csv")
+    return datos
+
+
+def _correr(workers=1):
+    return generar_informes_por_segmento(["wave", "ciudad"], "datos.csv", "reglas.csv", "informes",
+                                         workers=workers, min_filas=50)
+
+
+def test_reutiliza_regenera_y_limpia(proyecto):
+    segmentos = [f"wave={w}" for w in range(1, 6)] + ["ciudad=R&D <norte", "ciudad=sur"]
+    assert _correr(workers=2) == dict.fromkeys(segmentos, "ok")
+    pdfs = sorted(os.listdir("informes"))
+    assert len([p for p in pdfs if p.endswith(".pdf")]) == len(segmentos)
+    mtimes = {p: os.stat(os.path.join("informes", p)).st_mtime_ns for p in pdfs if p.endswith(".pdf")}
+
+    # Sin cambios: todo sale del estado y no se reescribe ningún PDF
+    assert _correr() == dict.fromkeys(segmentos, "cache")
+    assert {p: os.stat(os.path.join("informes", p)).st_mtime_ns for p in mtimes} == mtimes
+
+    # Cambian las filas de la wave 3 y desaparece la wave 5
+    datos = proyecto[proyecto["wave"] != 5].copy()
+    datos.loc[datos["wave"] == 3, "attr_o"] = 10 - datos.loc[datos["wave"] == 3, "attr_o"]
+    datos.to_csv("datos.csv", index=False)
+    resultado = _correr()
+    assert resultado == {"wave=1": "cache", "wave=2": "cache", "wave=3": "ok", "wave=4": "cache",
+                         "wave=5": "eliminado", "ciudad=R&D <norte": "cache", "ciudad=sur": "ok"}
+    assert not os.path.exists("informes/Informe_wave_5.pdf")
+    with open("informes/informes_estado.json", encoding="utf-8") as f:
+        assert sorted(json.load(f)) == sorted(k for k in resultado if k != "wave=5")
+
+
+def test_otras_columnas_no_se_tocan(proyecto):
+    assert set(_correr().values()) == {"ok"}
+    # Otra columna en la misma carpeta: los informes por wave y ciudad se conservan
+    assert generar_informes_por_segmento(["samerace"], "datos.csv", "reglas.csv", "informes",
+                                         workers=1) == {"samerace=0": "ok", "samerace=1": "ok"}
+    assert _correr() == dict.fromkeys([f"wave={w}" for w in range(1, 6)] + ["ciudad=R&D <norte", "ciudad=sur"],
+                                      "cache")
@@ -0,0 +1,51 @@
+# ==========================================
+# Minería de itemsets sobre bitsets vs mlxtend
+# ==========================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from itemset_mining import ALGORITMOS as ALGORITMOS_ITEMSETS, CanastaBits, itemsets_frecuentes, reglas_asociacion
+from sinteticos import canasta
+
+mlxtend = pytest.importorskip("mlxtend.frequent_patterns")
+
+ALGORITMOS = list(ALGORITMOS_ITEMSETS)
+
+
+@pytest.fixture(scope="module")
+def basket():
+    return canasta(12, 5000, seed=3)
+
+
+@pytest.mark.parametrize("algoritmo", ALGORITMOS)
+@pytest.mark.parametrize("min_support", [0.05, 0.2, 0.9])
+def test_itemsets_iguales_a_mlxtend(basket, algoritmo, min_support):
+    ref = mlxtend.apriori(basket, min_support=min_support, use_colnames=True)
+    fi = itemsets_frecuentes(CanastaBits.desde_dataframe(basket), min_support, use_colnames=True,
+                             algoritmo=algoritmo)
+    assert fi["itemsets"].tolist() == ref["itemsets"].tolist()
+    np.testing.assert_array_equal(fi["support"].to_numpy(), ref["support"].to_numpy())
+
+
+@pytest.mark.parametrize("algoritmo", ALGORITMOS)
+def test_max_len(basket, algoritmo):
+    ref = mlxtend.apriori(basket, min_support=0.05, use_colnames=True, max_len=2)
+    fi = itemsets_frecuentes(basket, 0.05, use_colnames=True, max_len=2, algoritmo=algoritmo)
+    assert fi["itemsets"].tolist() == ref["itemsets"].tolist()
+
+
+def test_reglas_iguales_a_mlxtend(basket):
+    fi = itemsets_frecuentes(basket, 0.05, use_colnames=True)
+    reglas = reglas_asociacion(fi, metric="confidence", min_threshold=0.3)
+    ref = mlxtend.association_rules(fi, metric="confidence", min_threshold=0.3)
+    assert len(reglas) and (reglas["antecedents"].map(len) > 1).any()
+
+    # Los frozenset no tienen orden total: se indexa por tuplas ordenadas
+    clave = lambda df: df.set_index([df["antecedents"].map(sorted).map(tuple),
+                                     df["consequents"].map(sorted).map(tuple)]).sort_index()
+    a, b = clave(reglas), clave(ref)
+    assert a.index.equals(b.index)
+    columnas = [c for c in a.columns if c in b.columns]
+    pd.testing.assert_frame_equal(a[columnas], b[columnas], check_exact=False, rtol=1e-12)
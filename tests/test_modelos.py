@@ -0,0 +1,55 @@
+# ==========================================
+# Caché de modelos: se reentrena solo si cambian datos, parámetros o librerías
+# ==========================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+import modelos_grupoA
+from modelos_grupoA import ModelosGrupoA
+
+
+def escribir_datos(path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"attr_o": rng.integers(1, 11, n), "fun_o": rng.integers(1, 11, n),
+                       "int_corr": rng.uniform(-1, 1, n).round(2)})
+    df["match"] = ((df["attr_o"] + df["fun_o"] + rng.normal(0, 3, n)) > 13).astype(int)
+    df.to_csv(path, index=False)
+
+
+def entrenar(data_path, cache_dir, hiperparametros=None):
+    modelo = ModelosGrupoA(str(data_path), str(cache_dir))
+    if hiperparametros is not None:
+        modelo.HIPERPARAMETROS = hiperparametros
+    modelo.cargar_datos()
+    modelo.entrenar_modelos(["Decision Tree"], n_jobs=1)
+    return modelo.results["Decision Tree"]["cached"]
+
+
+def test_cache_se_invalida(tmp_path, monkeypatch):
+    datos, cache = tmp_path / "datos.csv", tmp_path / "cache"
+    escribir_datos(datos, 400)
+    assert entrenar(datos, cache) is False
+    assert entrenar(datos, cache) is True
+    # Camino rápido (sin leer ni partir los datos): encuentra el mismo modelo
+    assert ModelosGrupoA(str(datos), str(cache)).cargar_cacheado("Decision Tree") is not None
+
+    # Otros hiperparámetros
+    otros = dict(ModelosGrupoA.HIPERPARAMETROS, **{"Decision Tree": dict(max_depth=2, random_state=42)})
+    assert entrenar(datos, cache, otros) is False
+    assert entrenar(datos, cache, otros) is True
+
+    # Otra versión de scikit-learn
+    version = modelos_grupoA._version
+    monkeypatch.setattr(modelos_grupoA, "_version", lambda p: "0.0-otra" if p == "scikit-learn" else version(p))
+    assert entrenar(datos, cache) is False
+    monkeypatch.undo()
+    assert entrenar(datos, cache) is True
+
+    # Otros datos (mismo archivo reescrito)
+    escribir_datos(datos, 401, seed=1)
+    assert ModelosGrupoA(str(datos), str(cache)).cargar_cacheado("Decision Tree") is None
+    assert entrenar(datos, cache) is False
+    assert entrenar(datos, cache) is True
@@ -0,0 +1,76 @@
+# ==========================================
+# Pipeline: caché por etapa, invalidación y orden
+# ==========================================
+
+import pytest
+
+from pipeline import Etapa, dependencias, ejecutar
+
+
+# Etapas de juguete: copian la entrada con un sufijo y cuentan las corridas
+CORRIDAS = []
+
+
+def _copiar(entradas, salidas, params):
+    CORRIDAS.append(params["nombre"])
+    texto = "".join(open(p).read() for _, p in sorted(entradas.items()))
+    for p in salidas.values():
+        with open(p, "w") as f:
+            f.write(texto + params["sufijo"])
+    return {}
+
+
+def _dag(tmp_path, sufijo_b="b"):
+    r = lambda nombre: str(tmp_path / nombre)
+    etapa = lambda nombre, entradas, salida, sufijo, **kw: Etapa(
+        nombre, _copiar, {k: r(v) for k, v in entradas.items()}, {"out": r(salida)},
+        {"nombre": nombre, "sufijo": sufijo}, **kw)
+    return [
+        etapa("a", {"x": "crudo.txt"}, "a.txt", "a"),
+        etapa("b", {"x": "a.txt"}, "b.txt", sufijo_b),
+        etapa("c", {"x": "a.txt"}, "c.txt", "c"),
+        etapa("d", {"x": "c.txt"}, "d.txt", "d", despues=("b",)),
+    ]
+
+
+@pytest.fixture
+def dag(tmp_path):
+    (tmp_path / "crudo.txt").write_text("0")
+    CORRIDAS.clear()
+    return tmp_path, str(tmp_path / "estado.json")
+
+
+def test_cache_y_parametros(dag):
+    tmp_path, estado = dag
+    assert set(ejecutar(_dag(tmp_path), estado, workers=1).values()) == {"ok"}
+    assert CORRIDAS.index("d") > CORRIDAS.index("b")
+
+    CORRIDAS.clear()
+    assert set(ejecutar(_dag(tmp_path), estado, workers=1).values()) == {"cache"}
+    assert CORRIDAS == []
+
+    # b cambia su salida, pero d solo va después de b: no la lee y sigue vigente
+    r = ejecutar(_dag(tmp_path, sufijo_b="B"), estado, workers=1)
+    assert r == {"a": "cache", "b": "ok", "c": "cache", "d": "cache"}
+
+    # Cambia la entrada cruda: todo se recalcula
+    (tmp_path / "crudo.txt").write_text("1")
+    CORRIDAS.clear()
+    assert set(ejecutar(_dag(tmp_path, sufijo_b="B"), estado, workers=1).values()) == {"ok"}
+    assert (tmp_path / "d.txt").read_text() == "1acd"
+
+
+def test_salida_borrada_se_regenera(dag):
+    tmp_path, estado = dag
+    ejecutar(_dag(tmp_path), estado, workers=1)
+    (tmp_path / "c.txt").unlink()
+    assert ejecutar(_dag(tmp_path), estado, workers=1) == {"a": "cache", "b": "cache", "c": "ok", "d": "cache"}
+
+
+def test_dependencias(tmp_path):
+    deps = dependencias(_dag(tmp_path))
+    assert deps == {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}}
+    with pytest.raises(ValueError, match="no existen"):
+        dependencias([Etapa("x", _copiar, {}, {}, despues=("y",))])
+    with pytest.raises(ValueError, match="Ciclo"):
+        dependencias([Etapa("x", _copiar, {"i": "p"}, {"o": "q"}), Etapa("y", _copiar, {"i": "q"}, {"o": "p"})])
@@ -0,0 +1,98 @@
+# ==========================================
+# Preprocesamiento: original vs vectorizado vs por chunks
+# ==========================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing import preprocesar
+from preprocessing_steps import crear_derivadas, imputar, normalizar
+from preprocessing_stream import HuellasVistas, preprocesar_por_chunks
+from sinteticos import speed_dating
+
+
+# ---------- Implementación original (referencia) ----------
+def normalizar_original(df_norm):
+    def normalize_col(col):
+        series = pd.to_numeric(df_norm[col], errors='coerce')
+        if series.dropna().empty:
+            return df_norm[col]
+        max_v = series.max(skipna=True)
+        med_v = series.median(skipna=True)
+        if pd.notna(max_v) and max_v > 10 and pd.notna(med_v) and med_v > 10:
+            return series.div(10).clip(lower=1, upper=10)
+        else:
+            return series.where(series.notna(), df_norm[col])
+
+    for c in [c for c in df_norm.columns if df_norm[c].dtype.kind in 'biufc']:
+        df_norm[c] = normalize_col(c)
+    return df_norm
+
+
+def imputar_original(df_clean):
+    def impute_col(col):
+        if pd.api.types.is_numeric_dtype(col):
+            med = col.median(skipna=True)
+            return col.fillna(0 if pd.isna(med) else med)
+        return col
+
+    return df_clean.apply(impute_col, axis=0)
+
+
+@pytest.fixture(scope="module")
+def crudo():
+    return speed_dating(3000, seed=1)
+
+
+def test_vectorizado_igual_al_original(crudo):
+    ref = normalizar_original(crudo.copy())
+    out = normalizar(crudo.copy())
+    pd.testing.assert_frame_equal(ref, out)
+
+    # samerace queda repetido (original + derivada): la imputación va por posición
+    df = pd.concat([out, crear_derivadas(out, verbose=False)], axis=1).drop_duplicates()
+    assert df.isna().any().any()
+    pd.testing.assert_frame_equal(imputar_original(df.copy()), imputar(df.copy()))
+
+
+def test_imputar_con_medianas_dadas(crudo):
+    df = crudo.iloc[:200].copy()
+    pos = {k: 5.0 for k in range(df.shape[1]) if df.dtypes.iloc[k].kind in "iuf"}
+    out = imputar(df, pos)
+    assert not out.select_dtypes("number").isna().any().any()
+    # Las columnas sin faltantes no cambian ni de tipo
+    pd.testing.assert_series_equal(out["age"], df["age"])
+    assert (out["income"][df["income"].isna()] == 5.0).all()
+
+
+# ===========================
+# Por chunks (user-009)
+# ===========================
+@pytest.fixture
+def csv_crudo(crudo, tmp_path):
+    path = tmp_path / "crudo.csv"
+    crudo.to_csv(path, index=False, encoding="latin1")
+    return str(path)
+
+
+def test_por_chunks_igual_a_en_memoria(crudo, csv_crudo, tmp_path):
+    en_memoria, duplicados = preprocesar(csv_crudo, str(tmp_path / "memoria.csv"))
+    info = preprocesar_por_chunks(csv_crudo, str(tmp_path / "chunks.csv"), chunksize=250)
+
+    assert duplicados > 0
+    assert info["initial_count"] - info["final_count"] == duplicados == len(crudo) - len(en_memoria)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "memoria.csv"), pd.read_csv(tmp_path / "chunks.csv"))
+
+
+def test_huellas_vistas_como_un_set():
+    rng = np.random.default_rng(0)
+    vistas, ref = HuellasVistas(), set()
+    for _ in range(60):
+        lote = rng.integers(0, 5000, rng.integers(0, 200)).astype(np.uint64)
+        np.testing.assert_array_equal(vistas.contiene(lote), [x in ref for x in lote.tolist()])
+        nuevas = np.unique(lote[~vistas.contiene(lote)])
+        vistas.agregar(nuevas)
+        ref.update(nuevas.tolist())
+        assert len(vistas.tramos) <= 2 * max(1, len(ref)).bit_length()
+    np.testing.assert_array_equal(vistas.ordenadas(), np.array(sorted(ref), dtype=np.uint64))
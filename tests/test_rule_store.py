@@ -0,0 +1,45 @@
+# ==========================================
+# Almacén de reglas: ida y vuelta por JSON/CSV e índices por ítem
+# ==========================================
+
+import os
+
+import pandas as pd
+import pytest
+
+from rule_store import guardar_reglas, leer_reglas, ruta_reglas, texto_items
+
+
+@pytest.fixture
+def reglas():
+    return pd.DataFrame({
+        "antecedents": [frozenset({"High_attr", "High_fun"}), frozenset({"SameRace"}), frozenset({"O'Brien"})],
+        "consequents": [frozenset({"Match"}), frozenset({"High_shar"}), frozenset({"Match", "High_fun"})],
+        "support": [0.2, 0.3, 0.1], "confidence": [0.8, 0.5, 1.0], "lift": [2.0, 1.1, float("inf")],
+    })
+
+
+def test_ida_y_vuelta(reglas, tmp_path):
+    csv = str(tmp_path / "reglas.csv")
+    guardar_reglas(reglas, csv)
+    assert os.path.exists(ruta_reglas(csv))
+    desde_json = leer_reglas(csv)
+    pd.testing.assert_frame_equal(desde_json.dataframe(), reglas)
+
+    # Sin JSON: se parsea el CSV heredado con repr de frozenset (incluye comillas dentro del ítem)
+    os.remove(ruta_reglas(csv))
+    pd.testing.assert_frame_equal(leer_reglas(csv).dataframe(), reglas)
+
+
+def test_indices_por_item(reglas, tmp_path):
+    csv = str(tmp_path / "reglas.csv")
+    guardar_reglas(reglas, csv)
+    store = leer_reglas(csv)
+    for it in store.items:
+        assert store.con_items([it]) == [k for k, a in enumerate(reglas["antecedents"]) if it in a]
+        assert store.con_items([it], en="consecuente") == [k for k, c in enumerate(reglas["consequents"]) if it in c]
+    assert store.donde_item(lambda it: it.startswith("High_")) == [0]
+    assert store.donde_item(lambda it: it == "Match", en="consecuente") == [0, 2]
+    sub = store.seleccionar([2, 0])
+    assert sub.antecedentes == [reglas["antecedents"][2], reglas["antecedents"][0]]
+    assert texto_items(sub.consecuentes[0]) == "High_fun, Match"
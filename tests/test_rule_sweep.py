@@ -0,0 +1,55 @@
+# ==========================================
+# Barrido de umbrales: cubo de conteos vs minar cada configuración
+# ==========================================
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from itemset_mining import itemsets_frecuentes, reglas_asociacion
+from rule_sweep import ITEMS, run_rule_sweep
+from sinteticos import speed_dating
+
+
+@pytest.fixture(scope="module")
+def datos():
+    return speed_dating(4000, seed=4, repetidas=0)
+
+
+def minar_directo(data, a, f, i, s, l):
+    data = data[["match", "attr_o", "fun_o", "int_corr"]].dropna()
+    basket = pd.DataFrame(dict(zip(ITEMS, [data["attr_o"] >= a, data["fun_o"] >= f,
+                                           data["int_corr"] >= i, data["match"] == 1])))
+    fi = itemsets_frecuentes(basket, s, use_colnames=True)
+    if not len(fi):
+        return set()
+    reglas = reglas_asociacion(fi, metric="lift", min_threshold=l)
+    reglas = reglas[reglas["consequents"].map(lambda c: "Match" in c).to_numpy(dtype=bool)]
+    return {(r.antecedents, r.consequents, round(r.support, 12), round(r.lift, 12))
+            for r in reglas.itertuples()}
+
+
+def test_igual_a_minar_cada_configuracion(datos):
+    grid = dict(umbrales_attr=(6, 8), umbrales_fun=(7,), umbrales_int=(0.2, 0.5), soportes=(0.02, 0.05),
+                lifts=(1.0, 1.3))
+    tabla = run_rule_sweep(datos, workers=1, **grid)
+    assert len(tabla)
+    for a, f, i, s, l in itertools.product(*grid.values()):
+        sel = tabla[(tabla["attr_o_min"] == a) & (tabla["fun_o_min"] == f) & (tabla["int_corr_min"] == i)
+                    & (tabla["min_support"] == s) & (tabla["min_lift"] == l)]
+        obtenidas = {(r.antecedents, r.consequents, round(r.support, 12), round(r.lift, 12))
+                     for r in sel.itertuples()}
+        assert obtenidas == minar_directo(datos, a, f, i, s, l)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_soporte_sin_reglas(datos, workers):
+    # Los ítems sueltos son frecuentes pero ningún par llega al soporte: no hay reglas
+    tabla = run_rule_sweep(datos, (6,), (6,), (0.5,), soportes=(0.45,), lifts=(1.0,), workers=workers)
+    assert tabla.empty
+    # Mezclado con un soporte que sí da reglas, solo aparecen esas configuraciones
+    tabla = run_rule_sweep(datos, (6,), (6,), (0.5,), soportes=(0.02, 0.45), lifts=(1.0,), workers=workers)
+    assert len(tabla) and (tabla["min_support"] == 0.02).all()
+    assert np.isfinite(tabla["support"]).all()
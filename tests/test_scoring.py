@@ -0,0 +1,54 @@
+# ==========================================
+# Puntuación en streaming vs predicción de una sola vez
+# ==========================================
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from scoring import COLUMNAS, puntuar_archivo
+
+
+@pytest.fixture(scope="module")
+def modelo():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 10, (500, 3)), columns=COLUMNAS)
+    y = (X["attr_o"] + X["fun_o"] + rng.normal(0, 2, 500) > 11).astype(int)
+    return DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+
+
+@pytest.fixture
+def parejas(tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.uniform(0, 10, (2503, 3)).round(2), columns=COLUMNAS)
+    df.loc[rng.random(len(df)) < 0.05, "fun_o"] = np.nan
+    path = tmp_path / "parejas.csv"
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("ext", ["csv", "parquet"])
+def test_streaming_igual_a_prediccion_entera(modelo, parejas, tmp_path, workers, ext):
+    if ext == "parquet":
+        pytest.importorskip("pyarrow")
+    df, entrada = parejas
+    salida = str(tmp_path / f"prob.{ext}")
+    filas, top = puntuar_archivo(entrada, salida, modelo, chunksize=300, workers=workers,
+                                 con_entrada=True, top=10)
+
+    ref = np.full(len(df), np.nan)
+    completas = df.notna().all(axis=1).to_numpy()
+    ref[completas] = modelo.predict_proba(df[completas])[:, 1]
+
+    out = pd.read_parquet(salida) if ext == "parquet" else pd.read_csv(salida, float_precision="round_trip")
+    assert filas == len(df)
+    np.testing.assert_array_equal(out["fila"], np.arange(len(df)))
+    np.testing.assert_array_equal(out["prob_match"], ref)
+    np.testing.assert_array_equal(out[COLUMNAS].to_numpy(), df.to_numpy())
+
+    # El top acotado coincide con ordenar todo (empates: primero la fila más chica)
+    esperado = pd.Series(ref).dropna().sort_values(ascending=False, kind="stable").head(10)
+    np.testing.assert_array_equal(top["prob_match"], esperado.to_numpy())
+    np.testing.assert_array_equal(top["fila"], esperado.index)
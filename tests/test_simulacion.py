@@ -0,0 +1,96 @@
+# ==========================================
+# Motor de simulación: grid espacial, memorias de contactos y registro/replay
+# Con una tabla de predicciones sintética (sin entrenar modelos)
+# ==========================================
+
+import numpy as np
+import pytest
+
+import simulation_engine
+from registro_eventos import LecturaEventos, MotorReplay, RegistroEventos
+from simulation_engine import MemoriaDispersa, MemoriaTriangular, SimulationEngine, SpatialGrid
+
+REGLAS = [{"antecedents": frozenset({"High_Attractive", "Match"}), "text": "High_Attractive, Match", "strength": 0.9},
+          {"antecedents": frozenset({"High_Fun"}), "text": "High_Fun", "strength": 0.7}]
+
+
+@pytest.fixture(scope="module")
+def tabla():
+    return (np.random.default_rng(0).random((10, 10, 10)) < 0.2).astype(int)
+
+
+def motor(tabla, **kw):
+    return SimulationEngine(rules=REGLAS, prediction_table=tabla, n_agents=120, seed=7, **kw)
+
+
+def pares_fuerza_bruta(xs, ys, radio):
+    """El doble bucle i < j original."""
+    return [(i, j) for i in range(len(xs)) for j in range(i + 1, len(xs))
+            if (xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2 < radio * radio]
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 60, 400])
+def test_grid_igual_a_fuerza_bruta(n):
+    rng = np.random.default_rng(n)
+    xs, ys = rng.uniform(0, 300, n), rng.uniform(0, 240, n)
+    # Algunos agentes justo en bordes de celda y a distancia exacta del radio
+    if n > 10:
+        xs[:4], ys[:4] = [25.0, 50.0, 50.0, 75.0], [25.0, 25.0, 50.0, 25.0]
+    i, j = SpatialGrid(25).pares_cercanos(xs, ys)
+    assert list(zip(i.tolist(), j.tolist())) == pares_fuerza_bruta(xs, ys, 25)
+
+
+def test_memorias_equivalentes():
+    n, rng = 300, np.random.default_rng(1)
+    tri, dis = MemoriaTriangular(n), MemoriaDispersa(n)
+    for _ in range(40):
+        a, b = rng.integers(0, n, (2, 500))
+        i, j = np.minimum(a, b)[a != b], np.maximum(a, b)[a != b]
+        np.testing.assert_array_equal(tri.contiene(i, j), dis.contiene(i, j))
+        tri.agregar(i, j); dis.agregar(i, j)
+        assert len(tri) == len(dis)
+        assert tri.contiene(i, j).all()
+
+
+def test_motor_igual_con_ambas_memorias(tabla, monkeypatch):
+    triangular = motor(tabla)
+    assert isinstance(triangular.contact_memory, MemoriaTriangular)
+    ref = triangular.run(400)
+
+    monkeypatch.setattr(simulation_engine, "memoria_contactos", MemoriaDispersa)
+    dispersa = motor(tabla)
+    assert isinstance(dispersa.contact_memory, MemoriaDispersa)
+    assert dispersa.run(400) == ref
+    assert dispersa.match_pairs == triangular.match_pairs
+
+
+def test_registro_no_cambia_la_corrida(tabla, tmp_path):
+    ref = motor(tabla).run(300)
+    with RegistroEventos(str(tmp_path), cada=7) as registro:
+        assert motor(tabla, registro=registro).run(300) == ref
+
+
+def test_replay_exacto(tabla, tmp_path):
+    registro = RegistroEventos(str(tmp_path), cada=5)
+    eng = motor(tabla, registro=registro)
+    posiciones = {0: (eng.x.copy(), eng.y.copy())}
+    while eng.tick < 200:
+        eng.step()
+        posiciones[eng.tick] = (eng.x.copy(), eng.y.copy())
+    registro.cerrar()
+
+    log = LecturaEventos(str(tmp_path))
+    assert log.stats() == eng.stats()
+    tick, i, j = log.matches()
+    assert list(zip(i.tolist(), j.tolist())) == eng.match_pairs
+
+    replay = MotorReplay(log)
+    while not replay.terminado:
+        replay.step()
+        # Los snapshots guardan las posiciones exactas; entre ellos se interpola
+        if replay.tick % 5 == 0:
+            np.testing.assert_array_equal(replay.x, posiciones[replay.tick][0])
+            np.testing.assert_array_equal(replay.y, posiciones[replay.tick][1])
+    assert replay.match_pairs == eng.match_pairs
+    assert replay.total_interactions == eng.total_interactions
+    np.testing.assert_array_equal(replay.matched, eng.matched)